@@ -0,0 +1,38 @@
+# app/db/backfill_search_keys.py
+
+"""
+Build ``search_keys`` for every customer (safe to re-run).
+
+    python -m app.db.backfill_search_keys
+"""
+
+import asyncio
+import logging
+import sys
+
+BATCH_SIZE = 1000
+
+
+async def _main() -> int:
+    from app.db.mongo import db
+    from app.utils.search_keys import refresh_customer_keys
+
+    total = 0
+    batch: list[str] = []
+    async for customer in db.customers.find({}, {"_id": 0, "id": 1}).batch_size(BATCH_SIZE):
+        batch.append(customer["id"])
+        if len(batch) >= BATCH_SIZE:
+            await refresh_customer_keys(batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        await refresh_customer_keys(batch)
+        total += len(batch)
+
+    print(f"✅ Search keys rebuilt for {total} customer(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(asyncio.run(_main()))
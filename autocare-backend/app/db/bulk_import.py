@@ -0,0 +1,57 @@
+# app/db/bulk_import.py
+
+"""
+Bulk import customers or vehicles from a CSV / NDJSON file.
+
+    python -m app.db.bulk_import customers customers.csv --store-id <id>
+    python -m app.db.bulk_import vehicles vehicles.ndjson
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from typing import AsyncIterator, Optional
+
+CHUNK_SIZE = 1 << 20
+
+
+async def _read(path: str) -> AsyncIterator[bytes]:
+    with open(path, "rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            yield chunk
+
+
+async def _main(resource: str, path: str, format: str, store_id: Optional[str], source: str) -> int:
+    from app.utils.bulk_import import import_customers, import_vehicles
+
+    started = time.monotonic()
+    if resource == "customers":
+        defaults = {"source": source}
+        if store_id:
+            defaults.update({"store_id": store_id, "onboarded_by": store_id})
+        report = await import_customers(_read(path), format, defaults)
+    else:
+        report = await import_vehicles(_read(path), format)
+    elapsed = time.monotonic() - started
+
+    for error in report.errors:
+        print(f"❌ line {error['line']}: {error['error']}", file=sys.stderr)
+    print(json.dumps({k: v for k, v in report.as_dict().items() if k != "errors"}))
+    print(f"✅ {report.received} rows in {elapsed:.1f}s ({report.received / max(elapsed, 1e-9):.0f} rows/s)")
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import customers or vehicles.")
+    parser.add_argument("resource", choices=["customers", "vehicles"])
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=["csv", "ndjson"], help="default: from the file extension")
+    parser.add_argument("--store-id", help="default store_id / onboarded_by for customer rows")
+    parser.add_argument("--source", default="main_admin", help="default source for customer rows")
+    args = parser.parse_args()
+    format = args.format or ("ndjson" if args.path.endswith((".ndjson", ".jsonl")) else "csv")
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(asyncio.run(_main(args.resource, args.path, format, args.store_id, args.source)))
@@ -0,0 +1,433 @@
+# app/db/indexes.py
+
+"""
+Declarative index registry.
+
+Every collection the routers query declares its indexes here, shaped after the
+filters and sorts the handlers actually issue. ``ensure_indexes`` reconciles the
+registry against the live database at startup, and ``check_query_shapes`` runs
+``explain()`` on each router query shape so a missing index shows up as a
+failing COLLSCAN instead of a slow endpoint.
+
+A unique index cannot be built over existing duplicates (e.g. two customers
+sharing a ``phone_number`` from before the index existed). Reconciliation does
+not merge or delete anything: it skips that index, logs a sample of the
+duplicate values and keeps going, so startup is never blocked. Until the
+duplicates are resolved by hand and reconciliation re-runs, the old
+non-unique behaviour remains. ``--duplicates`` lists every offending group.
+
+    python -m app.db.indexes                # create / reconcile indexes
+    python -m app.db.indexes --check        # fail if any query shape still COLLSCANs
+    python -m app.db.indexes --duplicates   # list duplicates blocking unique indexes
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger(__name__)
+
+
+# ---------------------------
+# 🔹 Index Registry
+# ---------------------------
+INDEXES: dict[str, list[IndexModel]] = {
+    "customers": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("phone_number", ASCENDING)], name="phone_number", unique=True),
+        IndexModel([("email", ASCENDING)], name="email"),
+        IndexModel(
+            [("store_id", ASCENDING), ("is_active", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)],
+            name="store_active_created",
+        ),
+        IndexModel(
+            [("onboarded_by", ASCENDING), ("is_active", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)],
+            name="onboarded_active_created",
+        ),
+        IndexModel([("search_keys", ASCENDING)], name="search_keys"),
+        IndexModel([("store_id", ASCENDING), ("search_keys", ASCENDING)], name="store_search"),
+        IndexModel([("onboarded_by", ASCENDING), ("search_keys", ASCENDING)], name="onboarded_search"),
+    ],
+    "vehicles": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel(
+            [("vehicle_number", ASCENDING), ("customer_id", ASCENDING)],
+            name="number_customer",
+            unique=True,
+        ),
+        IndexModel(
+            [("customer_id", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)],
+            name="customer_created",
+        ),
+    ],
+    "bookings": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("store_id", ASCENDING), ("created_at", DESCENDING)], name="store_created"),
+        IndexModel([("customer_id", ASCENDING)], name="customer_id"),
+    ],
+    "vehicle_transactions": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel(
+            [("vehicle_id", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)],
+            name="vehicle_created",
+        ),
+        IndexModel([("store_id", ASCENDING), ("date", DESCENDING)], name="store_date"),
+    ],
+    "loyalty_cards": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("customer_id", ASCENDING)], name="customer_id"),
+    ],
+    "loyalty_rewards": [
+        IndexModel([("card_id", ASCENDING), ("bucket", DESCENDING)], name="card_bucket", unique=True),
+    ],
+    "store_daily_stats": [
+        IndexModel([("store_id", ASCENDING), ("date", ASCENDING)], name="store_date"),
+    ],
+    "store_task_capacities": [
+        IndexModel([("store_id", ASCENDING), ("task_type_id", ASCENDING)], name="store_task_type", unique=True),
+    ],
+    "slot_counters": [
+        IndexModel(
+            [("store_id", ASCENDING), ("task_type_id", ASCENDING), ("date", ASCENDING)],
+            name="store_task_type_date",
+        ),
+    ],
+    "garage_hub_tags": [
+        IndexModel([("garage_id", ASCENDING), ("hub_id", ASCENDING)], name="garage_hub", unique=True),
+        IndexModel([("hub_id", ASCENDING)], name="hub_id"),
+        IndexModel(
+            [("garage_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="garage_created",
+        ),
+    ],
+    "labour_rules": [
+        IndexModel([("task_type_id", ASCENDING), ("vehicle_category", ASCENDING)], name="task_type_category"),
+        IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="created"),
+    ],
+    "service_pricing": [
+        IndexModel(
+            [("store_id", ASCENDING), ("service_id", ASCENDING), ("vehicle_category", ASCENDING)],
+            name="store_service_category",
+        ),
+        IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="created"),
+    ],
+    "store_admin": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("alias", ASCENDING)], name="alias"),
+        IndexModel([("type", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)], name="type_created"),
+        IndexModel([("created_at", DESCENDING), ("id", DESCENDING)], name="created"),
+    ],
+    "services": [IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="created")],
+    "addons": [IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="created")],
+    "subservices": [IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="created")],
+    "task_types": [IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="created")],
+    "admin_users": [
+        IndexModel([("username", ASCENDING)], name="username"),
+    ],
+}
+
+
+# ---------------------------
+# 🔹 Router Query Shapes
+# ---------------------------
+@dataclass
+class QueryShape:
+    """A filter (and optional sort) issued by a route handler."""
+
+    collection: str
+    filter: dict[str, Any]
+    sort: Optional[list[tuple[str, int]]] = None
+    source: str = ""
+
+
+_ID = "00000000-0000-0000-0000-000000000000"
+
+QUERY_SHAPES: list[QueryShape] = [
+    QueryShape("customers", {"id": _ID}, source="customer.get_customer"),
+    QueryShape(
+        "customers",
+        {"$or": [{"phone_number": "9999999999"}, {"email": "a@b.c"}]},
+        source="booking.init_booking",
+    ),
+    QueryShape(
+        "customers",
+        {"is_active": True, "$or": [{"store_id": _ID}, {"onboarded_by": _ID}]},
+        source="customer.list_customers",
+    ),
+    QueryShape(
+        "customers",
+        {"is_active": True, "$or": [
+            {"store_id": _ID, "search_keys": {"$regex": "^9876"}},
+            {"onboarded_by": _ID, "search_keys": {"$regex": "^9876"}},
+        ]},
+        source="search.search_customers",
+    ),
+    QueryShape("customers", {"is_active": True, "search_keys": {"$regex": "^ka01"}}, source="search.search_customers"),
+    QueryShape("customers", {"is_active": True, "search_keys": "9876543210"}, source="search.search_customers"),
+    QueryShape("vehicles", {"id": _ID}, source="vehicle.get_vehicle"),
+    QueryShape(
+        "vehicles",
+        {"customer_id": _ID},
+        sort=[("created_at", DESCENDING), ("id", DESCENDING)],
+        source="vehicle.get_vehicles_by_customer",
+    ),
+    QueryShape(
+        "vehicles",
+        {"vehicle_number": "KA01AB1234", "customer_id": _ID},
+        source="booking.init_booking",
+    ),
+    QueryShape("bookings", {"id": _ID}, source="booking.add_tasks_to_booking"),
+    QueryShape("vehicle_transactions", {"id": _ID}, source="vehicle_transaction.get_transaction_by_id"),
+    QueryShape(
+        "vehicle_transactions",
+        {"vehicle_id": _ID},
+        sort=[("created_at", DESCENDING), ("id", DESCENDING)],
+        source="vehicle_transaction.get_transactions_for_vehicle",
+    ),
+    QueryShape("loyalty_cards", {"id": _ID}, source="loyalty_card.update_loyalty_card"),
+    QueryShape("loyalty_cards", {"customer_id": _ID}, source="loyalty_card.get_loyalty_card_by_customer"),
+    QueryShape(
+        "loyalty_rewards",
+        {"card_id": _ID, "bucket": {"$lte": 3}},
+        sort=[("bucket", DESCENDING)],
+        source="loyalty_card.get_reward_history",
+    ),
+    QueryShape(
+        "store_daily_stats",
+        {"store_id": _ID, "date": {"$gte": "2025-01-01", "$lte": "2025-01-31"}},
+        sort=[("date", ASCENDING)],
+        source="store_stats.get_store_stats",
+    ),
+    QueryShape(
+        "store_task_capacities",
+        {"store_id": _ID},
+        source="store_task_capacities.get_task_capacities_for_store",
+    ),
+    QueryShape(
+        "slot_counters",
+        {"store_id": _ID, "task_type_id": {"$in": [_ID]}, "date": "2025-01-01"},
+        source="availability.get_availability",
+    ),
+    QueryShape(
+        "garage_hub_tags",
+        {"garage_id": _ID},
+        sort=[("created_at", DESCENDING), ("_id", DESCENDING)],
+        source="garage_hub_tags.get_hub_tags_for_garage",
+    ),
+    QueryShape(
+        "labour_rules",
+        {"task_type_id": _ID, "vehicle_category": "car_sedan"},
+        source="labour_rule.get_by_task_and_vehicle",
+    ),
+    QueryShape(
+        "service_pricing",
+        {"store_id": _ID, "service_id": {"$in": [_ID]}, "vehicle_category": {"$in": ["car_sedan"]}},
+        source="quotation.build_quotation",
+    ),
+    QueryShape(
+        "labour_rules",
+        {"task_type_id": {"$in": [_ID]}, "vehicle_category": {"$in": ["car_sedan"]}},
+        source="quotation.build_quotation",
+    ),
+    QueryShape(
+        "service_pricing",
+        {"store_id": _ID, "vehicle_category": "car_sedan"},
+        source="catalog_bundle.build_catalog",
+    ),
+    QueryShape("store_admin", {"id": _ID}, source="store_admin.get_store_by_id"),
+    QueryShape(
+        "store_admin",
+        {"type": "hub"},
+        sort=[("created_at", DESCENDING), ("id", DESCENDING)],
+        source="store_admin.get_stores",
+    ),
+    QueryShape(
+        "store_admin",
+        {},
+        sort=[("created_at", DESCENDING), ("id", DESCENDING)],
+        source="store_admin.get_stores (paged)",
+    ),
+    QueryShape("store_admin", {"alias": "AC24XYZ123", "password": "x"}, source="store_admin.store_admin_login"),
+    QueryShape("admin_users", {"username": "admin"}, source="admin_user.login_admin"),
+]
+
+
+# ---------------------------
+# 🔧 Reconciliation
+# ---------------------------
+def _normalize_key(key: Any) -> list[tuple[str, Any]]:
+    items = key.items() if hasattr(key, "items") else key
+    return [(field, int(direction) if isinstance(direction, float) else direction) for field, direction in items]
+
+
+async def ensure_indexes(db) -> dict[str, list[str]]:
+    """
+    Create every declared index that is missing and rebuild any whose
+    definition drifted. Undeclared indexes are left alone.
+
+    Returns:
+        dict: Collection name -> names of indexes created in this run.
+    """
+    created: dict[str, list[str]] = {}
+
+    for collection_name, models in INDEXES.items():
+        collection = db[collection_name]
+        existing = await collection.index_information()
+
+        to_create = []
+        replaced: dict[str, dict] = {}
+        for model in models:
+            doc = model.document
+            name = doc["name"]
+            key = _normalize_key(doc["key"])
+            unique = bool(doc.get("unique", False))
+
+            same_name = existing.get(name)
+            if same_name:
+                if _normalize_key(same_name["key"]) == key and bool(same_name.get("unique", False)) == unique:
+                    continue
+                logger.info("Index %s.%s drifted, rebuilding", collection_name, name)
+                await collection.drop_index(name)
+                replaced[name] = {**same_name, "name": name}
+            else:
+                # Same key under another name (e.g. created by hand) blocks creation
+                for other_name, info in existing.items():
+                    if other_name != "_id_" and _normalize_key(info["key"]) == key:
+                        logger.info("Renaming index %s.%s -> %s", collection_name, other_name, name)
+                        await collection.drop_index(other_name)
+                        replaced[name] = {**info, "name": other_name}
+            to_create.append(model)
+
+        for model in to_create:
+            name = model.document["name"]
+            try:
+                await collection.create_indexes([model])
+            except OperationFailure as e:
+                # e.g. duplicate data blocking a unique index; keep reconciling the rest
+                logger.error("Failed to create index %s.%s: %s", collection_name, name, e)
+                if model.document.get("unique"):
+                    duplicates = await find_duplicates(collection, model, limit=5)
+                    if duplicates:
+                        logger.error(
+                            "Unique index %s.%s is blocked by duplicates, e.g. %s; "
+                            "list them with `python -m app.db.indexes --duplicates`",
+                            collection_name, name, [group["_id"] for group in duplicates],
+                        )
+                previous = replaced.get(name)
+                if previous:
+                    # Put the dropped definition back so queries keep their index
+                    await collection.create_index(
+                        _normalize_key(previous["key"]),
+                        name=previous["name"],
+                        unique=bool(previous.get("unique", False)),
+                    )
+                continue
+            created.setdefault(collection_name, []).append(name)
+
+    if created:
+        logger.info("Created indexes: %s", created)
+    return created
+
+
+async def find_duplicates(collection, model: IndexModel, limit: Optional[int] = None) -> list[dict]:
+    """
+    Groups of documents sharing the key of a unique index.
+
+    Returns:
+        list: ``{"_id": {field: value}, "ids": [...], "count": n}`` per duplicated key.
+    """
+    fields = [field for field, _ in _normalize_key(model.document["key"])]
+    pipeline = [
+        {"$group": {
+            "_id": {field.replace(".", "_"): f"${field}" for field in fields},
+            "ids": {"$push": {"$ifNull": ["$id", "$_id"]}},
+            "count": {"$sum": 1},
+        }},
+        {"$match": {"count": {"$gt": 1}}},
+        {"$sort": {"count": -1}},
+    ]
+    if limit:
+        pipeline.append({"$limit": limit})
+    return await collection.aggregate(pipeline, allowDiskUse=True).to_list(None)
+
+
+# ---------------------------
+# 🔍 Check Mode
+# ---------------------------
+def _plan_stages(plan: Any) -> list[str]:
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(_plan_stages(value))
+    elif isinstance(plan, list):
+        for item in plan:
+            stages.extend(_plan_stages(item))
+    return stages
+
+
+async def check_query_shapes(db) -> list[tuple[QueryShape, list[str]]]:
+    """
+    Run ``explain()`` on every registered query shape.
+
+    Returns:
+        list: (shape, winning plan stages) for each shape that still COLLSCANs.
+    """
+    failures = []
+    for shape in QUERY_SHAPES:
+        cursor = db[shape.collection].find(shape.filter)
+        if shape.sort:
+            cursor = cursor.sort(shape.sort)
+        explained = await cursor.explain()
+        stages = _plan_stages(explained["queryPlanner"]["winningPlan"])
+        if "COLLSCAN" in stages:
+            failures.append((shape, stages))
+    return failures
+
+
+async def _main(check: bool, duplicates: bool = False) -> int:
+    from app.db.mongo import db
+
+    if duplicates:
+        found = 0
+        for collection_name, models in INDEXES.items():
+            for model in models:
+                if not model.document.get("unique"):
+                    continue
+                for group in await find_duplicates(db[collection_name], model):
+                    found += 1
+                    print(f"❌ {collection_name}.{model.document['name']} {group['_id']}: "
+                          f"{group['count']} documents {group['ids']}")
+        if found:
+            return 1
+        print("✅ No duplicates blocking unique indexes")
+        return 0
+
+    if not check:
+        created = await ensure_indexes(db)
+        print(f"✅ Indexes reconciled, created: {created or 'none'}")
+        return 0
+
+    failures = await check_query_shapes(db)
+    for shape, stages in failures:
+        print(f"❌ COLLSCAN on {shape.collection} {shape.filter} ({shape.source}): {' > '.join(stages)}")
+    if failures:
+        return 1
+    print(f"✅ All {len(QUERY_SHAPES)} query shapes use an index")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reconcile or verify MongoDB indexes.")
+    parser.add_argument("--check", action="store_true", help="explain() every router query shape and fail on COLLSCAN")
+    parser.add_argument("--duplicates", action="store_true", help="list duplicates blocking unique indexes")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(asyncio.run(_main(args.check, args.duplicates)))
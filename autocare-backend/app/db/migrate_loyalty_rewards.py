@@ -0,0 +1,43 @@
+# app/db/migrate_loyalty_rewards.py
+
+"""
+One-shot migration of embedded loyalty reward history into ``loyalty_rewards``.
+
+Moves every legacy card's ``reward_history`` into buckets and trims the card
+to its most recent entries. Safe to re-run: migrated cards (those with a
+``reward_count``) are skipped and bucket writes are idempotent upserts.
+
+    python -m app.db.migrate_loyalty_rewards
+"""
+
+import asyncio
+import logging
+import sys
+
+logger = logging.getLogger(__name__)
+
+
+async def _main() -> int:
+    from app.db.mongo import db
+    from app.utils.loyalty import migrate_card
+
+    cards = db.loyalty_cards.find(
+        {"reward_count": {"$exists": False}},
+        {"_id": 0, "id": 1, "reward_history": 1},
+    ).batch_size(200)
+
+    migrated = moved = 0
+    async for card in cards:
+        count = await migrate_card(card)
+        if count is not None:
+            migrated += 1
+            moved += count
+            logger.info("Migrated card %s (%d entries)", card["id"], count)
+
+    print(f"✅ Migrated {migrated} card(s), {moved} reward entries moved to loyalty_rewards")
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(asyncio.run(_main()))
@@ -1,8 +1,36 @@
 # app/db/mongo.py
 
-from motor.motor_asyncio import AsyncIOMotorClient
+"""
+MongoDB client lifecycle.
+
+The Motor client is created by ``connect()`` from the FastAPI lifespan, inside
+each worker's event loop, and closed by ``close()`` on shutdown. CLI scripts
+that never run the lifespan get one lazily on first use.
+
+Modules keep importing ``db`` / ``client`` and binding collections at import
+time (``db["vehicles"]``): these are thin proxies that resolve to the live
+client on each use (and fail fast while the ``app.utils.db_guard`` circuit
+breaker is open). ``catalog_db`` is the same database with the catalog read
+preference (``MONGO_CATALOG_READ_PREFERENCE``, default ``secondaryPreferred``)
+for reference-data reads that tolerate replication lag.
+
+Pool and timeout settings come from the environment; only variables that are
+set are passed, so anything else keeps the URI / driver default:
+
+    MONGO_MAX_POOL_SIZE, MONGO_MIN_POOL_SIZE (default 10), MONGO_MAX_IDLE_TIME_MS,
+    MONGO_CONNECT_TIMEOUT_MS, MONGO_SERVER_SELECTION_TIMEOUT_MS,
+    MONGO_SOCKET_TIMEOUT_MS, MONGO_WAIT_QUEUE_TIMEOUT_MS,
+    MONGO_COMPRESSORS (e.g. "zstd,snappy,zlib")
+"""
+
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import ReadPreference
 import os
 
+from app.utils.db_guard import BreakerListener, breaker
+from app.utils.metrics import mongo_listeners
+from app.utils.query_budget import QueryTrackerListener
+
 # ✅ Load from .env only in local environment
 if os.getenv("ENV", "local") == "local":
     from dotenv import load_dotenv
@@ -14,6 +42,124 @@ MONGO_URI = os.getenv("MONGO_URI") or os.getenv("MONGODB_URI")
 if not MONGO_URI:
     raise ValueError("❌ MongoDB URI not found. Set either MONGO_URI or MONGODB_URI.")
 
-# ✅ Initialize MongoDB client
-client = AsyncIOMotorClient(MONGO_URI)
-db = client["autocare"]
+DB_NAME = "autocare"
+
+_READ_PREFERENCES = {
+    "primary": ReadPreference.PRIMARY,
+    "primaryPreferred": ReadPreference.PRIMARY_PREFERRED,
+    "secondary": ReadPreference.SECONDARY,
+    "secondaryPreferred": ReadPreference.SECONDARY_PREFERRED,
+    "nearest": ReadPreference.NEAREST,
+}
+CATALOG_READ_PREFERENCE = _READ_PREFERENCES[os.getenv("MONGO_CATALOG_READ_PREFERENCE", "secondaryPreferred")]
+
+_POOL_OPTIONS = {
+    "maxPoolSize": "MONGO_MAX_POOL_SIZE",
+    "minPoolSize": "MONGO_MIN_POOL_SIZE",
+    "maxIdleTimeMS": "MONGO_MAX_IDLE_TIME_MS",
+    "connectTimeoutMS": "MONGO_CONNECT_TIMEOUT_MS",
+    "serverSelectionTimeoutMS": "MONGO_SERVER_SELECTION_TIMEOUT_MS",
+    "socketTimeoutMS": "MONGO_SOCKET_TIMEOUT_MS",
+    "waitQueueTimeoutMS": "MONGO_WAIT_QUEUE_TIMEOUT_MS",
+}
+_DEFAULTS = {"MONGO_MIN_POOL_SIZE": "10"}
+
+
+def client_options() -> dict:
+    options = {}
+    for option, env in _POOL_OPTIONS.items():
+        value = os.getenv(env, _DEFAULTS.get(env))
+        if value:
+            options[option] = int(value)
+    if os.getenv("MONGO_COMPRESSORS"):
+        options["compressors"] = os.getenv("MONGO_COMPRESSORS")
+    # Command / pool timings feed /metrics, the per-request Server-Timing header and the circuit breaker
+    options["event_listeners"] = [*mongo_listeners(), QueryTrackerListener(), BreakerListener()]
+    return options
+
+
+_client = None
+
+
+def connect() -> AsyncIOMotorClient:
+    """Create the client for this process (idempotent)."""
+    global _client
+    if _client is None:
+        _client = AsyncIOMotorClient(MONGO_URI, **client_options())
+    return _client
+
+
+def close() -> None:
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
+
+
+# ---------------------------
+# 🔹 Import-time proxies
+# ---------------------------
+class _ClientProxy:
+    def __getattr__(self, name):
+        return getattr(connect(), name)
+
+
+class _CollectionProxy:
+    __slots__ = ("_database", "_name")
+
+    def __init__(self, database: "_DatabaseProxy", name: str):
+        self._database = database
+        self._name = name
+
+    def __getattr__(self, name):
+        return getattr(self._database._collection(self._name), name)
+
+    def __getitem__(self, name):
+        return self._database._collection(self._name)[name]
+
+    def __repr__(self):
+        return f"<collection proxy {self._database._name}.{self._name}>"
+
+
+class _DatabaseProxy:
+    def __init__(self, name: str, **options):
+        self._name = name
+        self._options = options
+        self._proxies: dict[str, _CollectionProxy] = {}
+        self._bound_client = None
+        self._database = None
+        self._collections: dict = {}
+
+    def _target(self):
+        client = connect()
+        if client is not self._bound_client:  # first use, or reconnected
+            self._database = client.get_database(self._name, **self._options)
+            self._collections = {}
+            self._bound_client = client
+        return self._database
+
+    def _collection(self, name: str):
+        breaker.check()  # fail fast while MongoDB is known to be down
+        database = self._target()
+        collection = self._collections.get(name)
+        if collection is None:
+            collection = self._collections[name] = database[name]
+        return collection
+
+    def __getitem__(self, name: str) -> _CollectionProxy:
+        proxy = self._proxies.get(name)
+        if proxy is None:
+            proxy = self._proxies[name] = _CollectionProxy(self, name)
+        return proxy
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if hasattr(AsyncIOMotorDatabase, name):  # a database method/property, not a collection
+            return getattr(self._target(), name)
+        return self[name]
+
+
+client = _ClientProxy()
+db = _DatabaseProxy(DB_NAME)
+catalog_db = _DatabaseProxy(DB_NAME, read_preference=CATALOG_READ_PREFERENCE)
@@ -0,0 +1,34 @@
+# app/db/rebuild_store_stats.py
+
+"""
+Recompute per-store daily rollups (``store_daily_stats``) from raw
+transactions and bookings.
+
+    python -m app.db.rebuild_store_stats
+    python -m app.db.rebuild_store_stats --store-id <id> --from 2025-01-01 --to 2025-01-31
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+from datetime import date
+from typing import Optional
+
+
+async def _main(store_id: Optional[str], from_date: Optional[date], to_date: Optional[date]) -> int:
+    from app.utils.rollups import rebuild
+
+    count = await rebuild(store_id, from_date, to_date)
+    print(f"✅ Rebuilt {count} store day(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild per-store daily rollups from raw data.")
+    parser.add_argument("--store-id", help="only rebuild this store")
+    parser.add_argument("--from", dest="from_date", type=date.fromisoformat, help="first day (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="to_date", type=date.fromisoformat, help="last day (YYYY-MM-DD)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(asyncio.run(_main(args.store_id, args.from_date, args.to_date)))
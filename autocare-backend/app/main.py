@@ -1,5 +1,21 @@
-from fastapi import FastAPI
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from pymongo.errors import ConnectionFailure, ExecutionTimeout, PyMongoError
+
+from app.db import mongo
+from app.db.mongo import db
+from app.db.indexes import ensure_indexes
+from app.utils.serialization import AppJSONResponse
+from app.utils.catalog_cache import catalog_cache
+from app.utils.db_guard import BREAKER_COOLDOWN, DbTimeBudgetMiddleware, breaker
+from app.utils.hub_graph import hub_graph
+from app.utils.metrics import METRICS_ENABLED, MetricsMiddleware, render as render_metrics
+from app.utils.query_budget import QueryBudgetMiddleware
 
 # ✅ Route Modules
 from app.routes import (
@@ -18,12 +34,79 @@ from app.routes import (
     services,
     service_pricing,
     labour_rule,  # ✅ Newly added labour rule route
+    export,
+    imports,
+    availability,
+    store_stats,
+    search,
+    catalog,
 )
 
+logger = logging.getLogger(__name__)
+
+WARM_CONNECTIONS = int(os.getenv("MONGO_WARM_CONNECTIONS", os.getenv("MONGO_MIN_POOL_SIZE", "10")))
+WARM_UP_MAX_BACKOFF = 30.0
+
+
+async def warm_up(app: FastAPI):
+    """Connect, fill the pool and prime caches; ``/ready`` reports OK once this finishes."""
+    client = mongo.connect()
+    backoff = 1.0
+    while True:
+        try:
+            # ✅ Server selection + handshake, then open connections concurrently so the
+            #    first requests find them established
+            await client.admin.command("ping")
+            await asyncio.gather(*(client.admin.command("ping") for _ in range(WARM_CONNECTIONS)))
+            break
+        except PyMongoError as e:
+            logger.warning("MongoDB not reachable yet (%s); retrying in %.0fs", e, backoff)
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, WARM_UP_MAX_BACKOFF)
+
+    # ✅ Reconcile declared indexes (app/db/indexes.py) before serving
+    try:
+        await ensure_indexes(db)
+    except PyMongoError as e:
+        logger.error("Index reconciliation failed: %s", e)
+    # ✅ Warm the in-memory garage <-> hub graph
+    try:
+        await hub_graph.refresh()
+    except PyMongoError as e:
+        logger.error("Hub graph warm-up failed: %s", e)
+    # ✅ Build the cached catalog responses
+    try:
+        await catalog_cache.prime()
+    except PyMongoError as e:
+        logger.error("Catalog cache warm-up failed: %s", e)
+
+    app.state.ready = True
+    logger.info("✅ Warm-up complete, ready to serve")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # ✅ One client per worker, created inside its event loop
+    app.state.ready = False
+    task = asyncio.create_task(warm_up(app))
+    try:
+        yield
+    finally:
+        app.state.ready = False
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        mongo.close()
+
+
 app = FastAPI(
     title="AutoCare API",
     version="1.0.0",
     description="Backend for AutoCare24 Admin Dashboard",
+    lifespan=lifespan,
+    default_response_class=AppJSONResponse,
 )
 
 # ✅ CORS Setup
@@ -40,21 +123,47 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+# ✅ Per-route MongoDB time budgets (maxTimeMS from the time left in the request)
+app.add_middleware(DbTimeBudgetMiddleware)
+
+# ✅ Per-request Mongo round trips / DB time (Server-Timing) and query budgets
+app.add_middleware(QueryBudgetMiddleware)
+
+# ✅ Request latency / in-flight metrics (outermost, so CORS time is included)
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+# ✅ MongoDB down, circuit open or time budget spent: fail fast with 503
+@app.exception_handler(ConnectionFailure)
+@app.exception_handler(ExecutionTimeout)
+async def database_unavailable(request: Request, exc: PyMongoError):
+    breaker.record_exception(exc)
+    logger.warning("%s %s: database unavailable: %s", request.method, request.url.path, exc)
+    return AppJSONResponse(
+        {"detail": "Database temporarily unavailable, please retry"},
+        status_code=503,
+        headers={"Retry-After": str(int(BREAKER_COOLDOWN))},
+    )
+
 # ✅ Admin + Store Management APIs
 app.include_router(admin_user.router, prefix="/api", tags=["Admin Users"])
 app.include_router(store_admin.router, prefix="/api", tags=["Store Admin"])
+app.include_router(store_stats.router, prefix="/api", tags=["Store Stats"])
 app.include_router(task_types.router, prefix="/api", tags=["Task Types"])
 app.include_router(store_task_capacities.router, prefix="/api", tags=["Store Task Capacities"])
 app.include_router(garage_hub_tags.router, prefix="/api", tags=["Garage Hub Tags"])
 
 # ✅ Customer Ecosystem APIs
 app.include_router(customer.router, prefix="/api", tags=["Customers"])
+app.include_router(search.router, prefix="/api", tags=["Search"])
 app.include_router(vehicle.router, prefix="/api", tags=["Vehicles"])
 app.include_router(loyalty_card.router, prefix="/api", tags=["Loyalty Cards"])
 app.include_router(vehicle_transaction.router, prefix="/api", tags=["Vehicle Transactions"])
 app.include_router(booking.router, prefix="/api", tags=["Bookings"])
+app.include_router(availability.router, prefix="/api", tags=["Availability"])
 
 # ✅ Service Ecosystem APIs
 app.include_router(addons.router, prefix="/api", tags=["Addons"])
@@ -62,8 +171,26 @@ app.include_router(subservices.router, prefix="/api", tags=["Subservices"])
 app.include_router(services.router, prefix="/api", tags=["Services"])
 app.include_router(service_pricing.router, prefix="/api", tags=["Service Pricing"])
 app.include_router(labour_rule.router, prefix="/api", tags=["Labour Rules"])  # ✅ New
+app.include_router(catalog.router, prefix="/api", tags=["Catalog"])
+
+# ✅ Bulk Export / Import APIs
+app.include_router(export.router, prefix="/api", tags=["Export"])
+app.include_router(imports.router, prefix="/api", tags=["Import"])
+
+# ✅ Prometheus metrics
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
 
 # ✅ Health Check
 @app.get("/")
 async def root():
     return {"message": "AutoCare Backend is up and running 🚀"}
+
+# ✅ Readiness: connection pool warm and caches primed
+@app.get("/ready", include_in_schema=False)
+async def ready():
+    if not getattr(app.state, "ready", False):
+        return AppJSONResponse({"status": "warming"}, status_code=503)
+    return {"status": "ready"}
@@ -0,0 +1,19 @@
+from pydantic import BaseModel
+from typing import List, Literal
+from datetime import date
+
+
+class SlotAvailability(BaseModel):
+    slot: str          # "09".."18" for per_hour task types, "day" for max_per_day
+    capacity: int
+    reserved: int
+    available: int
+
+
+class TaskAvailability(BaseModel):
+    store_id: str
+    task_type_id: str
+    task_name: str
+    slot_type: Literal["per_hour", "max_per_day"]
+    date: date
+    slots: List[SlotAvailability]
@@ -0,0 +1,15 @@
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+from app.models.service import ServiceInDB
+
+MAX_BATCH_IDS = 500
+
+
+class BatchGetRequest(BaseModel):
+    ids: List[str] = Field(..., min_length=1, max_length=MAX_BATCH_IDS)
+    fields: Optional[str] = None  # same whitelist as the resource's `fields=` query parameter
+
+
+class ServiceBatchResponse(BaseModel):
+    items: Dict[str, ServiceInDB]
+    missing: List[str]
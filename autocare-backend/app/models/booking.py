@@ -77,21 +77,57 @@ class BookingInitResponse(BaseModel):
 # Booking Task Update
 # ---------------------------
 
+# Prices sent by the client are ignored; the quotation engine resolves
+# them from the catalog (app/utils/quotation.py).
+
 class BookingTaskAddon(BaseModel):
+    id: Optional[UUID] = None  # resolved by name among the service's addons when missing
     name: str
-    price: float
+    price: Optional[float] = None
 
 class BookingTaskSubservice(BaseModel):
     id: UUID
-    name: str
-    price: float
+    name: Optional[str] = None
+    price: Optional[float] = None
 
 class BookingTaskInput(BaseModel):
     service_id: UUID
     vehicle_category: VehicleCategory
-    price: float
+    price: Optional[float] = None
     addons: Optional[List[BookingTaskAddon]] = []
     subservices: Optional[List[BookingTaskSubservice]] = []
 
 class BookingTaskUpdateRequest(BaseModel):
     tasks: List[BookingTaskInput]
+    # When set, one unit of store capacity is reserved per task (app/utils/availability.py)
+    slot_date: Optional[date] = None
+    slot_hour: Optional[int] = Field(None, ge=0, le=23)  # required for per_hour task types
+
+# ---------------------------
+# Quotation
+# ---------------------------
+
+class QuotedItem(BaseModel):
+    id: str
+    name: str
+    price: float
+
+class QuotedTask(BaseModel):
+    service_id: str
+    service_name: str
+    task_type_id: str
+    vehicle_category: VehicleCategory
+    base_price: float
+    labour_charge: float
+    addons: List[QuotedItem] = []
+    subservices: List[QuotedItem] = []
+    tax_percent: float
+    include_tax: bool
+    tax_amount: float
+    total: float
+
+class Quotation(BaseModel):
+    tasks: List[QuotedTask]
+    subtotal: float
+    tax_amount: float
+    total: float
@@ -0,0 +1,44 @@
+from pydantic import BaseModel
+from typing import List, Literal, Optional
+from datetime import datetime
+from app.models.service import VehicleCategory
+
+
+class CatalogItem(BaseModel):
+    id: str
+    name: str
+    price: float
+
+
+class CatalogSubservice(CatalogItem):
+    is_optional: bool = True
+
+
+class CatalogLabour(BaseModel):
+    charge_type: Literal["fixed", "percentage"]
+    value: float
+    amount: Optional[float] = None  # None for a percentage rule on an unpriced service
+
+
+class CatalogService(BaseModel):
+    id: str
+    name: str
+    task_type_id: str
+    task_type_name: Optional[str] = None
+    tags: List[str] = []
+    duration_minutes: Optional[int] = None
+    is_visible_to_customer: bool = True
+    # Store pricing for the requested category; None when the store has not priced it
+    base_price: Optional[float] = None
+    tax_percent: Optional[float] = None
+    include_tax: Optional[bool] = None
+    labour: Optional[CatalogLabour] = None
+    addons: List[CatalogItem] = []
+    subservices: List[CatalogSubservice] = []
+
+
+class CatalogBundle(BaseModel):
+    store_id: str
+    vehicle_category: VehicleCategory
+    services: List[CatalogService]
+    generated_at: datetime
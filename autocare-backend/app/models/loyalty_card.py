@@ -17,7 +17,8 @@ class LoyaltyCard(BaseModel):
     issued_at: datetime = Field(default_factory=datetime.utcnow)
     last_updated: datetime = Field(default_factory=datetime.utcnow)
     referred_by: Optional[UUID] = None
-    reward_history: List[RewardEntry] = []
+    reward_count: int = 0
+    reward_history: List[RewardEntry] = []  # most recent entries only; full history in loyalty_rewards
 
     class Config:
         allow_population_by_field_name = True
@@ -0,0 +1,28 @@
+from pydantic import BaseModel
+from typing import Dict, List
+from datetime import date
+
+
+class DailyStoreStats(BaseModel):
+    date: date
+    revenue: float = 0.0
+    revenue_by_mode: Dict[str, float] = {}
+    transactions: int = 0
+    bookings: int = 0
+    bookings_by_status: Dict[str, int] = {}
+
+
+class StoreStatsTotals(BaseModel):
+    revenue: float = 0.0
+    revenue_by_mode: Dict[str, float] = {}
+    transactions: int = 0
+    bookings: int = 0
+    bookings_by_status: Dict[str, int] = {}
+
+
+class StoreStats(BaseModel):
+    store_id: str
+    from_date: date
+    to_date: date
+    totals: StoreStatsTotals
+    days: List[DailyStoreStats]
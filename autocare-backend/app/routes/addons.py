@@ -1,9 +1,12 @@
-from fastapi import APIRouter, HTTPException
-from app.db.mongo import db
+from fastapi import APIRouter, HTTPException, Query, Request
+from app.db.mongo import catalog_db, db
 from app.models.service import AddonCreate, AddonInDB
+from app.utils.catalog_cache import catalog_cache
+from app.utils.serialization import model_response, serialize_list
+from app.utils.pagination import MAX_LIMIT, catalog_page
 from uuid import uuid4
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 
 router = APIRouter()
 
@@ -17,13 +20,28 @@ async def create_addon(data: AddonCreate):
         "created_at": datetime.utcnow()
     }
     await db.addons.insert_one(addon)
-    return AddonInDB(**addon)
+    await catalog_cache.invalidate("addons")
+    return model_response(AddonInDB, addon)
+
+
+async def load_addons() -> bytes:
+    addons = await catalog_db.addons.find().to_list(None)
+    return serialize_list(AddonInDB, addons)
+
+
+catalog_cache.register("addons", ("addons",), load_addons)
 
 
 @router.get("/addons", response_model=List[AddonInDB])
-async def get_all_addons():
-    addons = await db.addons.find().to_list(None)
-    return [AddonInDB(**a) for a in addons]
+async def get_all_addons(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = Query(None),
+):
+    if limit or cursor:
+        return await catalog_page(db.addons, {}, AddonInDB, limit=limit, cursor=cursor)
+
+    return await catalog_cache.respond(request, "addons", ("addons",), load_addons)
 
 
 @router.patch("/addons/{addon_id}", response_model=AddonInDB)
@@ -36,7 +54,8 @@ async def update_addon(addon_id: str, data: AddonCreate):
     )
     if not result:
         raise HTTPException(status_code=404, detail="Addon not found")
-    return AddonInDB(**result)
+    await catalog_cache.invalidate("addons")
+    return model_response(AddonInDB, result)
 
 
 @router.delete("/addons/{addon_id}")
@@ -44,4 +63,5 @@ async def delete_addon(addon_id: str):
     result = await db.addons.delete_one({"_id": addon_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Addon not found")
+    await catalog_cache.invalidate("addons")
     return {"message": "Addon deleted"}
@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Query
+from app.models.availability import TaskAvailability
+from app.utils.availability import get_availability
+from datetime import date
+
+router = APIRouter()
+
+
+@router.get("/availability", response_model=TaskAvailability)
+async def get_slot_availability(
+    store_id: str = Query(...),
+    task_type_id: str = Query(...),
+    date: date = Query(...),
+):
+    """
+    Free slots for a store and task type on a given date.
+
+    Per-hour task types report one slot per opening hour; max-per-day task
+    types report a single "day" slot.
+    """
+    return await get_availability(store_id, task_type_id, date)
@@ -4,9 +4,17 @@ from app.models.booking import (
     BookingInitResponse,
     BookingTaskUpdateRequest,
 )
-from app.db.mongo import db
+from app.db.mongo import client, db
+from app.utils.availability import release_slots, reservation_delta, reserve_slots
+from app.utils.quotation import build_quotation
+from app.utils.rollups import record_booking_created, record_booking_status
+from app.utils.search_keys import add_vehicle_keys, search_keys
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 from uuid import uuid4
-from datetime import datetime
+from datetime import datetime, time
+from collections import Counter
+import os
 
 router = APIRouter()
 
@@ -15,6 +23,9 @@ customer_collection = db["customers"]
 vehicle_collection = db["vehicles"]
 booking_collection = db["bookings"]
 
+# Wrap booking init in a multi-document transaction (requires a replica set)
+USE_TRANSACTIONS = os.getenv("BOOKING_USE_TRANSACTIONS", "false").lower() in ("1", "true", "yes")
+
 # 🔁 Utility
 def normalize_email(data: dict):
     if data.get("email") == "":
@@ -25,72 +36,105 @@ def normalize_email(data: dict):
 # -----------------------------------------------
 # 🔧 INIT BOOKING
 # -----------------------------------------------
-@router.post("/bookings/init", response_model=BookingInitResponse)
-async def init_booking(payload: BookingInitRequest):
-    try:
-        customer_data = normalize_email(payload.customer.dict())
-
-        # 🔍 Check if customer exists (by phone/email)
-        query = {"phone_number": customer_data["phone_number"]}
-        if customer_data.get("email"):
-            query["$or"] = [
+async def _upsert_customer(customer_data: dict, now: datetime, session=None) -> str:
+    # Match by phone (or email when given); unique phone index makes concurrent inits converge
+    query = {"phone_number": customer_data["phone_number"]}
+    if customer_data.get("email"):
+        query = {
+            "$or": [
                 {"phone_number": customer_data["phone_number"]},
                 {"email": customer_data["email"]},
             ]
-
-        existing_customer = await customer_collection.find_one(query)
-        if existing_customer:
-            customer_id = existing_customer["id"]
-        else:
-            customer_id = str(uuid4())
-            customer_data.update({
-                "id": customer_id,
-                "created_at": datetime.utcnow(),
-                "updated_at": datetime.utcnow(),
-                "is_active": True,
-            })
-            await customer_collection.insert_one(customer_data)
-
-        # 🚗 Check if vehicle exists (by number + customer_id)
-        vehicle_data = payload.vehicle.dict()
-        vehicle_query = {
-            "vehicle_number": vehicle_data["vehicle_number"],
-            "customer_id": customer_id,
         }
 
-        existing_vehicle = await vehicle_collection.find_one(vehicle_query)
-        if existing_vehicle:
-            vehicle_id = existing_vehicle["id"]
-        else:
-            vehicle_id = str(uuid4())
-            vehicle_data.update({
-                "id": vehicle_id,
-                "customer_id": customer_id,
-                "created_at": datetime.utcnow(),
-                "updated_at": datetime.utcnow(),
-            })
-            await vehicle_collection.insert_one(vehicle_data)
-
-        # 📋 Create new booking with pending status
-        booking_id = str(uuid4())
-        booking = {
-            "id": booking_id,
+    customer = await customer_collection.find_one_and_update(
+        query,
+        {"$setOnInsert": {
+            **customer_data,
+            "id": str(uuid4()),
+            "created_at": now,
+            "updated_at": now,
+            "is_active": True,
+            "search_keys": search_keys(customer_data),
+        }},
+        projection={"id": 1},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+        session=session,
+    )
+    return customer["id"]
+
+
+async def _upsert_vehicle(vehicle_data: dict, customer_id: str, now: datetime, session=None) -> str:
+    # Unique (vehicle_number, customer_id) index backs the upsert
+    vehicle = await vehicle_collection.find_one_and_update(
+        {"vehicle_number": vehicle_data["vehicle_number"], "customer_id": customer_id},
+        {"$setOnInsert": {
+            **vehicle_data,
+            "id": str(uuid4()),
             "customer_id": customer_id,
-            "vehicle_id": vehicle_id,
-            "store_id": payload.store_id,
-            "booking_source": payload.booking_source,
-            "status": "pending",
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow(),
-        }
-        await booking_collection.insert_one(booking)
+            "created_at": now,
+            "updated_at": now,
+        }},
+        projection={"id": 1},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+        session=session,
+    )
+    return vehicle["id"]
+
+
+async def _init_booking(payload: BookingInitRequest, session=None) -> BookingInitResponse:
+    now = datetime.utcnow()
+    customer_data = normalize_email(payload.customer.model_dump())
+    vehicle_data = payload.vehicle.model_dump()
+    if vehicle_data.get("last_service_date"):
+        # BSON has no date-only type
+        vehicle_data["last_service_date"] = datetime.combine(vehicle_data["last_service_date"], time.min)
+
+    customer_id = await _upsert_customer(customer_data, now, session)
+    vehicle_id = await _upsert_vehicle(vehicle_data, customer_id, now, session)
+    await add_vehicle_keys({customer_id: [vehicle_data["vehicle_number"]]}, session)
+
+    # 📋 Create new booking with pending status
+    booking_id = str(uuid4())
+    booking = {
+        "id": booking_id,
+        "customer_id": customer_id,
+        "vehicle_id": vehicle_id,
+        "store_id": payload.store_id,
+        "booking_source": payload.booking_source,
+        "status": "pending",
+        "created_at": now,
+        "updated_at": now,
+    }
+    await booking_collection.insert_one(booking, session=session)
+    await record_booking_created(payload.store_id, now, booking["status"], session)
+
+    return BookingInitResponse(
+        message="Booking initialized",
+        booking_id=booking_id,
+        customer_id=customer_id,
+        vehicle_id=vehicle_id,
+    )
 
-        return BookingInitResponse(
-            message="Booking initialized",
-            booking_id=booking_id,
-            customer_id=customer_id,
-            vehicle_id=vehicle_id,
-        )
+
+@router.post("/bookings/init", response_model=BookingInitResponse)
+async def init_booking(payload: BookingInitRequest):
+    try:
+        # Two concurrent upserts of the same new customer/vehicle: the loser hits the
+        # unique index, and a second pass matches the winner's document.
+        for attempt in range(2):
+            try:
+                if not USE_TRANSACTIONS:
+                    return await _init_booking(payload)
+                async with await client.start_session() as session:
+                    return await session.with_transaction(
+                        lambda s: _init_booking(payload, s)
+                    )
+            except DuplicateKeyError:
+                if attempt:
+                    raise
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to initialize booking: {str(e)}")
@@ -105,37 +149,93 @@ async def add_tasks_to_booking(booking_id: str, payload: BookingTaskUpdateReques
         booking = await booking_collection.find_one({"id": booking_id})
         if not booking:
             raise HTTPException(status_code=404, detail="Booking not found")
-
-        tasks = []
-        total_amount = 0
-
-        for task in payload.tasks:
-            task_dict = task.dict()
-            
-            # Optionally: Fetch service name by ID (if you want to enrich)
-            # service = await db["services"].find_one({"id": str(task.service_id)})
-            # task_dict["service_name"] = service["name"] if service else "Unknown"
-
-            task_dict["service_name"] = "To Be Fetched"
-            task_total = task.price
-            task_total += sum(addon.price for addon in task.addons)
-            task_total += sum(sub.price for sub in task.subservices)
-            total_amount += task_total
-            tasks.append(task_dict)
-
-        await booking_collection.update_one(
-            {"id": booking_id},
-            {
-                "$set": {
-                    "tasks": tasks,
-                    "quotation_amount": total_amount,
-                    "status": "quotation_generated",
-                    "updated_at": datetime.utcnow(),
-                }
-            }
+        if booking.get("status") == "cancelled":
+            raise HTTPException(status_code=400, detail="Booking is cancelled")
+
+        quotation = await build_quotation(booking["store_id"], payload)
+
+        # 🗓️ Tasks are replaced wholesale, and so are their slot reservations. The new
+        #    units are held before the old ones are given back, so freed capacity can
+        #    never be taken by another booking in between.
+        previous = booking.get("slot_reservations")
+        reservations = []
+        if payload.slot_date:
+            units = Counter(t.task_type_id for t in quotation.tasks)
+            reservations = await reserve_slots(
+                booking["store_id"], dict(units), payload.slot_date, payload.slot_hour, held=previous
+            )
+
+        # ✅ Swap only if nobody cancelled or re-slotted the booking meanwhile
+        try:
+            previous_booking = await booking_collection.find_one_and_update(
+                {"id": booking_id, "status": {"$ne": "cancelled"}, "slot_reservations": previous},
+                {
+                    "$set": {
+                        "tasks": [t.model_dump() for t in quotation.tasks],
+                        "quotation": quotation.model_dump(exclude={"tasks"}),
+                        "quotation_amount": quotation.total,
+                        "slot_date": payload.slot_date.isoformat() if payload.slot_date else None,
+                        "slot_hour": payload.slot_hour,
+                        "slot_reservations": reservations,
+                        "status": "quotation_generated",
+                        "updated_at": datetime.utcnow(),
+                    }
+                },
+                projection={"status": 1},
+                return_document=ReturnDocument.BEFORE,
+            )
+        except BaseException:
+            await release_slots(reservation_delta(reservations, previous))
+            raise
+
+        if not previous_booking:
+            await release_slots(reservation_delta(reservations, previous))
+            current = await booking_collection.find_one({"id": booking_id}, {"status": 1})
+            if not current:
+                raise HTTPException(status_code=404, detail="Booking not found")
+            if current.get("status") == "cancelled":
+                raise HTTPException(status_code=400, detail="Booking is cancelled")
+            raise HTTPException(status_code=409, detail="Booking was updated concurrently, please retry")
+
+        await release_slots(reservation_delta(previous, reservations))
+        await record_booking_status(
+            booking["store_id"], booking.get("created_at"), previous_booking.get("status"), "quotation_generated"
         )
 
-        return {"message": "Tasks added", "quotation_amount": total_amount}
+        return {
+            "message": "Tasks added",
+            "quotation_amount": quotation.total,
+            "quotation": quotation,
+        }
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error updating tasks: {str(e)}")
+
+
+# -----------------------------------------------
+# 🔧 CANCEL BOOKING
+# -----------------------------------------------
+@router.post("/bookings/{booking_id}/cancel")
+async def cancel_booking(booking_id: str):
+    """
+    Cancel a booking and release any slot capacity it holds.
+    """
+    booking = await booking_collection.find_one_and_update(
+        {"id": booking_id, "status": {"$ne": "cancelled"}},
+        {
+            "$set": {"status": "cancelled", "updated_at": datetime.utcnow()},
+            "$unset": {"slot_reservations": ""},
+        },
+        projection={"slot_reservations": 1, "store_id": 1, "status": 1, "created_at": 1},
+        return_document=ReturnDocument.BEFORE,
+    )
+    if not booking:
+        if await booking_collection.count_documents({"id": booking_id}, limit=1):
+            raise HTTPException(status_code=400, detail="Booking already cancelled")
+        raise HTTPException(status_code=404, detail="Booking not found")
+
+    await release_slots(booking.get("slot_reservations") or [])
+    await record_booking_status(booking["store_id"], booking.get("created_at"), booking.get("status"), "cancelled")
+    return {"message": "Booking cancelled"}
@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Query, Request
+from app.models.catalog import CatalogBundle
+from app.models.service import VehicleCategory
+from app.utils.catalog_bundle import BUNDLE_COLLECTIONS, build_catalog
+from app.utils.catalog_cache import catalog_cache
+from app.utils.serialization import model_adapter
+from uuid import UUID
+
+router = APIRouter()
+
+
+@router.get("/catalog", response_model=CatalogBundle)
+async def get_catalog(
+    request: Request,
+    store_id: UUID = Query(...),
+    vehicle_category: VehicleCategory = Query(...),
+):
+    """
+    Active services with their addons, subservices, store pricing, tax and
+    labour for one store and vehicle category, pre-joined in a single cached
+    response (honours `If-None-Match`).
+    """
+    async def load() -> bytes:
+        bundle = await build_catalog(str(store_id), vehicle_category)
+        return model_adapter(CatalogBundle).dump_json(bundle)
+
+    key = f"catalog:{store_id}:{vehicle_category}"
+    return await catalog_cache.respond(request, key, BUNDLE_COLLECTIONS, load)
@@ -1,6 +1,14 @@
 from fastapi import APIRouter, HTTPException, Body, Request, Query
 from app.models.customer import CustomerCreate
 from app.db.mongo import db
+from pymongo.errors import DuplicateKeyError
+from app.utils.loyalty import RECENT_REWARDS
+from app.models.batch import BatchGetRequest
+from app.utils.batch import batch_get
+from app.utils.pagination import MAX_LIMIT, clean_ids, fetch_page, page_response
+from app.utils.projection import FIELDS_DESCRIPTION, parse_fields
+from app.utils.search_keys import refresh_customer_keys, search_keys
+from app.utils.serialization import AppJSONResponse
 from uuid import uuid4
 from datetime import datetime
 from typing import Optional
@@ -8,6 +16,17 @@ from typing import Optional
 router = APIRouter()
 customer_collection = db["customers"]
 
+CUSTOMER_FIELDS = frozenset({
+    "full_name", "phone_number", "email", "address", "latitude", "longitude", "tags", "source",
+    "store_id", "onboarded_by", "loyalty_card_id", "is_active", "created_at", "updated_at",
+})
+# Projection for reads without `fields`: search_keys is internal to /search
+CUSTOMER_DEFAULT_PROJECTION = {"search_keys": 0}
+
+
+def customer_projection(fields: Optional[str]) -> dict:
+    return parse_fields(fields, CUSTOMER_FIELDS) or dict(CUSTOMER_DEFAULT_PROJECTION)
+
 # 🔧 Utility: Convert UUID fields to string for MongoDB compatibility
 def stringify_uuid_fields(data: dict, fields: list[str]) -> dict:
     for field in fields:
@@ -38,10 +57,13 @@ async def create_customer(request: Request):
             "updated_at": datetime.utcnow(),
             "is_active": True
         })
+        customer_dict["search_keys"] = search_keys(customer_dict)
 
         await customer_collection.insert_one(customer_dict)
         return {"message": "Customer created", "id": customer_dict["id"]}
 
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail="Customer with this phone number already exists")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
@@ -49,9 +71,13 @@ async def create_customer(request: Request):
 @router.get("/customers")
 async def list_customers(
     store_id: Optional[str] = Query(None),
-    onboarded_by: Optional[str] = Query(None)
+    onboarded_by: Optional[str] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
 ):
     try:
+        projection = customer_projection(fields)
         base_query = {"is_active": True}
 
         if store_id and onboarded_by:
@@ -70,27 +96,106 @@ async def list_customers(
                 {"onboarded_by": onboarded_by}
             ]
 
-        cursor = customer_collection.find(base_query)
-        customers = []
-        async for doc in cursor:
-            doc["id"] = doc.get("id") or str(doc["_id"])
-            doc.pop("_id", None)
-            customers.append(doc)
-
-        return customers
+        customers, next_cursor = await fetch_page(
+            customer_collection, base_query, limit=limit, cursor=cursor, projection=projection
+        )
+        return page_response(clean_ids(customers), next_cursor)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch customers: {str(e)}")
 
+# 📦 Batch get by ids
+@router.post("/customers/batch-get")
+async def batch_get_customers(payload: BatchGetRequest):
+    """
+    Fetch up to 500 customers in one query, keyed by id; unknown ids are listed in `missing`.
+    """
+    items, missing = await batch_get(customer_collection, payload.ids, projection=customer_projection(payload.fields))
+    return AppJSONResponse({"items": items, "missing": missing})
+
 # 👁️ Get a single customer
 @router.get("/customers/{customer_id}")
-async def get_customer(customer_id: str):
-    customer = await customer_collection.find_one({"id": customer_id})
+async def get_customer(
+    customer_id: str,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+):
+    customer = await customer_collection.find_one({"id": customer_id}, customer_projection(fields))
     if not customer:
         raise HTTPException(status_code=404, detail="Customer not found")
 
     customer["id"] = customer.get("id") or str(customer["_id"])
     customer.pop("_id", None)
-    return customer
+    return AppJSONResponse(customer)
+
+# 🧾 Customer 360: profile, vehicles with recent transactions and loyalty card
+def customer_overview_pipeline(customer_id: str, transactions_per_vehicle: int) -> list[dict]:
+    # localField/foreignField + pipeline lookups stay on the customer_id / vehicle_id indexes
+    return [
+        {"$match": {"id": customer_id}},
+        {"$limit": 1},
+        {"$lookup": {
+            "from": "vehicles",
+            "localField": "id",
+            "foreignField": "customer_id",
+            "pipeline": [
+                {"$sort": {"created_at": -1, "id": -1}},
+                {"$lookup": {
+                    "from": "vehicle_transactions",
+                    "localField": "id",
+                    "foreignField": "vehicle_id",
+                    "pipeline": [
+                        {"$sort": {"created_at": -1, "id": -1}},
+                        {"$limit": transactions_per_vehicle},
+                        {"$project": {"_id": 0}},
+                    ],
+                    "as": "recent_transactions",
+                }},
+                {"$project": {"_id": 0}},
+            ],
+            "as": "vehicles",
+        }},
+        {"$lookup": {
+            "from": "loyalty_cards",
+            "localField": "id",
+            "foreignField": "customer_id",
+            "pipeline": [
+                {"$limit": 1},
+                {"$set": {"reward_history": {
+                    "$slice": [{"$ifNull": ["$reward_history", []]}, -RECENT_REWARDS],
+                }}},
+                {"$project": {"_id": 0}},
+            ],
+            "as": "loyalty_card",
+        }},
+        {"$project": {"_id": 0, "search_keys": 0}},
+    ]
+
+
+@router.get("/customers/{customer_id}/overview")
+async def get_customer_overview(
+    customer_id: str,
+    transactions_per_vehicle: int = Query(5, ge=1, le=50),
+):
+    """
+    Everything the customer detail page needs in one aggregation: the customer,
+    their vehicles (newest first) with the latest transactions of each, and the
+    loyalty card with its most recent rewards.
+    """
+    docs = await customer_collection.aggregate(
+        customer_overview_pipeline(customer_id, transactions_per_vehicle)
+    ).to_list(1)
+    if not docs:
+        raise HTTPException(status_code=404, detail="Customer not found")
+
+    customer = docs[0]
+    vehicles = customer.pop("vehicles")
+    cards = customer.pop("loyalty_card")
+    return AppJSONResponse({
+        "customer": customer,
+        "vehicles": vehicles,
+        "loyalty_card": cards[0] if cards else None,
+    })
 
 # 🛠️ Update a customer
 @router.put("/customers/{customer_id}")
@@ -99,15 +204,21 @@ async def update_customer(customer_id: str, updated_data: dict = Body(...)):
         updated_data["email"] = None
 
     stringify_uuid_fields(updated_data, ["store_id", "onboarded_by", "loyalty_card_id"])
+    updated_data.pop("search_keys", None)
     updated_data["updated_at"] = datetime.utcnow()
 
-    result = await customer_collection.update_one(
-        {"id": customer_id},
-        {"$set": updated_data}
-    )
+    try:
+        result = await customer_collection.update_one(
+            {"id": customer_id},
+            {"$set": updated_data}
+        )
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail="Customer with this phone number already exists")
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Customer not found")
 
+    if "full_name" in updated_data or "phone_number" in updated_data:
+        await refresh_customer_keys([customer_id])
     return {"message": "Customer updated"}
 
 # 🧹 Soft delete a customer
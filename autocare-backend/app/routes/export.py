@@ -0,0 +1,144 @@
+from fastapi import APIRouter, Query
+from fastapi.responses import StreamingResponse
+from app.db.mongo import db
+from app.utils.streaming import EXPORT_BATCH_SIZE, csv_rows, gzip_chunks, ndjson_rows
+from datetime import datetime
+from typing import AsyncIterator, Literal, Optional
+
+router = APIRouter()
+
+ExportFormat = Literal["ndjson", "csv"]
+
+CUSTOMER_COLUMNS = [
+    "id", "full_name", "phone_number", "email", "source", "store_id", "onboarded_by",
+    "address.line1", "address.city", "address.pincode", "latitude", "longitude",
+    "tags", "is_active", "created_at", "updated_at",
+]
+# NDJSON rows carry every stored field except internal ones
+CUSTOMER_EXPORT_PROJECTION = {"_id": 0, "search_keys": 0}
+VEHICLE_COLUMNS = [
+    "id", "customer_id", "vehicle_number", "vehicle_type", "brand", "model", "year",
+    "fuel_type", "odometer_km", "last_service_date", "is_primary", "notes", "created_at", "updated_at",
+]
+TRANSACTION_COLUMNS = [
+    "id", "vehicle_id", "customer_id", "store_id", "date", "total_amount",
+    "payment_mode", "paid", "invoice_id", "tasks", "created_at",
+]
+
+
+# 🔁 Utility
+def store_customers_query(store_id: str) -> dict:
+    return {
+        "is_active": True,
+        "$or": [{"store_id": store_id}, {"onboarded_by": store_id}],
+    }
+
+
+def export_response(
+    docs: AsyncIterator[dict],
+    name: str,
+    format: ExportFormat,
+    columns: list[str],
+    compress: bool,
+) -> StreamingResponse:
+    if format == "csv":
+        chunks = csv_rows(docs, columns)
+        media_type, extension = "text/csv", "csv"
+    else:
+        chunks = ndjson_rows(docs)
+        media_type, extension = "application/x-ndjson", "ndjson"
+
+    if compress:
+        chunks = gzip_chunks(chunks)
+        media_type, extension = "application/gzip", f"{extension}.gz"
+
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{name}.{extension}"'},
+    )
+
+
+async def flatten_tasks(docs: AsyncIterator[dict]) -> AsyncIterator[dict]:
+    async for doc in docs:
+        doc["tasks"] = [f"{t.get('task_type')}:{t.get('price')}" for t in doc.get("tasks") or []]
+        yield doc
+
+
+async def vehicles_for_store(store_id: str, batch_size: int) -> AsyncIterator[dict]:
+    """Walk the store's customers in id batches and stream their vehicles per batch."""
+    customer_ids: list[str] = []
+    customers = db["customers"].find(store_customers_query(store_id), {"_id": 0, "id": 1}).batch_size(batch_size)
+
+    async def flush():
+        vehicles = db["vehicles"].find({"customer_id": {"$in": customer_ids}}, {"_id": 0}).batch_size(batch_size)
+        async for vehicle in vehicles:
+            yield vehicle
+
+    async for customer in customers:
+        customer_ids.append(customer["id"])
+        if len(customer_ids) >= batch_size:
+            async for vehicle in flush():
+                yield vehicle
+            customer_ids = []
+    if customer_ids:
+        async for vehicle in flush():
+            yield vehicle
+
+
+# -----------------------------------------------
+# 📤 EXPORTS
+# -----------------------------------------------
+@router.get("/export/customers")
+async def export_customers(
+    store_id: str = Query(...),
+    format: ExportFormat = Query("ndjson"),
+    gzip: bool = Query(False),
+):
+    """
+    Stream every active customer of a store as NDJSON or CSV.
+    """
+    cursor = db["customers"].find(store_customers_query(store_id), CUSTOMER_EXPORT_PROJECTION).batch_size(EXPORT_BATCH_SIZE)
+    return export_response(cursor, f"customers-{store_id}", format, CUSTOMER_COLUMNS, gzip)
+
+
+@router.get("/export/vehicles")
+async def export_vehicles(
+    store_id: str = Query(...),
+    format: ExportFormat = Query("ndjson"),
+    gzip: bool = Query(False),
+):
+    """
+    Stream the vehicles of every active customer of a store as NDJSON or CSV.
+    """
+    docs = vehicles_for_store(store_id, EXPORT_BATCH_SIZE)
+    return export_response(docs, f"vehicles-{store_id}", format, VEHICLE_COLUMNS, gzip)
+
+
+@router.get("/export/vehicle-transactions")
+async def export_vehicle_transactions(
+    store_id: str = Query(...),
+    format: ExportFormat = Query("ndjson"),
+    gzip: bool = Query(False),
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None,
+):
+    """
+    Stream a store's transaction history (optionally within a date range) as NDJSON or CSV.
+    """
+    query: dict = {"store_id": store_id}
+    if from_date or to_date:
+        query["date"] = {}
+        if from_date:
+            query["date"]["$gte"] = from_date
+        if to_date:
+            query["date"]["$lte"] = to_date
+
+    cursor = (
+        db["vehicle_transactions"]
+        .find(query, {"_id": 0})
+        .sort("date", -1)
+        .batch_size(EXPORT_BATCH_SIZE)
+    )
+    docs = flatten_tasks(cursor) if format == "csv" else cursor
+    return export_response(docs, f"vehicle-transactions-{store_id}", format, TRANSACTION_COLUMNS, gzip)
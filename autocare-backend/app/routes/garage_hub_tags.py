@@ -1,8 +1,12 @@
 from fastapi import APIRouter, HTTPException, Query
 from app.models.garage_hub_tag import GarageHubTagCreate
 from app.db.mongo import db
+from app.utils.hub_graph import hub_graph
+from app.utils.pagination import MAX_LIMIT, fetch_page, page_response
+from pymongo import DeleteMany, UpdateOne
 from uuid import uuid4
 from datetime import datetime
+from typing import List, Optional
 
 router = APIRouter()
 
@@ -10,7 +14,8 @@ router = APIRouter()
 @router.post("/garage-hub-tags")
 async def create_garage_hub_tags(payload: GarageHubTagCreate):
     """
-    Tags a garage to multiple hubs.
+    Tags a garage to multiple hubs. Hubs the garage is already tagged to are
+    left as they are.
 
     Payload:
     {
@@ -21,24 +26,41 @@ async def create_garage_hub_tags(payload: GarageHubTagCreate):
     if not payload.hub_ids:
         raise HTTPException(status_code=400, detail="No hub IDs provided.")
 
-    now = datetime.utcnow()
+    garage_id = str(payload.garage_id)
+    hub_ids = list(dict.fromkeys(str(hub_id) for hub_id in payload.hub_ids))
+    existing = await db.garage_hub_tags.find(
+        {"garage_id": garage_id, "hub_id": {"$in": hub_ids}}, {"hub_id": 1}
+    ).to_list(None)
+    tagged = {str(tag["hub_id"]) for tag in existing}
+    added = [hub_id for hub_id in hub_ids if hub_id not in tagged]
 
-    docs = [
-        {
-            "_id": str(uuid4()),
-            "garage_id": str(payload.garage_id),
-            "hub_id": str(hub_id),
-            "created_at": now
-        }
-        for hub_id in payload.hub_ids
-    ]
-
-    try:
-        await db.garage_hub_tags.insert_many(docs)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to tag hubs: {str(e)}")
-
-    return {"message": f"{len(docs)} hub(s) tagged to garage successfully."}
+    if added:
+        # Upserts, so a hub tagged concurrently is not a duplicate-key failure
+        now = datetime.utcnow()
+        ops = [
+            UpdateOne(
+                {"garage_id": garage_id, "hub_id": hub_id},
+                {"$setOnInsert": {"_id": str(uuid4()), "created_at": now}},
+                upsert=True,
+            )
+            for hub_id in added
+        ]
+        written = False
+        try:
+            await db.garage_hub_tags.bulk_write(ops, ordered=False)
+            written = True
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Failed to tag hubs: {str(e)}")
+        finally:
+            if not written:
+                await hub_graph.invalidate()  # some tags may have been written before the failure
+        await hub_graph.apply(garage_id, added=added)
+
+    return {
+        "message": f"{len(added)} hub(s) tagged to garage successfully.",
+        "added": len(added),
+        "already_tagged": len(tagged),
+    }
 
 
 @router.put("/garage-hub-tags")
@@ -46,6 +68,10 @@ async def update_garage_hub_tags(payload: GarageHubTagCreate):
     """
     Replace all hub tags for a given garage.
 
+    Only the difference is written: newly tagged hubs are upserted and
+    untagged hubs deleted in one ordered bulk_write. Existing tags are left
+    untouched, so readers never see the garage without its hubs.
+
     Payload:
     {
         "garage_id": "uuid",
@@ -55,33 +81,85 @@ async def update_garage_hub_tags(payload: GarageHubTagCreate):
     if not payload.hub_ids:
         raise HTTPException(status_code=400, detail="No hub IDs provided.")
 
+    garage_id = str(payload.garage_id)
+    desired = {str(hub_id) for hub_id in payload.hub_ids}
+
     try:
-        # Delete existing tags for this garage
-        await db.garage_hub_tags.delete_many({"garage_id": str(payload.garage_id)})
+        existing = await db.garage_hub_tags.find({"garage_id": garage_id}, {"hub_id": 1}).to_list(None)
+        current = {str(tag["hub_id"]) for tag in existing}
 
-        # Insert new tags
         now = datetime.utcnow()
-        docs = [
-            {
-                "_id": str(uuid4()),
-                "garage_id": str(payload.garage_id),
-                "hub_id": str(hub_id),
-                "created_at": now
-            }
-            for hub_id in payload.hub_ids
+        added = desired - current
+        removed = current - desired
+        ops = [
+            UpdateOne(
+                {"garage_id": garage_id, "hub_id": hub_id},
+                {"$setOnInsert": {"_id": str(uuid4()), "created_at": now}},
+                upsert=True,
+            )
+            for hub_id in sorted(added)
         ]
-        await db.garage_hub_tags.insert_many(docs)
-
-        return {"message": f"{len(docs)} hub(s) re-tagged to garage successfully."}
+        if removed:
+            ops.append(DeleteMany({"garage_id": garage_id, "hub_id": {"$in": sorted(removed)}}))
+
+        if ops:
+            written = False
+            try:
+                await db.garage_hub_tags.bulk_write(ops, ordered=True)
+                written = True
+            finally:
+                if not written:
+                    await hub_graph.invalidate()  # part of the diff may have been applied
+            await hub_graph.apply(garage_id, added=added, removed=removed)
+
+        return {
+            "message": f"{len(desired)} hub(s) re-tagged to garage successfully.",
+            "added": len(added),
+            "removed": len(removed),
+        }
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Update failed: {str(e)}")
 
 
 @router.get("/garage-hub-tags")
-async def get_hub_tags_for_garage(garage_id: str = Query(...)):
+async def get_hub_tags_for_garage(
+    garage_id: str = Query(...),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = Query(None),
+):
     """
     Get all hub tags for a given garage.
+    Pass `limit` / `cursor` to page through them (next cursor in `X-Next-Cursor`).
+    """
+    tags, next_cursor = await fetch_page(
+        db.garage_hub_tags, {"garage_id": garage_id}, limit=limit, cursor=cursor, id_field="_id"
+    )
+    return page_response(tags, next_cursor)
+
+
+# -----------------------------------------------
+# 🔗 HUB GRAPH LOOKUPS (served from memory)
+# -----------------------------------------------
+@router.get("/hubs/{hub_id}/garages")
+async def get_garages_for_hub(hub_id: str):
+    """
+    Get all garages tagged to a hub.
+    """
+    return {"hub_id": hub_id, "garage_ids": await hub_graph.garages_for_hub(hub_id)}
+
+
+@router.get("/hubs/garages")
+async def get_garages_for_hubs(hub_ids: List[str] = Query(..., max_length=MAX_LIMIT)):
+    """
+    Batch lookup: garages tagged to each of `hub_ids`, keyed by hub id.
+    """
+    return await hub_graph.garages_for_hubs(hub_ids)
+
+
+@router.get("/garages/hubs")
+async def get_hubs_for_garages(garage_ids: List[str] = Query(..., max_length=MAX_LIMIT)):
+    """
+    Batch lookup: hubs each of `garage_ids` is tagged to, keyed by garage id.
     """
-    tags = await db.garage_hub_tags.find({"garage_id": garage_id}).to_list(None)
-    return tags
+    return await hub_graph.hubs_for_garages(garage_ids)
@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Query, Request
+from app.utils.bulk_import import ImportFormat, import_customers, import_vehicles
+from typing import Literal, Optional
+
+router = APIRouter()
+
+
+# -----------------------------------------------
+# 📥 IMPORTS
+# -----------------------------------------------
+@router.post("/import/customers")
+async def import_customers_file(
+    request: Request,
+    format: ImportFormat = Query("csv"),
+    store_id: Optional[str] = Query(None, description="Default store_id / onboarded_by for rows without one"),
+    source: Literal["main_admin", "hub_admin", "garage_admin", "website"] = Query("main_admin"),
+):
+    """
+    Bulk import customers from a CSV or NDJSON request body (streamed, not multipart).
+    Existing phone numbers are skipped; row-level errors are reported, not fatal.
+    """
+    defaults = {"source": source}
+    if store_id:
+        defaults.update({"store_id": store_id, "onboarded_by": store_id})
+    report = await import_customers(request.stream(), format, defaults)
+    return report.as_dict()
+
+
+@router.post("/import/vehicles")
+async def import_vehicles_file(
+    request: Request,
+    format: ImportFormat = Query("csv"),
+):
+    """
+    Bulk import vehicles from a CSV or NDJSON request body (streamed, not multipart).
+    Rows reference their owner by `customer_id` or `customer_phone`; vehicles
+    already registered to that customer are skipped.
+    """
+    report = await import_vehicles(request.stream(), format)
+    return report.as_dict()
@@ -1,14 +1,17 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
+from fastapi import APIRouter, HTTPException, Query, Request
+from typing import List, Optional
 from uuid import uuid4, UUID
 from datetime import datetime
 
-from app.db.mongo import db
+from app.db.mongo import catalog_db, db
 from app.models.service import (
     LabourRuleCreate,
     LabourRuleUpdate,
     LabourRuleInDB
 )
+from app.utils.catalog_cache import catalog_cache
+from app.utils.serialization import model_response, serialize_list
+from app.utils.pagination import MAX_LIMIT, catalog_page
 
 router = APIRouter()
 
@@ -27,16 +30,31 @@ async def create_labour_rule(data: LabourRuleCreate):
         "created_at": datetime.utcnow()
     }
     await db.labour_rules.insert_one(labour_rule)
-    return LabourRuleInDB(**labour_rule)
+    await catalog_cache.invalidate("labour_rules")
+    return model_response(LabourRuleInDB, labour_rule)
+
+
+async def load_labour_rules() -> bytes:
+    rules = await catalog_db.labour_rules.find().to_list(length=None)
+    return serialize_list(LabourRuleInDB, rules)
+
+
+catalog_cache.register("labour_rules", ("labour_rules",), load_labour_rules)
 
 
 # ----------------------------
 # Get all labour rules
 # ----------------------------
 @router.get("/labour-rules", response_model=List[LabourRuleInDB])
-async def get_labour_rules():
-    rules = await db.labour_rules.find().to_list(length=None)
-    return [LabourRuleInDB(**rule) for rule in rules]
+async def get_labour_rules(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = Query(None),
+):
+    if limit or cursor:
+        return await catalog_page(db.labour_rules, {}, LabourRuleInDB, limit=limit, cursor=cursor)
+
+    return await catalog_cache.respond(request, "labour_rules", ("labour_rules",), load_labour_rules)
 
 
 # ----------------------------
@@ -51,7 +69,7 @@ async def get_by_task_and_vehicle(task_type_id: UUID, vehicle_category: str):
     if not rule:
         raise HTTPException(status_code=404, detail="Labour rule not found")
 
-    return LabourRuleInDB(**rule)
+    return model_response(LabourRuleInDB, rule)
 
 
 # ----------------------------
@@ -67,7 +85,8 @@ async def update_labour_rule(rule_id: str, data: LabourRuleUpdate):
     )
     if not updated:
         raise HTTPException(status_code=404, detail="Labour rule not found")
-    return LabourRuleInDB(**updated)
+    await catalog_cache.invalidate("labour_rules")
+    return model_response(LabourRuleInDB, updated)
 
 
 # ----------------------------
@@ -78,4 +97,5 @@ async def delete_labour_rule(rule_id: str):
     result = await db.labour_rules.delete_one({"_id": rule_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Labour rule not found")
+    await catalog_cache.invalidate("labour_rules")
     return {"message": "Labour rule deleted successfully"}
@@ -1,29 +1,46 @@
-from fastapi import APIRouter, HTTPException, Body
+from fastapi import APIRouter, HTTPException, Body, Query
 from app.models.loyalty_card import LoyaltyCard, RewardEntry
 from app.db.mongo import db
+from app.utils.loyalty import RECENT_REWARDS, append_reward, migrate_card, number_entries, reward_page, write_buckets
+from app.utils.pagination import DEFAULT_LIMIT, MAX_LIMIT, page_response
+from app.utils.projection import FIELDS_DESCRIPTION, parse_fields
+from app.utils.serialization import AppJSONResponse
 from uuid import uuid4
 from datetime import datetime
+from typing import Optional
 
 router = APIRouter()
 loyalty_collection = db["loyalty_cards"]
 
+LOYALTY_FIELDS = frozenset({
+    "customer_id", "points_balance", "membership_tier", "issued_at", "last_updated",
+    "referred_by", "reward_count", "reward_history", "created_at",
+})
+
 @router.post("/loyalty-cards")
 async def create_loyalty_card(card: LoyaltyCard):
     card_dict = card.dict(by_alias=True)
     card_dict["id"] = str(uuid4())
     card_dict["created_at"] = datetime.utcnow()
     card_dict["last_updated"] = datetime.utcnow()
+    entries = number_entries(card_dict.get("reward_history") or [])
+    card_dict["reward_count"] = len(entries)
+    card_dict["reward_history"] = entries[-RECENT_REWARDS:]
+    await write_buckets(card_dict["id"], entries)
     await loyalty_collection.insert_one(card_dict)
     return {"message": "Loyalty card created", "id": card_dict["id"]}
 
 @router.get("/customers/{customer_id}/loyalty-card")
-async def get_loyalty_card_by_customer(customer_id: str):
-    card = await loyalty_collection.find_one({"customer_id": customer_id})
+async def get_loyalty_card_by_customer(
+    customer_id: str,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+):
+    card = await loyalty_collection.find_one({"customer_id": customer_id}, parse_fields(fields, LOYALTY_FIELDS))
     if not card:
         raise HTTPException(status_code=404, detail="Loyalty card not found")
     card["id"] = card.get("id") or str(card["_id"])
     card.pop("_id", None)
-    return card
+    return AppJSONResponse(card)
 
 @router.put("/loyalty-cards/{card_id}")
 async def update_loyalty_card(card_id: str, updated_data: dict = Body(...)):
@@ -38,15 +55,23 @@ async def update_loyalty_card(card_id: str, updated_data: dict = Body(...)):
 
 @router.post("/loyalty-cards/{card_id}/rewards")
 async def add_reward(card_id: str, reward: RewardEntry):
-    reward_dict = reward.dict()
-    result = await loyalty_collection.update_one(
-        {"id": card_id},
-        {
-            "$push": {"reward_history": reward_dict},
-            "$inc": {"points_balance": reward.points},
-            "$set": {"last_updated": datetime.utcnow()}
-        }
-    )
-    if result.matched_count == 0:
+    entry = await append_reward(card_id, reward.dict())
+    return {"message": "Reward added", "seq": entry["seq"]}
+
+@router.get("/loyalty-cards/{card_id}/rewards")
+async def get_reward_history(
+    card_id: str,
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    cursor: Optional[int] = Query(None, ge=1),
+):
+    """
+    Full reward history of a card, newest first.
+    Pass the `X-Next-Cursor` value back as `cursor` for the next page.
+    """
+    card = await loyalty_collection.find_one({"id": card_id}, {"_id": 0, "id": 1, "reward_count": 1, "reward_history": 1})
+    if not card:
         raise HTTPException(status_code=404, detail="Loyalty card not found")
-    return {"message": "Reward added"}
+    await migrate_card(card)
+
+    entries, next_cursor = await reward_page(card_id, limit, cursor)
+    return page_response(entries, str(next_cursor) if next_cursor else None)
@@ -0,0 +1,46 @@
+from fastapi import APIRouter, Query
+from app.db.mongo import db
+from app.utils.pagination import clean_ids
+from app.utils.search_keys import normalize
+from app.utils.serialization import AppJSONResponse
+from typing import Optional
+
+router = APIRouter()
+
+SEARCH_PROJECTION = {"id": 1, "full_name": 1, "phone_number": 1, "email": 1, "store_id": 1, "onboarded_by": 1}
+
+
+@router.get("/search")
+async def search_customers(
+    q: str = Query(..., min_length=2, description="Phone number, name or vehicle number prefix"),
+    store_id: Optional[str] = Query(None),
+    limit: int = Query(10, ge=1, le=50),
+):
+    """
+    Typeahead lookup of active customers by phone number, name token or
+    vehicle number prefix, served from the precomputed `search_keys` index.
+    Exact matches come first. Results are not sorted: sorting the prefix range
+    by anything but the index order would load every match before the limit.
+    """
+    key = normalize(q)
+    if len(key) < 2:
+        return AppJSONResponse([])
+
+    def matching(keys) -> dict:
+        if store_id:
+            return {
+                "is_active": True,
+                "$or": [
+                    {"store_id": store_id, "search_keys": keys},
+                    {"onboarded_by": store_id, "search_keys": keys},
+                ],
+            }
+        return {"is_active": True, "search_keys": keys}
+
+    # Exact phone / name / vehicle matches first, then the rest of the prefix matches
+    customers = await db.customers.find(matching(key), SEARCH_PROJECTION).limit(limit).to_list(None)
+    if len(customers) < limit:
+        prefix = matching({"$regex": f"^{key}"})  # anchored, case-sensitive: an index range scan
+        prefix["id"] = {"$nin": [c["id"] for c in customers]}
+        customers += await db.customers.find(prefix, SEARCH_PROJECTION).limit(limit - len(customers)).to_list(None)
+    return AppJSONResponse(clean_ids(customers))
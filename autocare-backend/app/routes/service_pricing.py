@@ -1,13 +1,16 @@
-from fastapi import APIRouter, HTTPException
-from app.db.mongo import db
+from fastapi import APIRouter, HTTPException, Query, Request
+from app.db.mongo import catalog_db, db
 from app.models.service import (
     ServicePricingCreate,
     ServicePricingUpdate,
     ServicePricingInDB
 )
+from app.utils.catalog_cache import catalog_cache
+from app.utils.serialization import model_response, serialize_list
+from app.utils.pagination import MAX_LIMIT, catalog_page
 from uuid import uuid4
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 
 router = APIRouter()
 
@@ -18,13 +21,28 @@ async def create_service_pricing(data: ServicePricingCreate):
     pricing["_id"] = str(uuid4())
     pricing["created_at"] = datetime.utcnow()
     await db.service_pricing.insert_one(pricing)
-    return ServicePricingInDB(**pricing)
+    await catalog_cache.invalidate("service_pricing")
+    return model_response(ServicePricingInDB, pricing)
+
+
+async def load_service_pricing() -> bytes:
+    pricing_list = await catalog_db.service_pricing.find().to_list(None)
+    return serialize_list(ServicePricingInDB, pricing_list)
+
+
+catalog_cache.register("service_pricing", ("service_pricing",), load_service_pricing)
 
 
 @router.get("/service-pricing", response_model=List[ServicePricingInDB])
-async def get_all_service_pricing():
-    pricing_list = await db.service_pricing.find().to_list(None)
-    return [ServicePricingInDB(**p) for p in pricing_list]
+async def get_all_service_pricing(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = Query(None),
+):
+    if limit or cursor:
+        return await catalog_page(db.service_pricing, {}, ServicePricingInDB, limit=limit, cursor=cursor)
+
+    return await catalog_cache.respond(request, "service_pricing", ("service_pricing",), load_service_pricing)
 
 
 @router.patch("/service-pricing/{pricing_id}", response_model=ServicePricingInDB)
@@ -37,7 +55,8 @@ async def update_service_pricing(pricing_id: str, data: ServicePricingUpdate):
     )
     if not result:
         raise HTTPException(status_code=404, detail="Pricing entry not found")
-    return ServicePricingInDB(**result)
+    await catalog_cache.invalidate("service_pricing")
+    return model_response(ServicePricingInDB, result)
 
 
 @router.delete("/service-pricing/{pricing_id}")
@@ -45,4 +64,5 @@ async def delete_service_pricing(pricing_id: str):
     result = await db.service_pricing.delete_one({"_id": pricing_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Pricing entry not found")
+    await catalog_cache.invalidate("service_pricing")
     return {"message": "Service pricing deleted"}
@@ -1,9 +1,14 @@
-from fastapi import APIRouter, HTTPException
-from app.db.mongo import db
+from fastapi import APIRouter, HTTPException, Query, Request
+from app.db.mongo import catalog_db, db
+from app.models.batch import BatchGetRequest, ServiceBatchResponse
 from app.models.service import ServiceCreate, ServiceUpdate, ServiceInDB
+from app.utils.batch import batch_get
+from app.utils.catalog_cache import catalog_cache
+from app.utils.serialization import model_response, serialize_list
+from app.utils.pagination import MAX_LIMIT, catalog_page
 from uuid import uuid4
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 
 router = APIRouter()
 
@@ -14,13 +19,36 @@ async def create_service(data: ServiceCreate):
     service["_id"] = str(uuid4())
     service["created_at"] = datetime.utcnow()
     await db.services.insert_one(service)
-    return ServiceInDB(**service)
+    await catalog_cache.invalidate("services")
+    return model_response(ServiceInDB, service)
+
+
+async def load_services() -> bytes:
+    services = await catalog_db.services.find().to_list(None)
+    return serialize_list(ServiceInDB, services)
+
+
+catalog_cache.register("services", ("services",), load_services)
 
 
 @router.get("/services", response_model=List[ServiceInDB])
-async def get_all_services():
-    services = await db.services.find().to_list(None)
-    return [ServiceInDB(**s) for s in services]
+async def get_all_services(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = Query(None),
+):
+    if limit or cursor:
+        return await catalog_page(db.services, {}, ServiceInDB, limit=limit, cursor=cursor)
+
+    return await catalog_cache.respond(request, "services", ("services",), load_services)
+
+
+@router.post("/services/batch-get", response_model=ServiceBatchResponse)
+async def batch_get_services(payload: BatchGetRequest):
+    if payload.fields:
+        raise HTTPException(status_code=400, detail="fields is not supported for services")
+    items, missing = await batch_get(db.services, payload.ids, id_field="_id")
+    return model_response(ServiceBatchResponse, {"items": items, "missing": missing})
 
 
 @router.patch("/services/{service_id}", response_model=ServiceInDB)
@@ -33,7 +61,8 @@ async def update_service(service_id: str, data: ServiceUpdate):
     )
     if not result:
         raise HTTPException(status_code=404, detail="Service not found")
-    return ServiceInDB(**result)
+    await catalog_cache.invalidate("services")
+    return model_response(ServiceInDB, result)
 
 
 @router.delete("/services/{service_id}")
@@ -41,4 +70,5 @@ async def delete_service(service_id: str):
     result = await db.services.delete_one({"_id": service_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Service not found")
+    await catalog_cache.invalidate("services")
     return {"message": "Service deleted"}
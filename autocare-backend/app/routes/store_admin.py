@@ -1,12 +1,31 @@
-from fastapi import APIRouter, HTTPException, Query, Body
+from fastapi import APIRouter, HTTPException, Query, Body, Request
 from app.models.store_admin import StoreAdminCreate
-from app.db.mongo import db
+from app.db.mongo import catalog_db, db
+from app.models.batch import BatchGetRequest
+from app.utils.batch import batch_get
+from app.utils.catalog_cache import catalog_cache
+from app.utils.pagination import MAX_LIMIT, clean_ids, fetch_page, page_response
+from app.utils.projection import FIELDS_DESCRIPTION, parse_fields
+from app.utils.serialization import AppJSONResponse
+from app.utils.single_flight import single_flight
 from uuid import uuid4
 from datetime import datetime
 from typing import Optional
 
 router = APIRouter()
 
+# Deliberately excludes password
+STORE_FIELDS = frozenset({
+    "name", "city", "address", "latitude", "longitude", "manager_name", "manager_number",
+    "type", "hub_id", "alias", "created_at",
+})
+# Projection for reads without `fields`
+STORE_DEFAULT_PROJECTION = {"password": 0}
+
+
+def store_projection(fields: Optional[str]) -> dict:
+    return parse_fields(fields, STORE_FIELDS) or dict(STORE_DEFAULT_PROJECTION)
+
 
 @router.post("/store-admin")
 async def create_store_admin(store: StoreAdminCreate):
@@ -29,6 +48,7 @@ async def create_store_admin(store: StoreAdminCreate):
     store_doc["created_at"] = datetime.utcnow()
 
     await db["store_admin"].insert_one(store_doc)
+    await catalog_cache.invalidate("store_admin")
 
     return {
         "message": "Store created successfully",
@@ -38,37 +58,63 @@ async def create_store_admin(store: StoreAdminCreate):
 
 
 @router.get("/stores")
-async def get_stores(type: Optional[str] = Query(None)):
+@single_flight(vary=("if-none-match", "accept-encoding"))
+async def get_stores(
+    request: Request,
+    type: Optional[str] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+):
     """
     Fetch all stores or filter by type (hub or garage).
+    Pass `limit` / `cursor` to page through them (next cursor in `X-Next-Cursor`).
+    The unpaged list is cached and honours `If-None-Match`.
     """
     if type is not None and type not in ["hub", "garage"]:
         raise HTTPException(status_code=400, detail="Invalid store type")
 
     query = {"type": type} if type else {}
-    stores_cursor = db["store_admin"].find(query)
+    projection = store_projection(fields)
+    if limit or cursor:
+        stores, next_cursor = await fetch_page(
+            db["store_admin"], query, limit=limit, cursor=cursor, projection=projection
+        )
+        return page_response(clean_ids(stores), next_cursor)
+
+    async def load() -> bytes:
+        stores = await catalog_db["store_admin"].find(query, projection).to_list(None)
+        return AppJSONResponse(clean_ids(stores)).body
 
-    stores = []
-    async for store in stores_cursor:
-        store["id"] = store.get("id") or str(store["_id"])
-        store.pop("_id", None)
-        stores.append(store)
+    key = f"stores:{type or 'all'}:{','.join(sorted(projection))}"
+    return await catalog_cache.respond(request, key, ("store_admin",), load)
 
-    return stores
+
+@router.post("/stores/batch-get")
+async def batch_get_stores(payload: BatchGetRequest):
+    """
+    Fetch up to 500 stores in one query, keyed by id; unknown ids are listed in `missing`.
+    """
+    items, missing = await batch_get(db["store_admin"], payload.ids, projection=store_projection(payload.fields))
+    return AppJSONResponse({"items": items, "missing": missing})
 
 
 @router.get("/stores/{store_id}")
-async def get_store_by_id(store_id: str):
+@single_flight()
+async def get_store_by_id(
+    store_id: str,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+):
     """
     Fetch a single store by its ID.
     """
-    store = await db["store_admin"].find_one({"id": store_id})
+    store = await db["store_admin"].find_one({"id": store_id}, store_projection(fields))
     if not store:
         raise HTTPException(status_code=404, detail="Store not found")
 
     store["id"] = store.get("id") or str(store["_id"])
     store.pop("_id", None)
-    return store
+    return AppJSONResponse(store)
 
 
 @router.put("/stores/{store_id}")
@@ -83,6 +129,7 @@ async def update_store_by_id(store_id: str, updated_data: dict = Body(...)):
 
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Store not found")
+    await catalog_cache.invalidate("store_admin")
 
     return {"message": "Store updated successfully"}
 
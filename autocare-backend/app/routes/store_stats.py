@@ -0,0 +1,38 @@
+from fastapi import APIRouter, HTTPException, Query
+from app.models.store_stats import DailyStoreStats, StoreStats, StoreStatsTotals
+from app.utils.rollups import store_stats
+from datetime import date
+
+router = APIRouter()
+
+MAX_RANGE_DAYS = 366
+
+
+@router.get("/stores/{store_id}/stats", response_model=StoreStats)
+async def get_store_stats(
+    store_id: str,
+    from_date: date = Query(..., alias="from"),
+    to_date: date = Query(..., alias="to"),
+):
+    """
+    Daily revenue, transaction and booking counters for a store, read from the
+    precomputed rollups. Days without activity are omitted.
+    """
+    if from_date > to_date:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+    if (to_date - from_date).days >= MAX_RANGE_DAYS:
+        raise HTTPException(status_code=400, detail=f"Range cannot exceed {MAX_RANGE_DAYS} days")
+
+    days = [DailyStoreStats(**doc) for doc in await store_stats(store_id, from_date, to_date)]
+
+    totals = StoreStatsTotals()
+    for day in days:
+        totals.revenue += day.revenue
+        totals.transactions += day.transactions
+        totals.bookings += day.bookings
+        for mode, amount in day.revenue_by_mode.items():
+            totals.revenue_by_mode[mode] = totals.revenue_by_mode.get(mode, 0.0) + amount
+        for status, count in day.bookings_by_status.items():
+            totals.bookings_by_status[status] = totals.bookings_by_status.get(status, 0) + count
+
+    return StoreStats(store_id=store_id, from_date=from_date, to_date=to_date, totals=totals, days=days)
@@ -4,6 +4,10 @@ from app.models.store_task_capacity import (
     StoreTaskCapacityCreate,
     StoreTaskCapacityWithDetails
 )
+from app.utils.serialization import json_response, serialize_list
+from app.utils.single_flight import single_flight
+from pymongo import DeleteMany, UpdateOne
+from pymongo.errors import BulkWriteError
 from uuid import uuid4
 from datetime import datetime
 
@@ -15,31 +19,55 @@ async def create_store_task_capacities(data: list[StoreTaskCapacityCreate]):
     """
     Create task capacities for a store.
 
+    Only new (store, task type) pairs are accepted; existing capacities are
+    changed with PUT.
+
     Args:
         data (list[StoreTaskCapacityCreate]): List of task capacities to create.
 
     Returns:
         dict: Message and count of created records.
+
+    Raises:
+        HTTPException: 400 if a pair repeats in the payload, 409 if a pair already exists.
     """
     if not data:
         raise HTTPException(status_code=400, detail="No data provided")
 
+    pairs = {(str(item.store_id), str(item.task_type_id)): item.capacity for item in data}
+    if len(pairs) < len(data):
+        raise HTTPException(status_code=400, detail="Duplicate task type for a store in payload")
+
+    existing = await db.store_task_capacities.find(
+        {"$or": [{"store_id": store_id, "task_type_id": task_type_id} for store_id, task_type_id in pairs]},
+        {"_id": 0, "task_type_id": 1},
+    ).to_list(None)
+    if existing:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Capacity already exists for task type(s): {', '.join(sorted(str(e['task_type_id']) for e in existing))}",
+        )
+
+    # Upserts that never overwrite: a pair created concurrently keeps its capacity
     now = datetime.utcnow()
-    payload = [
-        {
-            "_id": str(uuid4()),
-            "store_id": str(item.store_id),
-            "task_type_id": str(item.task_type_id),
-            "capacity": item.capacity,
-            "created_at": now,
-        }
-        for item in data
+    ops = [
+        UpdateOne(
+            {"store_id": store_id, "task_type_id": task_type_id},
+            {"$setOnInsert": {"_id": str(uuid4()), "capacity": capacity, "created_at": now}},
+            upsert=True,
+        )
+        for (store_id, task_type_id), capacity in pairs.items()
     ]
+    try:
+        result = await db.store_task_capacities.bulk_write(ops, ordered=False)
+    except BulkWriteError as e:
+        if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+            raise
+        raise HTTPException(status_code=409, detail="Capacity for some task types was created concurrently")
 
-    await db.store_task_capacities.insert_many(payload)
     return {
         "message": "Capacities added successfully",
-        "count": len(payload)
+        "count": result.upserted_count
     }
 
 
@@ -48,41 +76,76 @@ async def update_store_task_capacities(data: list[StoreTaskCapacityCreate]):
     """
     Replace task capacities for a store.
 
+    The payload is diffed against the stored rows and applied as one ordered
+    bulk_write: new task types are upserted, changed capacities updated in
+    place and dropped task types deleted. Unchanged rows keep their _id.
+
     Args:
         data (list[StoreTaskCapacityCreate]): List of task capacities to update.
 
     Returns:
-        dict: Message and count of updated records.
+        dict: Message, count of capacities and the applied diff.
     """
     if not data:
         raise HTTPException(status_code=400, detail="No data provided")
 
     store_id = str(data[0].store_id)
+    if any(str(item.store_id) != store_id for item in data):
+        raise HTTPException(status_code=400, detail="All capacities must belong to the same store")
 
-    # Remove existing capacities for the store
-    await db.store_task_capacities.delete_many({"store_id": store_id})
+    desired = {str(item.task_type_id): item.capacity for item in data}
+    existing = await db.store_task_capacities.find(
+        {"store_id": store_id}, {"task_type_id": 1, "capacity": 1}
+    ).to_list(None)
 
-    # Insert new capacities
     now = datetime.utcnow()
-    payload = [
-        {
-            "_id": str(uuid4()),
-            "store_id": str(item.store_id),
-            "task_type_id": str(item.task_type_id),
-            "capacity": item.capacity,
-            "created_at": now,
-        }
-        for item in data
-    ]
+    ops = []
+    seen = set()
+    stale_ids = []
+    updated = 0
+    for row in existing:
+        task_type_id = str(row["task_type_id"])
+        if task_type_id not in desired or task_type_id in seen:
+            stale_ids.append(row["_id"])  # dropped task type, or a duplicate row
+            continue
+        seen.add(task_type_id)
+        if row.get("capacity") != desired[task_type_id]:
+            ops.append(UpdateOne(
+                {"_id": row["_id"]},
+                {"$set": {"capacity": desired[task_type_id], "updated_at": now}},
+            ))
+            updated += 1
+
+    inserted = 0
+    for task_type_id, capacity in desired.items():
+        if task_type_id not in seen:
+            ops.append(UpdateOne(
+                {"store_id": store_id, "task_type_id": task_type_id},
+                {
+                    "$set": {"capacity": capacity},
+                    "$setOnInsert": {"_id": str(uuid4()), "created_at": now},
+                },
+                upsert=True,
+            ))
+            inserted += 1
+
+    if stale_ids:
+        ops.append(DeleteMany({"_id": {"$in": stale_ids}}))
+
+    if ops:
+        await db.store_task_capacities.bulk_write(ops, ordered=True)
 
-    await db.store_task_capacities.insert_many(payload)
     return {
         "message": "Capacities updated successfully",
-        "count": len(payload)
+        "count": len(desired),
+        "inserted": inserted,
+        "updated": updated,
+        "deleted": len(stale_ids),
     }
 
 
 @router.get("/store-task-capacities/{store_id}", response_model=list[StoreTaskCapacityWithDetails])
+@single_flight()
 async def get_task_capacities_for_store(store_id: str):
     """
     Get task capacities for a store, with task name and slot type.
@@ -113,4 +176,4 @@ async def get_task_capacities_for_store(store_id: str):
                 "capacity": c.get("capacity", 0),
             })
 
-    return result
+    return json_response(serialize_list(StoreTaskCapacityWithDetails, result))
@@ -1,9 +1,12 @@
-from fastapi import APIRouter, HTTPException
-from app.db.mongo import db
+from fastapi import APIRouter, HTTPException, Query, Request
+from app.db.mongo import catalog_db, db
 from app.models.service import SubserviceCreate, SubserviceInDB
+from app.utils.catalog_cache import catalog_cache
+from app.utils.serialization import model_response, serialize_list
+from app.utils.pagination import MAX_LIMIT, catalog_page
 from uuid import uuid4
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 
 router = APIRouter()
 
@@ -19,13 +22,28 @@ async def create_subservice(data: SubserviceCreate):
         "created_at": datetime.utcnow()
     }
     await db.subservices.insert_one(subservice)
-    return SubserviceInDB(**subservice)
+    await catalog_cache.invalidate("subservices")
+    return model_response(SubserviceInDB, subservice)
+
+
+async def load_subservices() -> bytes:
+    subservices = await catalog_db.subservices.find().to_list(None)
+    return serialize_list(SubserviceInDB, subservices)
+
+
+catalog_cache.register("subservices", ("subservices",), load_subservices)
 
 
 @router.get("/subservices", response_model=List[SubserviceInDB])
-async def get_all_subservices():
-    subservices = await db.subservices.find().to_list(None)
-    return [SubserviceInDB(**s) for s in subservices]
+async def get_all_subservices(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = Query(None),
+):
+    if limit or cursor:
+        return await catalog_page(db.subservices, {}, SubserviceInDB, limit=limit, cursor=cursor)
+
+    return await catalog_cache.respond(request, "subservices", ("subservices",), load_subservices)
 
 
 @router.patch("/subservices/{subservice_id}", response_model=SubserviceInDB)
@@ -38,7 +56,8 @@ async def update_subservice(subservice_id: str, data: SubserviceCreate):
     )
     if not result:
         raise HTTPException(status_code=404, detail="Subservice not found")
-    return SubserviceInDB(**result)
+    await catalog_cache.invalidate("subservices")
+    return model_response(SubserviceInDB, result)
 
 
 @router.delete("/subservices/{subservice_id}")
@@ -46,4 +65,5 @@ async def delete_subservice(subservice_id: str):
     result = await db.subservices.delete_one({"_id": subservice_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Subservice not found")
+    await catalog_cache.invalidate("subservices")
     return {"message": "Subservice deleted"}
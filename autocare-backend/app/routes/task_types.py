@@ -1,9 +1,14 @@
-from fastapi import APIRouter, HTTPException, Body, Query
-from app.db.mongo import db
+from fastapi import APIRouter, HTTPException, Body, Query, Request
+from app.db.mongo import catalog_db, db
 from app.models.task_type import TaskTypeCreate, TaskTypeUpdate, TaskTypeInDB
+from app.utils.catalog_cache import catalog_cache
+from app.utils.serialization import json_response, model_response, serialize_list
+from app.utils.pagination import MAX_LIMIT, catalog_page
+from app.utils.single_flight import single_flight
 from typing import List, Optional
 from uuid import uuid4, UUID
 from datetime import datetime
+from functools import partial
 
 router = APIRouter()
 
@@ -23,15 +28,32 @@ async def create_task_type(data: TaskTypeCreate):
         "created_at": datetime.utcnow()
     }
     await db.task_types.insert_one(task_type)
+    await catalog_cache.invalidate("task_types")
 
-    return TaskTypeInDB(**task_type)
+    return model_response(TaskTypeInDB, task_type)
+
+
+async def load_task_types(store_type: Optional[str] = None) -> bytes:
+    query = {"hub": {"allowed_in_hub": True}, "garage": {"allowed_in_garage": True}}.get(store_type, {})
+    task_types = await catalog_db.task_types.find(query).to_list(length=None)
+    return serialize_list(TaskTypeInDB, task_types)
+
+
+for _store_type in (None, "hub", "garage"):
+    catalog_cache.register(f"task_types:{_store_type or 'all'}", ("task_types",), partial(load_task_types, _store_type))
 
 
 # ----------------------------
 # Get all or filtered task types
 # ----------------------------
 @router.get("/task-types", response_model=List[TaskTypeInDB])
-async def get_all_task_types(storeType: Optional[str] = Query(None)):
+@single_flight(vary=("if-none-match", "accept-encoding"))
+async def get_all_task_types(
+    request: Request,
+    storeType: Optional[str] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = Query(None),
+):
     query = {}
     if storeType == "hub":
         query["allowed_in_hub"] = True
@@ -40,19 +62,11 @@ async def get_all_task_types(storeType: Optional[str] = Query(None)):
     elif storeType is not None:
         raise HTTPException(status_code=400, detail="Invalid storeType. Must be 'hub' or 'garage'.")
 
-    task_types = await db.task_types.find(query).to_list(length=None)
+    if limit or cursor:
+        return await catalog_page(db.task_types, query, TaskTypeInDB, limit=limit, cursor=cursor)
 
-    return [
-        TaskTypeInDB(
-            id=str(task["_id"]),
-            name=task["name"],
-            allowed_in_hub=task["allowed_in_hub"],
-            allowed_in_garage=task["allowed_in_garage"],
-            slot_type=task["slot_type"],
-            count=int(task["count"]),
-            created_at=task["created_at"]
-        ) for task in task_types
-    ]
+    loader = partial(load_task_types, storeType)
+    return await catalog_cache.respond(request, f"task_types:{storeType or 'all'}", ("task_types",), loader)
 
 
 # ----------------------------
@@ -70,16 +84,9 @@ async def update_task_type(task_type_id: str, data: TaskTypeUpdate):
 
     if not result:
         raise HTTPException(status_code=404, detail="Task type not found")
+    await catalog_cache.invalidate("task_types")
 
-    return TaskTypeInDB(
-        id=str(result["_id"]),
-        name=result["name"],
-        allowed_in_hub=result["allowed_in_hub"],
-        allowed_in_garage=result["allowed_in_garage"],
-        slot_type=result["slot_type"],
-        count=int(result["count"]),
-        created_at=result["created_at"]
-    )
+    return model_response(TaskTypeInDB, result)
 
 
 # ----------------------------
@@ -90,6 +97,7 @@ async def delete_task_type(task_type_id: str):
     result = await db.task_types.delete_one({"_id": task_type_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Task type not found")
+    await catalog_cache.invalidate("task_types")
 
     return {"message": "Task type deleted"}
 
@@ -116,15 +124,6 @@ async def create_task_types_bulk(task_list: List[TaskTypeCreate] = Body(...)):
         tasks_to_insert.append(task_dict)
 
     await db.task_types.insert_many(tasks_to_insert)
+    await catalog_cache.invalidate("task_types")
 
-    return [
-        TaskTypeInDB(
-            id=task["_id"],
-            name=task["name"],
-            allowed_in_hub=task["allowed_in_hub"],
-            allowed_in_garage=task["allowed_in_garage"],
-            slot_type=task["slot_type"],
-            count=int(task["count"]),
-            created_at=task["created_at"]
-        ) for task in tasks_to_insert
-    ]
+    return json_response(serialize_list(TaskTypeInDB, tasks_to_insert))
@@ -1,12 +1,26 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from app.models.vehicle import Vehicle
 from app.db.mongo import db  # ✅ use async db from motor
+from app.models.batch import BatchGetRequest
+from app.utils.batch import batch_get
+from app.utils.pagination import MAX_LIMIT, clean_ids, fetch_page, page_response
+from app.utils.projection import FIELDS_DESCRIPTION, parse_fields
+from app.utils.search_keys import add_vehicle_keys, refresh_customer_keys
+from app.utils.serialization import AppJSONResponse
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 from uuid import uuid4
 from datetime import datetime
+from typing import Optional
 
 router = APIRouter()
 vehicle_collection = db["vehicles"]
 
+VEHICLE_FIELDS = frozenset({
+    "customer_id", "vehicle_number", "vehicle_type", "brand", "model", "year", "fuel_type",
+    "odometer_km", "last_service_date", "is_primary", "notes", "created_at", "updated_at",
+})
+
 @router.post("/vehicles")
 async def add_vehicle(vehicle: Vehicle):
     vehicle_dict = vehicle.dict(by_alias=True)
@@ -14,46 +28,68 @@ async def add_vehicle(vehicle: Vehicle):
     vehicle_dict["created_at"] = datetime.utcnow()
     vehicle_dict["updated_at"] = datetime.utcnow()
 
-    await vehicle_collection.insert_one(vehicle_dict)
+    try:
+        await vehicle_collection.insert_one(vehicle_dict)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail="Vehicle already registered for this customer")
+    await add_vehicle_keys({str(vehicle_dict["customer_id"]): [vehicle_dict["vehicle_number"]]})
     return {"message": "Vehicle added", "id": vehicle_dict["id"]}
 
 @router.get("/customers/{customer_id}/vehicles")
-async def get_vehicles_by_customer(customer_id: str):
-    vehicles_cursor = vehicle_collection.find({"customer_id": customer_id})
-
-    vehicles = []
-    async for v in vehicles_cursor:
-        v["id"] = v.get("id") or str(v["_id"])
-        v.pop("_id", None)
-        vehicles.append(v)
+async def get_vehicles_by_customer(
+    customer_id: str,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+):
+    vehicles, next_cursor = await fetch_page(
+        vehicle_collection, {"customer_id": customer_id}, limit=limit, cursor=cursor,
+        projection=parse_fields(fields, VEHICLE_FIELDS),
+    )
+    return page_response(clean_ids(vehicles), next_cursor)
 
-    return vehicles
+# 📦 Batch get by ids
+@router.post("/vehicles/batch-get")
+async def batch_get_vehicles(payload: BatchGetRequest):
+    """
+    Fetch up to 500 vehicles in one query, keyed by id; unknown ids are listed in `missing`.
+    """
+    items, missing = await batch_get(vehicle_collection, payload.ids, projection=parse_fields(payload.fields, VEHICLE_FIELDS))
+    return AppJSONResponse({"items": items, "missing": missing})
 
 @router.get("/vehicles/{vehicle_id}")
-async def get_vehicle(vehicle_id: str):
-    vehicle = await vehicle_collection.find_one({"id": vehicle_id})
+async def get_vehicle(
+    vehicle_id: str,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+):
+    vehicle = await vehicle_collection.find_one({"id": vehicle_id}, parse_fields(fields, VEHICLE_FIELDS))
     if not vehicle:
         raise HTTPException(status_code=404, detail="Vehicle not found")
     
     vehicle["id"] = vehicle.get("id") or str(vehicle["_id"])
     vehicle.pop("_id", None)
-    return vehicle
+    return AppJSONResponse(vehicle)
 
 @router.put("/vehicles/{vehicle_id}")
 async def update_vehicle(vehicle_id: str, updated_data: dict):
     updated_data["updated_at"] = datetime.utcnow()
-    result = await vehicle_collection.update_one(
+    previous = await vehicle_collection.find_one_and_update(
         {"id": vehicle_id},
-        {"$set": updated_data}
+        {"$set": updated_data},
+        projection={"customer_id": 1},
+        return_document=ReturnDocument.BEFORE,
     )
 
-    if result.matched_count == 0:
+    if not previous:
         raise HTTPException(status_code=404, detail="Vehicle not found")
+    if "vehicle_number" in updated_data or "customer_id" in updated_data:
+        await refresh_customer_keys([str(previous["customer_id"]), str(updated_data.get("customer_id", ""))])
     return {"message": "Vehicle updated"}
 
 @router.delete("/vehicles/{vehicle_id}")
 async def delete_vehicle(vehicle_id: str):
-    result = await vehicle_collection.delete_one({"id": vehicle_id})
-    if result.deleted_count == 0:
+    vehicle = await vehicle_collection.find_one_and_delete({"id": vehicle_id}, projection={"customer_id": 1})
+    if not vehicle:
         raise HTTPException(status_code=404, detail="Vehicle not found")
+    await refresh_customer_keys([str(vehicle["customer_id"])])
     return {"message": "Vehicle deleted"}
@@ -1,31 +1,45 @@
 from fastapi import APIRouter, HTTPException, Query
 from app.models.vehicle_transaction import VehicleTransaction
 from app.db.mongo import db
+from app.utils.pagination import encode_cursor, keyset_filter
+from app.utils.projection import FIELDS_DESCRIPTION, parse_fields, strip_keys, with_keys
+from app.utils.rollups import record_transaction
+from app.utils.serialization import AppJSONResponse
 from uuid import uuid4
+import asyncio
 from datetime import datetime
 from typing import List, Optional
 
 router = APIRouter()
 transaction_collection = db["vehicle_transactions"]
 
+TRANSACTION_FIELDS = frozenset({
+    "vehicle_id", "customer_id", "store_id", "date", "tasks", "total_amount",
+    "payment_mode", "paid", "invoice_id", "created_at",
+})
+
 @router.post("/vehicle-transactions")
 async def create_transaction(txn: VehicleTransaction):
     txn_dict = txn.dict(by_alias=True)
     txn_dict["id"] = str(uuid4())
     txn_dict["created_at"] = datetime.utcnow()
     await transaction_collection.insert_one(txn_dict)
+    await record_transaction(txn_dict)
     return {"message": "Transaction recorded", "id": txn_dict["id"]}
 
 @router.get("/vehicles/{vehicle_id}/transactions")
 async def get_transactions_for_vehicle(
     vehicle_id: str,
     limit: int = Query(20, ge=1, le=100),
-    skip: int = Query(0, ge=0),
+    skip: int = Query(0, ge=0, description="Deprecated: use cursor"),
+    cursor: Optional[str] = Query(None),
     from_date: Optional[datetime] = None,
-    to_date: Optional[datetime] = None
+    to_date: Optional[datetime] = None,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
 ):
     """
     Fetch transactions for a vehicle with pagination and optional date filter.
+    Follow `next_cursor` for the next page; `total` counts all matching transactions.
     """
     query = {"vehicle_id": vehicle_id}
 
@@ -36,26 +50,42 @@ async def get_transactions_for_vehicle(
     elif to_date:
         query["created_at"] = {"$lte": to_date}
 
-    cursor = transaction_collection.find(query).sort("created_at", -1).skip(skip).limit(limit)
+    projection, extra = with_keys(parse_fields(fields, TRANSACTION_FIELDS), ("created_at", "id"))
+    page_query = {"$and": [query, keyset_filter(cursor)]} if cursor else query
+    find = (
+        transaction_collection.find(page_query, projection)
+        .sort([("created_at", -1), ("id", -1)])
+        .skip(0 if cursor else skip)
+        .limit(limit + 1)
+    )
+    total, docs = await asyncio.gather(
+        transaction_collection.count_documents(query),
+        find.to_list(None),
+    )
 
+    next_cursor = encode_cursor(docs[limit - 1]) if len(docs) > limit else None
     txns = []
-    async for txn in cursor:
+    for txn in strip_keys(docs[:limit], extra):
         txn["id"] = txn.get("id") or str(txn["_id"])
         txn.pop("_id", None)
         txns.append(txn)
 
-    return {
-        "total": len(txns),
+    return AppJSONResponse({
+        "total": total,
         "transactions": txns,
         "skip": skip,
-        "limit": limit
-    }
+        "limit": limit,
+        "next_cursor": next_cursor,
+    })
 
 @router.get("/vehicle-transactions/{txn_id}")
-async def get_transaction_by_id(txn_id: str):
-    txn = await transaction_collection.find_one({"id": txn_id})
+async def get_transaction_by_id(
+    txn_id: str,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+):
+    txn = await transaction_collection.find_one({"id": txn_id}, parse_fields(fields, TRANSACTION_FIELDS))
     if not txn:
         raise HTTPException(status_code=404, detail="Transaction not found")
     txn["id"] = txn.get("id") or str(txn["_id"])
     txn.pop("_id", None)
-    return txn
+    return AppJSONResponse(txn)
@@ -0,0 +1,225 @@
+# app/utils/availability.py
+
+"""
+Slot availability and reservations from store task capacities.
+
+Each (store, task type, date, slot) has a counter document in
+``slot_counters`` holding how many units are reserved. A task type's
+``slot_type`` decides the slot granularity: ``per_hour`` task types get one
+slot per opening hour with the store's capacity each, ``max_per_day`` task
+types a single ``"day"`` slot.
+
+Reserving is a conditional ``$inc`` upsert keyed on the counter ``_id``: it
+only matches while ``count + units <= capacity``. When the slot is full the
+filter misses, the upsert collides with the existing ``_id`` and fails, so
+concurrent bookings can never oversubscribe a slot.
+
+Changing a booking's reservations never gives capacity back before the new
+units are held: ``reserve_slots`` takes only the units beyond what the booking
+already ``held``, the caller swaps the reservations on the booking, and only
+then releases ``reservation_delta(old, new)``. On a failed swap it releases
+``reservation_delta(new, old)`` instead, i.e. exactly what was taken.
+"""
+
+import os
+from collections import Counter
+from datetime import date, datetime
+from typing import Optional
+
+from fastapi import HTTPException
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from app.db.mongo import db
+from app.models.availability import SlotAvailability, TaskAvailability
+
+STORE_OPEN_HOUR = int(os.getenv("STORE_OPEN_HOUR", "9"))
+STORE_CLOSE_HOUR = int(os.getenv("STORE_CLOSE_HOUR", "19"))
+
+DAY_SLOT = "day"
+
+
+def hour_slots() -> list[str]:
+    return [f"{hour:02d}" for hour in range(STORE_OPEN_HOUR, STORE_CLOSE_HOUR)]
+
+
+def counter_id(store_id: str, task_type_id: str, day: date, slot: str) -> str:
+    return f"{store_id}:{task_type_id}:{day.isoformat()}:{slot}"
+
+
+def slot_for(slot_type: str, hour: Optional[int]) -> str:
+    if slot_type == "max_per_day":
+        return DAY_SLOT
+    if hour is None:
+        raise HTTPException(status_code=400, detail="slot_hour is required for per-hour task types")
+    slot = f"{hour:02d}"
+    if slot not in hour_slots():
+        raise HTTPException(
+            status_code=400,
+            detail=f"slot_hour must be between {STORE_OPEN_HOUR} and {STORE_CLOSE_HOUR - 1}",
+        )
+    return slot
+
+
+def _capacity_pipeline(store_id: str, task_type_ids: list[str], day: Optional[date] = None) -> list[dict]:
+    pipeline = [
+        {"$match": {"store_id": store_id, "task_type_id": {"$in": task_type_ids}}},
+        {"$lookup": {
+            "from": "task_types",
+            "localField": "task_type_id",
+            "foreignField": "_id",
+            "as": "task_type",
+        }},
+        {"$unwind": "$task_type"},
+    ]
+    if day is not None:
+        pipeline.append({"$lookup": {
+            "from": "slot_counters",
+            "pipeline": [
+                {"$match": {
+                    "store_id": store_id,
+                    "task_type_id": {"$in": task_type_ids},
+                    "date": day.isoformat(),
+                }},
+                {"$project": {"_id": 0, "task_type_id": 1, "slot": 1, "count": 1}},
+            ],
+            "as": "counters",
+        }})
+    return pipeline
+
+
+async def get_availability(store_id: str, task_type_id: str, day: date) -> TaskAvailability:
+    """Free capacity per slot for one store / task type / date, in a single aggregate."""
+    docs = await db.store_task_capacities.aggregate(
+        _capacity_pipeline(store_id, [task_type_id], day)
+    ).to_list(1)
+    if not docs:
+        raise HTTPException(status_code=404, detail="No capacity configured for this store and task type")
+
+    doc = docs[0]
+    capacity = int(doc.get("capacity", 0))
+    slot_type = doc["task_type"].get("slot_type", "max_per_day")
+    reserved = {c["slot"]: int(c.get("count", 0)) for c in doc.get("counters", [])}
+    slots = hour_slots() if slot_type == "per_hour" else [DAY_SLOT]
+
+    return TaskAvailability(
+        store_id=store_id,
+        task_type_id=task_type_id,
+        task_name=doc["task_type"].get("name", ""),
+        slot_type=slot_type,
+        date=day,
+        slots=[
+            SlotAvailability(
+                slot=slot,
+                capacity=capacity,
+                reserved=reserved.get(slot, 0),
+                available=max(capacity - reserved.get(slot, 0), 0),
+            )
+            for slot in slots
+        ],
+    )
+
+
+async def _apply(reservations: list[dict], direction: int) -> None:
+    if reservations:
+        await db.slot_counters.bulk_write(
+            [UpdateOne({"_id": r["counter_id"]}, {"$inc": {"count": direction * r["units"]}}) for r in reservations],
+            ordered=False,
+        )
+
+
+async def release_slots(reservations: list[dict]) -> None:
+    """Give back units taken by ``reserve_slots``."""
+    await _apply(reservations, -1)
+
+
+def reservation_delta(reservations: Optional[list[dict]], held: Optional[list[dict]]) -> list[dict]:
+    """Units in ``reservations`` beyond what ``held`` has on the same counter."""
+    held_units = Counter()
+    for r in held or ():
+        held_units[r["counter_id"]] += r["units"]
+    delta = []
+    for r in reservations or ():
+        extra = r["units"] - held_units[r["counter_id"]]
+        if extra > 0:
+            delta.append({**r, "units": extra})
+    return delta
+
+
+async def reserve_slots(
+    store_id: str,
+    units_by_task_type: dict[str, int],
+    day: date,
+    hour: Optional[int],
+    held: Optional[list[dict]] = None,
+) -> list[dict]:
+    """
+    Atomically reserve ``units`` of capacity per task type for a store slot.
+
+    Units the booking already ``held`` on the same counter are not taken
+    again, only the difference. All task types are reserved in one unordered
+    ``bulk_write``; if any slot is full the ones that succeeded are released
+    again.
+
+    Returns:
+        list[dict]: Reservation records ({counter_id, task_type_id, slot, units})
+            to keep on the booking for a later release.
+
+    Raises:
+        HTTPException: 400 for task types the store has no capacity for,
+            409 when a slot is full.
+    """
+    task_type_ids = list(units_by_task_type)
+    docs = await db.store_task_capacities.aggregate(_capacity_pipeline(store_id, task_type_ids)).to_list(None)
+    config = {doc["task_type_id"]: doc for doc in docs}
+
+    missing = [t for t in task_type_ids if t not in config]
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Store has no capacity for task type(s): {', '.join(missing)}")
+
+    now = datetime.utcnow()
+    reservations = []
+    for task_type_id, units in units_by_task_type.items():
+        doc = config[task_type_id]
+        capacity = int(doc.get("capacity", 0))
+        if units > capacity:
+            raise HTTPException(
+                status_code=409,
+                detail=f"No capacity left on {day.isoformat()} for: {doc['task_type'].get('name', '')}",
+            )
+        slot = slot_for(doc["task_type"].get("slot_type", "max_per_day"), hour)
+        _id = counter_id(store_id, task_type_id, day, slot)
+        reservations.append({"counter_id": _id, "task_type_id": task_type_id, "slot": slot, "units": units})
+
+    taken = reservation_delta(reservations, held)
+    ops = []
+    for r in taken:
+        capacity = int(config[r["task_type_id"]].get("capacity", 0))
+        ops.append(UpdateOne(
+            {"_id": r["counter_id"], "count": {"$lte": capacity - r["units"]}},
+            {
+                "$inc": {"count": r["units"]},
+                "$set": {"capacity": capacity, "updated_at": now},
+                "$setOnInsert": {
+                    "store_id": store_id,
+                    "task_type_id": r["task_type_id"],
+                    "date": day.isoformat(),
+                    "slot": r["slot"],
+                },
+            },
+            upsert=True,
+        ))
+
+    try:
+        if ops:
+            await db.slot_counters.bulk_write(ops, ordered=False)
+    except BulkWriteError as e:
+        failed = {err["index"] for err in e.details.get("writeErrors", [])}
+        await release_slots([r for i, r in enumerate(taken) if i not in failed])
+        full = [config[taken[i]["task_type_id"]]["task_type"].get("name", "") for i in sorted(failed)]
+        raise HTTPException(
+            status_code=409,
+            detail=f"No capacity left on {day.isoformat()} for: {', '.join(full)}",
+        )
+
+    return reservations
@@ -0,0 +1,36 @@
+# app/utils/batch.py
+
+"""
+Batch get-by-ids: one ``$in`` query for up to ``MAX_BATCH_IDS`` ids, answered
+as ``{"items": {id: document}, "missing": [ids not found]}``.
+"""
+
+from typing import Optional
+
+from app.utils.pagination import clean_ids
+from app.utils.projection import is_inclusion
+
+
+async def batch_get(
+    collection,
+    ids: list[str],
+    *,
+    id_field: str = "id",
+    projection: Optional[dict] = None,
+) -> tuple[dict[str, dict], list[str]]:
+    """
+    Fetch every document whose ``id_field`` is in ``ids``.
+
+    Returns:
+        tuple: (documents keyed by id in request order, ids that were not found)
+    """
+    wanted = list(dict.fromkeys(ids))  # dedupe, keep request order
+    if is_inclusion(projection):
+        projection = {**projection, id_field: 1}
+    docs = await collection.find({id_field: {"$in": wanted}}, projection).to_list(None)
+    if id_field == "id":
+        clean_ids(docs)
+    found = {str(doc[id_field]): doc for doc in docs}
+    items = {i: found[i] for i in wanted if i in found}
+    missing = [i for i in wanted if i not in found]
+    return items, missing
@@ -0,0 +1,302 @@
+# app/utils/bulk_import.py
+
+"""
+Streaming bulk import of customers and vehicles.
+
+Rows are parsed incrementally from a CSV or NDJSON byte stream, validated with
+the same models as the single-row routes (``CustomerCreate`` / ``Vehicle``)
+and written in batches of ``IMPORT_BATCH_SIZE``:
+
+1. validate every row of the batch, recording row-level errors
+2. dedupe within the batch and against the database with one ``$in`` query
+   (phone numbers for customers, vehicle number + customer for vehicles)
+3. insert the remainder with one unordered ``bulk_write``
+
+A bad row never aborts the import; it is counted and reported with its line
+number. Rows rejected by a unique index at write time (a concurrent insert)
+count as duplicates.
+
+CSV columns map to model fields; dotted headers (``address.city``) build
+nested objects and ``tags`` is split on ``;``. Vehicle rows reference their
+owner by ``customer_id`` or ``customer_phone``.
+"""
+
+import codecs
+import csv
+import json
+import os
+from datetime import datetime
+from typing import Any, AsyncIterable, AsyncIterator, Literal, Optional
+from uuid import uuid4
+
+from pydantic import ValidationError
+from pymongo import InsertOne
+from pymongo.errors import BulkWriteError
+
+from app.db.mongo import db
+from app.models.customer import CustomerCreate
+from app.models.vehicle import Vehicle
+from app.utils.search_keys import add_vehicle_keys, search_keys
+
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "1000"))
+MAX_REPORTED_ERRORS = 1000
+DUPLICATE_KEY = 11000
+
+ImportFormat = Literal["csv", "ndjson"]
+
+
+class ImportReport:
+    def __init__(self):
+        self.received = 0
+        self.inserted = 0
+        self.duplicates = 0
+        self.failed = 0
+        self.errors: list[dict] = []
+
+    def error(self, line: int, message: str) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "error": message})
+
+    def as_dict(self) -> dict:
+        return {
+            "received": self.received,
+            "inserted": self.inserted,
+            "duplicates": self.duplicates,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+
+# ---------------------------
+# 🔹 Row parsing
+# ---------------------------
+async def _lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")  # multi-byte chars may straddle chunks
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *complete, pending = pending.split("\n")
+        for line in complete:
+            yield line
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+def _csv_row(header: list[str], values: list[str]) -> dict:
+    row: dict[str, Any] = {}
+    for column, value in zip(header, values):
+        value = value.strip()
+        if value == "":
+            continue
+        if column == "tags":
+            value = [tag.strip() for tag in value.split(";") if tag.strip()]
+        target = row
+        *parents, leaf = column.split(".")
+        for parent in parents:
+            target = target.setdefault(parent, {})
+        target[leaf] = value
+    return row
+
+
+async def parse_rows(chunks: AsyncIterable[bytes], format: ImportFormat) -> AsyncIterator[tuple[int, Any]]:
+    """
+    Yield ``(line number, row)`` pairs; a row is a dict, or an ``Exception``
+    for lines that could not be parsed.
+    """
+    line_no = 0
+    if format == "ndjson":
+        async for line in _lines(chunks):
+            line_no += 1
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+                yield line_no, row if isinstance(row, dict) else ValueError("row is not a JSON object")
+            except ValueError as e:
+                yield line_no, e
+        return
+
+    header: Optional[list[str]] = None
+    record, start = "", 0
+    async for line in _lines(chunks):
+        line_no += 1
+        if not record:
+            start = line_no
+        record += line + "\n"
+        if record.count('"') % 2:
+            continue  # quoted field spans lines
+        values = next(csv.reader([record]), [])
+        record = ""
+        if not any(v.strip() for v in values):
+            continue
+        if header is None:
+            header = [h.strip() for h in values]
+            continue
+        if len(values) > len(header):
+            yield start, ValueError(f"expected {len(header)} columns, got {len(values)}")
+            continue
+        yield start, _csv_row(header, values)
+    if record:
+        yield start, ValueError("unterminated quoted field")
+
+
+async def batches(rows: AsyncIterable[tuple[int, Any]], size: int) -> AsyncIterator[list[tuple[int, Any]]]:
+    batch = []
+    async for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _first_error(e: ValidationError) -> str:
+    err = e.errors()[0]
+    location = ".".join(str(part) for part in err["loc"])
+    return f"{location}: {err['msg']}" if location else err["msg"]
+
+
+async def _write(collection, docs: list[tuple[int, dict]], report: ImportReport) -> None:
+    if not docs:
+        return
+    try:
+        result = await collection.bulk_write([InsertOne(doc) for _, doc in docs], ordered=False)
+        report.inserted += result.inserted_count
+    except BulkWriteError as e:
+        report.inserted += e.details.get("nInserted", 0)
+        for err in e.details.get("writeErrors", []):
+            if err.get("code") == DUPLICATE_KEY:
+                report.duplicates += 1
+            else:
+                report.error(docs[err["index"]][0], err.get("errmsg", "write failed"))
+
+
+# ---------------------------
+# 🔹 Customers
+# ---------------------------
+async def _import_customer_batch(batch: list[tuple[int, Any]], defaults: dict, report: ImportReport) -> None:
+    now = datetime.utcnow()
+    valid: dict[str, tuple[int, dict]] = {}
+    for line, row in batch:
+        report.received += 1
+        if isinstance(row, Exception):
+            report.error(line, str(row))
+            continue
+        row = {**defaults, **row}
+        if row.get("email") == "":
+            row["email"] = None
+        try:
+            customer = CustomerCreate(**row)
+        except ValidationError as e:
+            report.error(line, _first_error(e))
+            continue
+        if customer.phone_number in valid:
+            report.duplicates += 1
+            continue
+        doc = customer.model_dump()
+        for field in ("store_id", "onboarded_by", "loyalty_card_id"):
+            if doc.get(field):
+                doc[field] = str(doc[field])
+        doc.update({"id": str(uuid4()), "created_at": now, "updated_at": now, "is_active": True})
+        doc["search_keys"] = search_keys(doc)
+        valid[customer.phone_number] = (line, doc)
+
+    if not valid:
+        return
+    existing = await db.customers.find(
+        {"phone_number": {"$in": list(valid)}}, {"_id": 0, "phone_number": 1}
+    ).to_list(None)
+    for doc in existing:
+        if valid.pop(doc["phone_number"], None):
+            report.duplicates += 1
+
+    await _write(db.customers, list(valid.values()), report)
+
+
+async def import_customers(
+    chunks: AsyncIterable[bytes],
+    format: ImportFormat,
+    defaults: Optional[dict] = None,
+    batch_size: int = IMPORT_BATCH_SIZE,
+) -> ImportReport:
+    """Import customers; ``defaults`` fill fields a row leaves out (e.g. store_id, source)."""
+    report = ImportReport()
+    async for batch in batches(parse_rows(chunks, format), batch_size):
+        await _import_customer_batch(batch, defaults or {}, report)
+    return report
+
+
+# ---------------------------
+# 🔹 Vehicles
+# ---------------------------
+async def _import_vehicle_batch(batch: list[tuple[int, Any]], report: ImportReport) -> None:
+    rows = []
+    for line, row in batch:
+        report.received += 1
+        if isinstance(row, Exception):
+            report.error(line, str(row))
+        else:
+            rows.append((line, row))
+
+    phones = list({row["customer_phone"] for _, row in rows if row.get("customer_phone") and not row.get("customer_id")})
+    owners = {}
+    if phones:
+        customers = await db.customers.find(
+            {"phone_number": {"$in": phones}}, {"_id": 0, "id": 1, "phone_number": 1}
+        ).to_list(None)
+        owners = {c["phone_number"]: c["id"] for c in customers}
+
+    now = datetime.utcnow()
+    valid: dict[tuple[str, str], tuple[int, dict]] = {}
+    for line, row in rows:
+        phone = row.pop("customer_phone", None)
+        if not row.get("customer_id") and phone:
+            if phone not in owners:
+                report.error(line, f"no customer with phone number {phone}")
+                continue
+            row["customer_id"] = owners[phone]
+        row.pop("id", None)
+        try:
+            vehicle = Vehicle(**row)
+        except ValidationError as e:
+            report.error(line, _first_error(e))
+            continue
+        key = (vehicle.vehicle_number, str(vehicle.customer_id))
+        if key in valid:
+            report.duplicates += 1
+            continue
+        doc = vehicle.model_dump(by_alias=True)
+        doc.update({"id": str(vehicle.id), "customer_id": key[1], "created_at": now, "updated_at": now})
+        valid[key] = (line, doc)
+
+    if not valid:
+        return
+    existing = await db.vehicles.find(
+        {"vehicle_number": {"$in": list({number for number, _ in valid})}},
+        {"_id": 0, "vehicle_number": 1, "customer_id": 1},
+    ).to_list(None)
+    for doc in existing:
+        if valid.pop((doc["vehicle_number"], str(doc["customer_id"])), None):
+            report.duplicates += 1
+
+    await _write(db.vehicles, list(valid.values()), report)
+
+    numbers: dict[str, list[str]] = {}
+    for number, customer_id in valid:
+        numbers.setdefault(customer_id, []).append(number)
+    await add_vehicle_keys(numbers)
+
+
+async def import_vehicles(
+    chunks: AsyncIterable[bytes],
+    format: ImportFormat,
+    batch_size: int = IMPORT_BATCH_SIZE,
+) -> ImportReport:
+    report = ImportReport()
+    async for batch in batches(parse_rows(chunks, format), batch_size):
+        await _import_vehicle_batch(batch, report)
+    return report
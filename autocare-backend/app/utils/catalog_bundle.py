@@ -0,0 +1,96 @@
+# app/utils/catalog_bundle.py
+
+"""
+Store-scoped catalog bundle for the quotation screens.
+
+Everything the panel used to fetch separately and join in the browser
+(services, addons, subservices, service pricing, labour rules, task types) is
+read in one concurrent round, already filtered to the store and vehicle
+category, and joined here into one tree per active service. The result is
+cached per (store, category) by ``catalog_cache`` under the versions of all
+six collections, so any catalog write rebuilds it.
+"""
+
+import asyncio
+from datetime import datetime
+
+from app.db.mongo import catalog_db
+from app.models.catalog import CatalogBundle, CatalogItem, CatalogLabour, CatalogService, CatalogSubservice
+from app.utils.quotation import compute_labour
+
+BUNDLE_COLLECTIONS = ("services", "addons", "subservices", "service_pricing", "labour_rules", "task_types")
+
+
+async def _fetch(collection: str, query: dict, projection: dict = None) -> list[dict]:
+    return await catalog_db[collection].find(query, projection).to_list(None)
+
+
+async def build_catalog(store_id: str, vehicle_category: str) -> CatalogBundle:
+    services, addons, subservices, pricing, labour_rules, task_types = await asyncio.gather(
+        _fetch("services", {"is_active": {"$ne": False}}),
+        _fetch("addons", {}, {"name": 1, "price": 1}),
+        _fetch("subservices", {"vehicle_category": {"$in": [vehicle_category, None]}}),
+        _fetch("service_pricing", {"store_id": store_id, "vehicle_category": vehicle_category}),
+        _fetch("labour_rules", {"vehicle_category": vehicle_category}),
+        _fetch("task_types", {}, {"name": 1}),
+    )
+    addons_by_id = {str(a["_id"]): a for a in addons}
+    subservices_by_id = {str(s["_id"]): s for s in subservices}
+    pricing_by_service = {str(p["service_id"]): p for p in pricing}
+    labour_by_task_type = {str(r["task_type_id"]): r for r in labour_rules}
+    task_type_names = {str(t["_id"]): t.get("name") for t in task_types}
+
+    tree = []
+    for service in sorted(services, key=lambda s: s.get("name", "")):
+        service_id = str(service["_id"])
+        task_type_id = str(service["task_type_id"])
+        price = pricing_by_service.get(service_id)
+        rule = labour_by_task_type.get(task_type_id)
+
+        labour = None
+        if rule:
+            if rule["charge_type"] == "fixed":
+                amount = float(rule["value"])
+            elif price:
+                amount = compute_labour(rule, float(price["base_price"]))
+            else:
+                amount = None  # a percentage of a price this store does not set
+            labour = CatalogLabour(
+                charge_type=rule["charge_type"],
+                value=float(rule["value"]),
+                amount=round(amount, 2) if amount is not None else None,
+            )
+
+        tree.append(CatalogService(
+            id=service_id,
+            name=service.get("name", ""),
+            task_type_id=task_type_id,
+            task_type_name=task_type_names.get(task_type_id),
+            tags=service.get("tags", []),
+            duration_minutes=service.get("duration_minutes"),
+            is_visible_to_customer=service.get("is_visible_to_customer", True),
+            base_price=float(price["base_price"]) if price else None,
+            tax_percent=float(price.get("tax_percent", 0.0)) if price else None,
+            include_tax=bool(price.get("include_tax", False)) if price else None,
+            labour=labour,
+            addons=[
+                CatalogItem(id=str(doc["_id"]), name=doc["name"], price=float(doc["price"]))
+                for doc in (addons_by_id.get(str(a)) for a in service.get("addon_ids", []))
+                if doc
+            ],
+            subservices=[
+                CatalogSubservice(
+                    id=str(doc["_id"]), name=doc["name"], price=float(doc["price"]),
+                    is_optional=doc.get("is_optional", True),
+                )
+                for doc in (subservices_by_id.get(str(s)) for s in service.get("subservice_ids", []))
+                if doc
+            ],
+        ))
+
+    return CatalogBundle(
+        store_id=store_id,
+        vehicle_category=vehicle_category,
+        services=tree,
+        generated_at=datetime.utcnow(),
+    )
@@ -0,0 +1,291 @@
+# app/utils/catalog_cache.py
+
+"""
+In-process cache of serialized catalog responses.
+
+Reference data (services, addons, subservices, task types, pricing, labour
+rules) is read on every panel page load but written a handful of times a day.
+Responses are cached as ready-to-send JSON bytes and tagged with the version of
+every collection they were built from. Write routes call ``invalidate`` which
+bumps that collection's counter in ``catalog_versions``; other workers notice
+the new version within ``CATALOG_VERSION_CHECK_SECONDS`` and rebuild.
+
+``respond`` serves a cached body over HTTP. Its strong ETag is derived from the
+cache key and the collection versions alone, so a matching ``If-None-Match``
+gets a 304 before any catalog query runs. Bodies are gzip/brotli compressed
+once per version and the compressed bytes are kept alongside the raw JSON.
+
+Loaders read through ``catalog_db`` (``secondaryPreferred``), so right after a
+write a body may be built from a secondary that has not replicated it yet. For
+``CATALOG_SETTLE_SECONDS`` after this worker sees a collection change, bodies
+built from it are provisional: they get a distinct ETag and are rebuilt once
+the window has passed. Set it to 0 when catalog reads go to the primary.
+
+When MongoDB is down or slow (``app.utils.db_guard``), ``respond`` falls back
+to the last body it built for the key, marked stale.
+
+Loaders registered with ``register`` are built by ``prime`` at startup, before
+the app reports ready.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional
+
+from fastapi import Request, Response
+from pymongo import ReadPreference, ReturnDocument
+from pymongo.errors import PyMongoError
+
+from app.db.mongo import CATALOG_READ_PREFERENCE, db
+from app.utils.db_guard import breaker, is_unavailable
+from app.utils.single_flight import SingleFlight
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+VERSION_CHECK_SECONDS = float(os.getenv("CATALOG_VERSION_CHECK_SECONDS", "1.0"))
+MAX_ENTRIES = int(os.getenv("CATALOG_CACHE_MAX_ENTRIES", "512"))
+MIN_COMPRESS_BYTES = int(os.getenv("CATALOG_MIN_COMPRESS_BYTES", "1024"))
+SETTLE_SECONDS = float(
+    os.getenv("CATALOG_SETTLE_SECONDS", "0" if CATALOG_READ_PREFERENCE == ReadPreference.PRIMARY else "5")
+)
+
+_SUFFIX = {"br": "-br", "gzip": "-gz"}
+STALE_WARNING = '110 - "Response is Stale"'
+
+
+def make_etag(key: str, versions: tuple[int, ...], settled: bool = True) -> str:
+    digest = hashlib.blake2b(f"{key}@{versions}{'' if settled else '~'}".encode(), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+
+def _accepted_encodings(header: str) -> set[str]:
+    accepted = set()
+    for part in header.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(name.strip())
+    return accepted
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """Weak comparison (RFC 9110 If-None-Match) ignoring our per-encoding suffix."""
+    if header.strip() == "*":
+        return True
+    opaque = etag.strip('"')
+    for candidate in header.split(","):
+        candidate = candidate.strip().removeprefix("W/").strip('"')
+        for suffix in _SUFFIX.values():
+            candidate = candidate.removesuffix(suffix)
+        if candidate == opaque:
+            return True
+    return False
+
+
+class CachedBody:
+    """A serialized response body plus its lazily built compressed variants."""
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self._encoded: dict[str, bytes] = {}
+
+    def encoded(self, encoding: str) -> bytes:
+        if encoding not in self._encoded:
+            if encoding == "br":
+                self._encoded[encoding] = brotli.compress(self.body, quality=9)
+            else:
+                self._encoded[encoding] = gzip.compress(self.body, compresslevel=9, mtime=0)
+        return self._encoded[encoding]
+
+    def negotiate(self, accept_encoding: str) -> Optional[str]:
+        if len(self.body) < MIN_COMPRESS_BYTES:
+            return None
+        accepted = _accepted_encodings(accept_encoding)
+        if brotli is not None and "br" in accepted:
+            return "br"
+        if "gzip" in accepted or "*" in accepted:
+            return "gzip"
+        return None
+
+
+Loader = Callable[[], Awaitable[bytes]]
+
+
+class CatalogCache:
+    def __init__(
+        self,
+        version_check_seconds: float = VERSION_CHECK_SECONDS,
+        max_entries: int = MAX_ENTRIES,
+        settle_seconds: float = SETTLE_SECONDS,
+    ):
+        self.version_check_seconds = version_check_seconds
+        self.max_entries = max_entries
+        self.settle_seconds = settle_seconds
+        self._versions: dict[str, int] = {}
+        self._checked_at: dict[str, float] = {}
+        self._changed_at: dict[str, float] = {}
+        # key -> (collections, versions, body, settled)
+        self._entries: OrderedDict[str, tuple[tuple[str, ...], tuple[int, ...], CachedBody, bool]] = OrderedDict()
+        self._loaders: dict[str, tuple[tuple[str, ...], Loader]] = {}
+        self._builds = SingleFlight()
+
+    @property
+    def _collection(self):
+        return db["catalog_versions"]
+
+    async def versions(self, collections: tuple[str, ...]) -> tuple[int, ...]:
+        """
+        Current version of each collection, re-read from ``catalog_versions``
+        at most once per ``version_check_seconds``.
+        """
+        now = time.monotonic()
+        stale = [
+            name for name in collections
+            if now - self._checked_at.get(name, float("-inf")) >= self.version_check_seconds
+        ]
+        if stale:
+            docs = await self._collection.find({"_id": {"$in": stale}}).to_list(None)
+            found = {doc["_id"]: int(doc.get("version", 0)) for doc in docs}
+            for name in stale:
+                version = found.get(name, 0)
+                if name in self._versions and self._versions[name] != version:
+                    self._changed_at[name] = now
+                self._versions[name] = version
+                self._checked_at[name] = now
+        return tuple(self._versions.get(name, 0) for name in collections)
+
+    def _settled(self, collections: tuple[str, ...]) -> bool:
+        """Whether every collection's last change is old enough for secondaries to have it."""
+        changed = max((self._changed_at.get(name, float("-inf")) for name in collections), default=float("-inf"))
+        return time.monotonic() - changed >= self.settle_seconds
+
+    async def get_or_load(
+        self,
+        key: str,
+        collections: tuple[str, ...],
+        loader: Loader,
+    ) -> bytes:
+        """
+        Return the cached body for ``key`` if it was built from the current
+        version of every collection in ``collections``, otherwise rebuild it.
+        """
+        return (await self._load(key, collections, await self.versions(collections), loader)).body
+
+    async def respond(
+        self,
+        request: Request,
+        key: str,
+        collections: tuple[str, ...],
+        loader: Loader,
+    ) -> Response:
+        """
+        Serve the cached body for ``key`` as a JSON response: 304 when the
+        client's ``If-None-Match`` is current, otherwise the raw or
+        precompressed bytes matching its ``Accept-Encoding``.
+
+        If MongoDB is unreachable or over its time budget, the last body built
+        for ``key`` is served instead, marked with a ``Warning: 110`` header.
+        """
+        headers = {"Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+        if_none_match = request.headers.get("if-none-match")
+        try:
+            versions = await self.versions(collections)
+            etag = make_etag(key, versions, self._settled(collections))
+            if if_none_match and _etag_matches(if_none_match, etag):
+                return Response(status_code=304, headers={**headers, "ETag": etag})
+            cached = await self._load(key, collections, versions, loader)
+        except PyMongoError as e:
+            entry = self._entries.get(key)
+            if entry is None or not is_unavailable(e):
+                raise
+            breaker.record_exception(e)
+            logger.warning("Serving stale %s: %s", key, e)
+            _, versions, cached, settled = entry
+            etag = make_etag(key, versions, settled)
+            headers["Warning"] = STALE_WARNING
+            if if_none_match and _etag_matches(if_none_match, etag):
+                return Response(status_code=304, headers={**headers, "ETag": etag})
+
+        encoding = cached.negotiate(request.headers.get("accept-encoding", ""))
+        if encoding is None:
+            return Response(content=cached.body, media_type="application/json", headers={**headers, "ETag": etag})
+        return Response(
+            content=cached.encoded(encoding),
+            media_type="application/json",
+            headers={**headers, "ETag": etag[:-1] + _SUFFIX[encoding] + '"', "Content-Encoding": encoding},
+        )
+
+    async def _load(
+        self,
+        key: str,
+        collections: tuple[str, ...],
+        versions: tuple[int, ...],
+        loader: Loader,
+    ) -> CachedBody:
+        settled = self._settled(collections)
+        entry = self._entries.get(key)
+        if entry and entry[1] == versions and (entry[3] or not settled):
+            self._entries.move_to_end(key)
+            return entry[2]
+
+        async def build() -> CachedBody:
+            cached = CachedBody(await loader())
+            self._entries[key] = (collections, versions, cached, settled)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return cached
+
+        # Requests that miss together (cold start, version bump) share one build
+        cached, _ = await self._builds.do((key, versions, settled), build)
+        return cached
+
+    async def invalidate(self, collection: str) -> int:
+        """Bump the shared version of ``collection`` and drop local entries built from it."""
+        doc = await self._collection.find_one_and_update(
+            {"_id": collection},
+            {"$inc": {"version": 1}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        version = int(doc["version"])
+        self._versions[collection] = version
+        self._checked_at[collection] = self._changed_at[collection] = time.monotonic()
+        for key in [k for k, entry in self._entries.items() if collection in entry[0]]:
+            del self._entries[key]
+        return version
+
+    def register(self, key: str, collections: tuple[str, ...], loader: Loader) -> None:
+        """Declare a response to build in ``prime``."""
+        self._loaders[key] = (collections, loader)
+
+    async def prime(self) -> None:
+        """Build every registered response that is not already current."""
+        await asyncio.gather(*(
+            self.get_or_load(key, collections, loader)
+            for key, (collections, loader) in self._loaders.items()
+        ))
+
+    def clear(self) -> None:
+        self._versions.clear()
+        self._checked_at.clear()
+        self._changed_at.clear()
+        self._entries.clear()
+
+
+catalog_cache = CatalogCache()
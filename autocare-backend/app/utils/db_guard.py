@@ -0,0 +1,184 @@
+# app/utils/db_guard.py
+
+"""
+Bounding the time requests spend on MongoDB.
+
+- ``DbTimeBudgetMiddleware`` runs every request under ``pymongo.timeout``
+  (client-side operation timeout). Every operation the handler issues gets a
+  ``maxTimeMS`` from the time left in the request's budget, and connection
+  checkout / server selection are capped by the same deadline. Motor runs
+  each operation under a copy of the caller's context, so the deadline reaches
+  its executor threads. Budgets are per route (``ROUTE_TIME_BUDGETS``, keyed
+  by path), ``DB_TIME_BUDGET_SECONDS`` otherwise.
+- ``breaker`` is a circuit breaker over the whole client. It opens after
+  ``DB_BREAKER_FAILURES`` timeouts / network errors within
+  ``DB_BREAKER_WINDOW_SECONDS`` (when they are at least ``DB_BREAKER_FAILURE_RATIO``
+  of the commands in that window). While open, collection access through
+  ``app.db.mongo`` raises ``DatabaseUnavailable`` immediately instead of
+  queueing on a sick server; one probe is let through every
+  ``DB_BREAKER_COOLDOWN_SECONDS`` and its success closes the breaker.
+
+Unavailability errors become 503s (``app/main.py``); cached catalog and store
+lists fall back to their last good body instead (``catalog_cache.respond``).
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Optional
+
+import pymongo
+from pymongo import monitoring
+from pymongo.errors import ConnectionFailure, PyMongoError, ServerSelectionTimeoutError, WaitQueueTimeoutError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIME_BUDGET = float(os.getenv("DB_TIME_BUDGET_SECONDS", "5"))
+CATALOG_TIME_BUDGET = float(os.getenv("DB_CATALOG_TIME_BUDGET_SECONDS", "1.5"))
+
+# Route path -> seconds of DB time per request, None = no limit (streamed exports, bulk imports)
+ROUTE_TIME_BUDGETS: dict[str, Optional[float]] = {
+    "/api/task-types": CATALOG_TIME_BUDGET,
+    "/api/services": CATALOG_TIME_BUDGET,
+    "/api/addons": CATALOG_TIME_BUDGET,
+    "/api/subservices": CATALOG_TIME_BUDGET,
+    "/api/service-pricing": CATALOG_TIME_BUDGET,
+    "/api/labour-rules": CATALOG_TIME_BUDGET,
+    "/api/catalog": CATALOG_TIME_BUDGET,
+    "/api/stores": CATALOG_TIME_BUDGET,
+    "/api/search": CATALOG_TIME_BUDGET,
+    "/api/export/customers": None,
+    "/api/export/vehicles": None,
+    "/api/export/vehicle-transactions": None,
+    "/api/import/customers": None,
+    "/api/import/vehicles": None,
+}
+
+BREAKER_FAILURES = int(os.getenv("DB_BREAKER_FAILURES", "10"))
+BREAKER_FAILURE_RATIO = float(os.getenv("DB_BREAKER_FAILURE_RATIO", "0.5"))
+BREAKER_WINDOW = float(os.getenv("DB_BREAKER_WINDOW_SECONDS", "10"))
+BREAKER_COOLDOWN = float(os.getenv("DB_BREAKER_COOLDOWN_SECONDS", "5"))
+
+# Command failures that mean "the server is slow or unreachable", not "the query is wrong"
+_MAX_TIME_MS_EXPIRED = 50
+_NETWORK_ERRORS = frozenset({"AutoReconnect", "NetworkTimeout", "ConnectionFailure", "ExecutionTimeout"})
+
+
+class DatabaseUnavailable(ConnectionFailure):
+    """Raised without touching the network while the circuit breaker is open."""
+
+
+def is_unavailable(exc: BaseException) -> bool:
+    """Timeouts and connection failures (as opposed to errors in the query itself)."""
+    return isinstance(exc, ConnectionFailure) or (isinstance(exc, PyMongoError) and exc.timeout)
+
+
+# ---------------------------
+# 🔹 Circuit breaker
+# ---------------------------
+class CircuitBreaker:
+    def __init__(
+        self,
+        failures: int = BREAKER_FAILURES,
+        failure_ratio: float = BREAKER_FAILURE_RATIO,
+        window: float = BREAKER_WINDOW,
+        cooldown: float = BREAKER_COOLDOWN,
+    ):
+        self.failures = failures
+        self.failure_ratio = failure_ratio
+        self.window = window
+        self.cooldown = cooldown
+        self.is_open = False
+        self._retry_at = 0.0
+        self._window_start = time.monotonic()
+        self._failed = 0
+        self._succeeded = 0
+        self._lock = threading.Lock()  # outcomes arrive from Motor's executor threads
+
+    def allow(self) -> bool:
+        """False while open, except for one probe per cooldown."""
+        if not self.is_open:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            if now < self._retry_at:
+                return False
+            self._retry_at = now + self.cooldown
+            return True
+
+    def check(self) -> None:
+        if not self.allow():
+            raise DatabaseUnavailable("MongoDB circuit breaker is open")
+
+    def _roll(self, now: float) -> None:
+        if now - self._window_start >= self.window:
+            self._window_start = now
+            self._failed = self._succeeded = 0
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.is_open:
+                self.is_open = False
+                self._window_start = time.monotonic()
+                self._failed = self._succeeded = 0
+                logger.warning("✅ MongoDB circuit breaker closed")
+                return
+            self._roll(time.monotonic())
+            self._succeeded += 1
+
+    def record_failure(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            if self.is_open:
+                self._retry_at = now + self.cooldown  # the probe failed
+                return
+            self._roll(now)
+            self._failed += 1
+            if self._failed >= self.failures and self._failed >= self.failure_ratio * (self._failed + self._succeeded):
+                self.is_open = True
+                self._retry_at = now + self.cooldown
+                logger.error(
+                    "❌ MongoDB circuit breaker opened: %d failures in %.0fs", self._failed, now - self._window_start
+                )
+
+    def record_exception(self, exc: BaseException) -> None:
+        """Count failures that happen before any command is sent (no listener event)."""
+        if isinstance(exc, (ServerSelectionTimeoutError, WaitQueueTimeoutError)) and not isinstance(
+            exc, DatabaseUnavailable
+        ):
+            self.record_failure()
+
+
+breaker = CircuitBreaker()
+
+
+class BreakerListener(monitoring.CommandListener):
+    """Feeds command outcomes to ``breaker``."""
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        pass
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        breaker.record_success()
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        failure = event.failure or {}
+        if failure.get("code") == _MAX_TIME_MS_EXPIRED or failure.get("errtype") in _NETWORK_ERRORS:
+            breaker.record_failure()
+
+
+# ---------------------------
+# 🔹 Middleware
+# ---------------------------
+class DbTimeBudgetMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        budget = ROUTE_TIME_BUDGETS.get(scope["path"], DEFAULT_TIME_BUDGET) if scope["type"] == "http" else None
+        if budget is None:
+            await self.app(scope, receive, send)
+            return
+        with pymongo.timeout(budget):
+            await self.app(scope, receive, send)
@@ -0,0 +1,110 @@
+# app/utils/hub_graph.py
+
+"""
+In-memory garage <-> hub graph built from ``garage_hub_tags``.
+
+The whole tag collection is small (one row per edge), so each worker keeps it
+as two adjacency maps and answers "hubs of garage G" and "garages of hub H"
+from memory. The graph is versioned through ``catalog_versions`` like the
+catalog cache: tag write routes apply their delta locally and bump the shared
+version, and other workers reload the edge list when they see a newer version
+(checked at most once per ``CATALOG_VERSION_CHECK_SECONDS``).
+"""
+
+import asyncio
+from typing import Iterable, Optional
+
+from app.db.mongo import db
+from app.utils.catalog_cache import catalog_cache
+
+COLLECTION = "garage_hub_tags"
+
+
+class HubGraph:
+    def __init__(self):
+        self._hubs_by_garage: dict[str, set[str]] = {}
+        self._garages_by_hub: dict[str, set[str]] = {}
+        self._version: Optional[int] = None
+        self._lock = asyncio.Lock()
+
+    def _link(self, garage_id: str, hub_id: str) -> None:
+        self._hubs_by_garage.setdefault(garage_id, set()).add(hub_id)
+        self._garages_by_hub.setdefault(hub_id, set()).add(garage_id)
+
+    def _unlink(self, garage_id: str, hub_id: str) -> None:
+        for index, key, value in (
+            (self._hubs_by_garage, garage_id, hub_id),
+            (self._garages_by_hub, hub_id, garage_id),
+        ):
+            edges = index.get(key)
+            if edges is not None:
+                edges.discard(value)
+                if not edges:
+                    del index[key]
+
+    async def _load(self, version: int) -> None:
+        tags = await db[COLLECTION].find({}, {"_id": 0, "garage_id": 1, "hub_id": 1}).to_list(None)
+        self._hubs_by_garage, self._garages_by_hub = {}, {}
+        for tag in tags:
+            self._link(str(tag["garage_id"]), str(tag["hub_id"]))
+        self._version = version
+
+    async def refresh(self) -> None:
+        """Rebuild both adjacency maps from the tag collection."""
+        async with self._lock:
+            (version,) = await catalog_cache.versions((COLLECTION,))
+            await self._load(version)
+
+    async def ensure_current(self) -> None:
+        (version,) = await catalog_cache.versions((COLLECTION,))
+        if version == self._version:
+            return
+        async with self._lock:
+            # Requests queued behind another reload find the graph already current
+            (version,) = await catalog_cache.versions((COLLECTION,))
+            if version != self._version:
+                await self._load(version)
+
+    async def apply(self, garage_id: str, added: Iterable[str] = (), removed: Iterable[str] = ()) -> None:
+        """
+        Record a tag write made by this worker and publish it to the others.
+
+        The delta is applied in place when this worker was current before the
+        write; if another worker wrote in between, the next read reloads.
+        """
+        version = await catalog_cache.invalidate(COLLECTION)
+        if self._version is not None and version == self._version + 1:
+            for hub_id in added:
+                self._link(garage_id, str(hub_id))
+            for hub_id in removed:
+                self._unlink(garage_id, str(hub_id))
+            self._version = version
+        else:
+            self._version = None
+
+    async def invalidate(self) -> None:
+        """
+        Publish a tag write whose outcome is unknown (it failed part way): every
+        worker, this one included, reloads on its next read.
+        """
+        await catalog_cache.invalidate(COLLECTION)
+        self._version = None
+
+    async def hubs_for_garage(self, garage_id: str) -> list[str]:
+        await self.ensure_current()
+        return sorted(self._hubs_by_garage.get(garage_id, ()))
+
+    async def garages_for_hub(self, hub_id: str) -> list[str]:
+        await self.ensure_current()
+        return sorted(self._garages_by_hub.get(hub_id, ()))
+
+    async def hubs_for_garages(self, garage_ids: Iterable[str]) -> dict[str, list[str]]:
+        await self.ensure_current()
+        return {g: sorted(self._hubs_by_garage.get(g, ())) for g in garage_ids}
+
+    async def garages_for_hubs(self, hub_ids: Iterable[str]) -> dict[str, list[str]]:
+        await self.ensure_current()
+        return {h: sorted(self._garages_by_hub.get(h, ())) for h in hub_ids}
+
+
+hub_graph = HubGraph()
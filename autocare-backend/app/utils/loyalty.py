@@ -0,0 +1,199 @@
+# app/utils/loyalty.py
+
+"""
+Bucketed loyalty reward history.
+
+Reward entries live in ``loyalty_rewards``, ``REWARD_BUCKET_SIZE`` entries per
+bucket document keyed on ``(card_id, bucket)``. The card keeps a running
+``reward_count`` and only its last ``RECENT_REWARDS`` entries embedded in
+``reward_history``, so card reads stay the same size however long the
+customer's history gets.
+
+Every entry carries ``seq``, its 1-based position in the card's history. Each
+reward claims its ``seq`` with a compare-and-set on the card's ``reward_count``,
+and ``seq`` decides the bucket, so concurrent rewards never race for a bucket slot.
+
+Bucket writes only ever ``$addToSet`` numbered entries, so they are idempotent
+and never drop an entry another request added. A reward that reached the card
+but not its bucket (the process died in between) is written again with the
+next reward's recent window; ``reward_page`` does not rely on ``seq`` being
+gap-free in the buckets.
+"""
+
+import os
+from datetime import datetime
+from typing import Optional
+
+from fastapi import HTTPException
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from app.db.mongo import db
+
+REWARD_BUCKET_SIZE = int(os.getenv("LOYALTY_REWARD_BUCKET_SIZE", "100"))
+RECENT_REWARDS = int(os.getenv("LOYALTY_RECENT_REWARDS", "10"))
+
+
+def bucket_of(seq: int) -> int:
+    return (seq - 1) // REWARD_BUCKET_SIZE
+
+
+def number_entries(entries: list[dict], start: int = 1) -> list[dict]:
+    return [{**entry, "seq": start + i} for i, entry in enumerate(entries)]
+
+
+def bucket_docs(card_id: str, entries: list[dict]) -> list[dict]:
+    """Bucket documents holding already numbered entries."""
+    buckets: dict[int, list[dict]] = {}
+    for entry in entries:
+        buckets.setdefault(bucket_of(entry["seq"]), []).append(entry)
+
+    now = datetime.utcnow()
+    return [
+        {
+            "_id": f"{card_id}:{bucket}",
+            "card_id": card_id,
+            "bucket": bucket,
+            "entries": items,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for bucket, items in sorted(buckets.items())
+    ]
+
+
+def bucket_writes(card_id: str, entries: list[dict]) -> list[UpdateOne]:
+    """Idempotent bucket upserts adding already numbered entries to whatever the buckets hold."""
+    return [
+        UpdateOne(
+            {"card_id": card_id, "bucket": doc["bucket"]},
+            {
+                "$addToSet": {"entries": {"$each": doc["entries"]}},
+                "$set": {"updated_at": doc["updated_at"]},
+                "$setOnInsert": {"_id": doc["_id"], "created_at": doc["created_at"]},
+            },
+            upsert=True,
+        )
+        for doc in bucket_docs(card_id, entries)
+    ]
+
+
+async def write_buckets(card_id: str, entries: list[dict]) -> None:
+    ops = bucket_writes(card_id, entries)
+    if not ops:
+        return
+    try:
+        await db.loyalty_rewards.bulk_write(ops, ordered=False)
+    except BulkWriteError as e:
+        errors = e.details.get("writeErrors", [])
+        if any(error.get("code") != 11000 for error in errors):
+            raise
+        # Another request created these buckets concurrently; they exist now
+        await db.loyalty_rewards.bulk_write([ops[error["index"]] for error in errors], ordered=False)
+
+
+async def migrate_card(card: dict) -> Optional[int]:
+    """
+    Move a legacy card's embedded ``reward_history`` into buckets.
+
+    Returns:
+        int | None: Number of entries moved, or None if the card was already migrated.
+    """
+    if "reward_count" in card:
+        return None
+
+    card_id = card["id"]
+    entries = number_entries(card.get("reward_history") or [])
+    await write_buckets(card_id, entries)
+    await db.loyalty_cards.update_one(
+        {"id": card_id, "reward_count": {"$exists": False}},
+        {"$set": {"reward_count": len(entries), "reward_history": entries[-RECENT_REWARDS:]}},
+    )
+    return len(entries)
+
+
+async def append_reward(card_id: str, entry: dict) -> dict:
+    """
+    Credit a reward: bump the card's balance and count, keep the entry in the
+    embedded recent window and add the window to its buckets.
+
+    Raises:
+        HTTPException: 404 if the card does not exist.
+    """
+    credited = await _credit(card_id, entry)
+    if credited is None:
+        legacy = await db.loyalty_cards.find_one({"id": card_id})
+        if not legacy:
+            raise HTTPException(status_code=404, detail="Loyalty card not found")
+        await migrate_card(legacy)
+        credited = await _credit(card_id, entry)
+
+    numbered, recent = credited
+    # The whole recent window, so entries an earlier request credited but never bucketed are restored
+    await write_buckets(card_id, recent)
+    return numbered
+
+
+async def _credit(card_id: str, entry: dict) -> Optional[tuple[dict, list[dict]]]:
+    """
+    Number and count the reward on a migrated card.
+
+    ``seq`` is claimed with a compare-and-set on ``reward_count``, so the entry
+    embedded in ``reward_history`` is the same numbered entry that goes into
+    its bucket. A concurrent reward that claimed the number first means a retry.
+
+    Returns:
+        tuple | None: (numbered entry, the card's recent window after the
+            write), or None for missing or legacy cards.
+    """
+    while True:
+        card = await db.loyalty_cards.find_one(
+            {"id": card_id, "reward_count": {"$exists": True}}, {"_id": 0, "reward_count": 1}
+        )
+        if card is None:
+            return None
+        numbered = {**entry, "seq": card["reward_count"] + 1}
+        credited = await db.loyalty_cards.find_one_and_update(
+            {"id": card_id, "reward_count": card["reward_count"]},
+            {
+                "$inc": {"points_balance": entry["points"], "reward_count": 1},
+                "$push": {"reward_history": {"$each": [numbered], "$slice": -RECENT_REWARDS}},
+                "$set": {"last_updated": datetime.utcnow()},
+            },
+            projection={"_id": 0, "reward_history": 1},
+            return_document=ReturnDocument.AFTER,
+        )
+        if credited:
+            return numbered, credited["reward_history"]
+
+
+async def reward_page(card_id: str, limit: int, before: Optional[int]) -> tuple[list[dict], Optional[int]]:
+    """
+    One page of a card's reward history, newest first.
+
+    Args:
+        before: Only entries with ``seq`` below this (the previous page's cursor).
+
+    Returns:
+        tuple: (entries, cursor for the next page or None on the last page)
+    """
+    query: dict = {"card_id": card_id}
+    if before is not None:
+        if before <= 1:
+            return [], None
+        query["bucket"] = {"$lte": bucket_of(before - 1)}
+
+    # Buckets hold disjoint seq ranges, so reading them newest first until more
+    # than a page is collected finds the page even where seq has gaps
+    buckets = db.loyalty_rewards.find(query, {"_id": 0, "entries": 1}).sort("bucket", -1)
+    entries: list[dict] = []
+    async for bucket in buckets.batch_size(limit // REWARD_BUCKET_SIZE + 2):
+        entries.extend(e for e in bucket.get("entries", []) if before is None or e["seq"] < before)
+        if len(entries) > limit:
+            break
+    await buckets.close()
+
+    entries.sort(key=lambda e: e["seq"], reverse=True)
+    page = entries[:limit]
+    next_cursor = page[-1]["seq"] if len(entries) > limit else None
+    return page, next_cursor
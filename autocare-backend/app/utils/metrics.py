@@ -0,0 +1,204 @@
+# app/utils/metrics.py
+
+"""
+Prometheus metrics for HTTP requests and MongoDB commands.
+
+- ``MetricsMiddleware`` (pure ASGI) times every request and labels it with the
+  matched route template (``/api/customers/{customer_id}``), never the raw
+  path, so label cardinality stays bounded.
+- ``MongoCommandListener`` / ``MongoPoolListener`` are pymongo event listeners
+  registered on the Motor client (``app/db/mongo.py``); they time each command
+  per collection and operation, count documents returned by cursors, and time
+  connection-pool checkouts.
+- ``SINGLE_FLIGHT_REQUESTS`` counts requests coalesced by
+  ``app.utils.single_flight``.
+
+``render`` produces the Prometheus text format served at ``/metrics``. With
+several uvicorn workers set ``PROMETHEUS_MULTIPROC_DIR`` to a shared, empty
+directory so every worker's samples are aggregated.
+"""
+
+import os
+import threading
+import time
+from typing import Optional
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client import REGISTRY, multiprocess
+from pymongo import monitoring
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+
+MONGO_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+DOCUMENT_BUCKETS = (0, 1, 5, 10, 50, 100, 500, 1000, 5000, 10000)
+
+# Handshake, auth and topology chatter that is not application work
+_IGNORED_COMMANDS = frozenset({
+    "hello", "ismaster", "isMaster", "ping", "saslStart", "saslContinue", "authenticate",
+    "endSessions", "buildInfo", "buildinfo", "getnonce", "killCursors",
+})
+
+# ---------------------------
+# 🔹 Metric families
+# ---------------------------
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being served",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+MONGO_COMMAND_DURATION = Histogram(
+    "mongodb_command_duration_seconds",
+    "MongoDB command round-trip time",
+    ["collection", "command", "outcome"],
+    buckets=MONGO_BUCKETS,
+)
+MONGO_DOCUMENTS_RETURNED = Histogram(
+    "mongodb_command_documents_returned",
+    "Documents returned per MongoDB command (cursor batches and findAndModify)",
+    ["collection", "command"],
+    buckets=DOCUMENT_BUCKETS,
+)
+MONGO_POOL_CHECKOUT_WAIT = Histogram(
+    "mongodb_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled MongoDB connection",
+    ["outcome"],
+    buckets=MONGO_BUCKETS,
+)
+MONGO_POOL_CHECKED_OUT = Gauge(
+    "mongodb_pool_checked_out_connections",
+    "MongoDB connections currently checked out of the pool",
+    multiprocess_mode="livesum",
+)
+SINGLE_FLIGHT_REQUESTS = Counter(
+    "single_flight_requests_total",
+    "Coalesced read handlers: requests that ran the handler (leader) or shared an in-flight result (coalesced)",
+    ["handler", "role"],
+)
+
+
+# ---------------------------
+# 🔹 HTTP
+# ---------------------------
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+        in_flight = HTTP_REQUESTS_IN_FLIGHT.labels(method)
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_flight.dec()
+            # The router stores the matched route in the (shared) scope
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.labels(
+                method, getattr(route, "path", "<unmatched>"), str(status)
+            ).observe(time.perf_counter() - started)
+
+
+# ---------------------------
+# 🔹 MongoDB
+# ---------------------------
+def _collection(event: monitoring.CommandStartedEvent) -> str:
+    target = event.command.get(event.command_name)
+    if event.command_name == "getMore":
+        target = event.command.get("collection")
+    return target if isinstance(target, str) else "<database>"
+
+
+def _documents(command: str, reply: dict) -> Optional[int]:
+    cursor = reply.get("cursor")
+    if isinstance(cursor, dict):
+        return len(cursor.get("firstBatch", cursor.get("nextBatch", ())))
+    if command == "findAndModify":
+        return 0 if reply.get("value") is None else 1
+    return None
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    def __init__(self):
+        # Succeeded/failed events carry no command body; remember the target by request id
+        self._pending: dict[tuple, tuple[str, str]] = {}
+        self._lock = threading.Lock()
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        if event.command_name in _IGNORED_COMMANDS:
+            return
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = (_collection(event), event.command_name)
+
+    def _finish(self, event, outcome: str) -> Optional[tuple[str, str]]:
+        with self._lock:
+            target = self._pending.pop((event.connection_id, event.request_id), None)
+        if target is not None:
+            MONGO_COMMAND_DURATION.labels(target[0], target[1], outcome).observe(event.duration_micros / 1e6)
+        return target
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        target = self._finish(event, "ok")
+        if target is not None:
+            count = _documents(target[1], event.reply)
+            if count is not None:
+                MONGO_DOCUMENTS_RETURNED.labels(*target).observe(count)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self._finish(event, "error")
+
+
+class MongoPoolListener(monitoring.ConnectionPoolListener):
+    def connection_checked_out(self, event: monitoring.ConnectionCheckedOutEvent) -> None:
+        MONGO_POOL_CHECKED_OUT.inc()
+        if event.duration is not None:
+            MONGO_POOL_CHECKOUT_WAIT.labels("ok").observe(event.duration)
+
+    def connection_check_out_failed(self, event: monitoring.ConnectionCheckOutFailedEvent) -> None:
+        if event.duration is not None:
+            MONGO_POOL_CHECKOUT_WAIT.labels("error").observe(event.duration)
+
+    def connection_checked_in(self, event: monitoring.ConnectionCheckedInEvent) -> None:
+        MONGO_POOL_CHECKED_OUT.dec()
+
+    def _ignore(self, event) -> None:
+        pass
+
+    # The remaining pool events are not measured (the base class methods raise)
+    pool_created = pool_ready = pool_cleared = pool_closed = _ignore
+    connection_created = connection_ready = connection_closed = connection_check_out_started = _ignore
+
+
+def mongo_listeners() -> list:
+    return [MongoCommandListener(), MongoPoolListener()] if METRICS_ENABLED else []
+
+
+# ---------------------------
+# 🔹 Exposition
+# ---------------------------
+def render() -> tuple[bytes, str]:
+    """Current samples in the Prometheus text format, and their content type."""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
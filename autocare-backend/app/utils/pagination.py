@@ -0,0 +1,128 @@
+# app/utils/pagination.py
+
+"""
+Keyset (cursor) pagination over ``(created_at, id)``.
+
+List endpoints sort newest first on ``created_at`` with the document id as a
+tie-breaker, and hand out an opaque cursor encoding the last row of the page.
+The next page is an index range scan starting right after that row, so page
+1000 costs the same as page 1.
+
+List endpoints keep returning a bare JSON array; the cursor for the next page
+travels in the ``X-Next-Cursor`` response header. Callers that send neither
+``limit`` nor ``cursor`` get the full, unpaginated list as before.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Optional
+
+from fastapi import HTTPException, Response
+
+from app.utils.projection import strip_keys, with_keys
+from app.utils.serialization import AppJSONResponse, json_response, serialize_list
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(doc: dict, id_field: str = "id") -> str:
+    created_at = doc.get("created_at")
+    payload = {
+        "c": created_at.isoformat() if isinstance(created_at, datetime) else None,
+        "i": str(doc[id_field]),
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> tuple[Optional[datetime], str]:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw)
+        created_at = datetime.fromisoformat(payload["c"]) if payload["c"] else None
+        return created_at, str(payload["i"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_filter(token: str, id_field: str = "id") -> dict:
+    """Filter matching every row strictly after the cursor in (created_at desc, id desc) order."""
+    created_at, last_id = decode_cursor(token)
+    if created_at is None:
+        # Rows without created_at sort last; only the id tie-break remains
+        return {"created_at": None, id_field: {"$lt": last_id}}
+    return {"$or": [
+        {"created_at": {"$lt": created_at}},
+        {"created_at": created_at, id_field: {"$lt": last_id}},
+        {"created_at": None},
+    ]}
+
+
+async def fetch_page(
+    collection,
+    query: dict,
+    *,
+    limit: Optional[int],
+    cursor: Optional[str],
+    id_field: str = "id",
+    projection: Optional[dict] = None,
+) -> tuple[list[dict], Optional[str]]:
+    """
+    Fetch one page of ``query`` from ``collection``.
+
+    A ``projection`` is widened with the sort keys for the cursor; they are
+    stripped again before the documents are returned.
+
+    Returns:
+        tuple: (documents, cursor for the next page or None on the last page)
+    """
+    if limit is None and cursor is None:
+        return await collection.find(query, projection).to_list(None), None
+
+    limit = limit or DEFAULT_LIMIT
+    projection, extra = with_keys(projection, ("created_at", id_field))
+    if cursor:
+        query = {"$and": [query, keyset_filter(cursor, id_field)]} if query else keyset_filter(cursor, id_field)
+
+    docs = await (
+        collection.find(query, projection)
+        .sort([("created_at", -1), (id_field, -1)])
+        .limit(limit + 1)
+        .to_list(None)
+    )
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_cursor(docs[-1], id_field)
+    return strip_keys(docs, extra), next_cursor
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]) -> None:
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+
+def page_response(docs: list, next_cursor: Optional[str]) -> Response:
+    """Plain documents as an orjson response, skipping FastAPI's jsonable_encoder pass."""
+    response = AppJSONResponse(docs)
+    set_next_cursor(response, next_cursor)
+    return response
+
+
+async def catalog_page(collection, query: dict, model: type, *, limit: Optional[int], cursor: Optional[str]) -> Response:
+    """One validated page of a catalog collection (keyed on ``_id``) as a JSON response."""
+    docs, next_cursor = await fetch_page(collection, query, limit=limit, cursor=cursor, id_field="_id")
+    response = json_response(serialize_list(model, docs))
+    set_next_cursor(response, next_cursor)
+    return response
+
+
+def clean_ids(docs: list[dict]) -> list[dict[str, Any]]:
+    """Expose the public ``id`` and drop Mongo's ``_id``, as the routers always have."""
+    for doc in docs:
+        doc["id"] = doc.get("id") or str(doc["_id"])
+        doc.pop("_id", None)
+    return docs
@@ -0,0 +1,66 @@
+# app/utils/projection.py
+
+"""
+``fields=`` query parameter support.
+
+Read routes accept a comma-separated ``fields`` list, checked against a
+per-resource whitelist, and turn it into a Mongo projection so unrequested
+fields never leave the database. ``id`` is always returned. Fields that are
+not whitelisted (e.g. a store's ``password``) cannot be requested.
+"""
+
+from typing import Iterable, Optional
+
+from fastapi import HTTPException
+
+FIELDS_DESCRIPTION = "Comma-separated list of fields to return (default: all)"
+
+
+def parse_fields(fields: Optional[str], allowed: frozenset[str]) -> Optional[dict]:
+    """
+    Turn a ``fields`` parameter into a projection.
+
+    Returns:
+        dict | None: Inclusion projection, or None to return whole documents.
+
+    Raises:
+        HTTPException: 400 if a requested field is not in ``allowed``.
+    """
+    if not fields:
+        return None
+    requested = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = requested - allowed
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown field(s): {', '.join(sorted(unknown))}. Allowed: {', '.join(sorted(allowed))}",
+        )
+    return {"id": 1, **{field: 1 for field in sorted(requested)}}
+
+
+def is_inclusion(projection: Optional[dict]) -> bool:
+    return bool(projection) and any(projection.values())
+
+
+def with_keys(projection: Optional[dict], keys: Iterable[str]) -> tuple[Optional[dict], list[str]]:
+    """
+    Widen a projection with keys the handler needs internally (e.g. the
+    pagination sort keys).
+
+    Exclusion projections (e.g. a resource's default ``{"password": 0}``)
+    already return the keys and are left alone.
+
+    Returns:
+        tuple: (widened projection, keys to strip from the documents afterwards)
+    """
+    if not is_inclusion(projection):
+        return projection, []
+    extra = [key for key in keys if key not in projection]
+    return {**projection, **{key: 1 for key in extra}}, extra
+
+
+def strip_keys(docs: list[dict], keys: list[str]) -> list[dict]:
+    for doc in docs:
+        for key in keys:
+            doc.pop(key, None)
+    return docs
@@ -0,0 +1,191 @@
+# app/utils/query_budget.py
+
+"""
+Per-request MongoDB query accounting.
+
+``QueryBudgetMiddleware`` puts a ``QueryTracker`` in a contextvar for every
+request; ``QueryTrackerListener`` (registered on the Motor client) finds it
+from the command thread, since Motor runs each operation under a copy of the
+caller's context. Each request's round trips and DB time go out in a
+``Server-Timing`` header (``db;dur=12.4;desc="5 queries"``), visible in the
+browser's network panel.
+
+Budgets are enforced when ``QUERY_BUDGET_MODE`` is ``log`` or ``raise`` (set
+it in development and tests):
+
+- more than ``QUERY_BUDGET_MAX_QUERIES`` round trips in one request, or
+- the same query shape (command, collection, filter keys with values erased)
+  issued more than ``QUERY_BUDGET_MAX_REPEATS`` times: the signature of a
+  per-item lookup inside a loop (N+1).
+
+``raise`` fails the request with ``QueryBudgetExceeded`` before its response
+starts, which surfaces as an exception under ``TestClient``.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, Optional
+
+from pymongo import monitoring
+
+logger = logging.getLogger(__name__)
+
+QUERY_BUDGET_MODE = os.getenv("QUERY_BUDGET_MODE", "off").lower()  # off | log | raise
+MAX_QUERIES = int(os.getenv("QUERY_BUDGET_MAX_QUERIES", "25"))
+MAX_REPEATS = int(os.getenv("QUERY_BUDGET_MAX_REPEATS", "5"))
+
+# Routes that issue one query per batch by design: (max queries, max repeats), None = unlimited
+ROUTE_BUDGETS: dict[str, tuple[Optional[int], Optional[int]]] = {
+    "/api/export/customers": (None, None),
+    "/api/export/vehicles": (None, None),
+    "/api/export/vehicle-transactions": (None, None),
+    "/api/import/customers": (None, None),
+    "/api/import/vehicles": (None, None),
+}
+
+_IGNORED_COMMANDS = frozenset({
+    "hello", "ismaster", "isMaster", "ping", "saslStart", "saslContinue", "authenticate",
+    "endSessions", "buildInfo", "buildinfo", "getnonce",
+})
+
+_current: ContextVar[Optional["QueryTracker"]] = ContextVar("query_tracker", default=None)
+
+
+class QueryBudgetExceeded(RuntimeError):
+    pass
+
+
+# ---------------------------
+# 🔹 Query shapes
+# ---------------------------
+def _erase(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {key: _erase(item) for key, item in sorted(value.items())}
+    if isinstance(value, list):
+        return [_erase(value[0])] if value else []
+    return "?"
+
+
+def query_shape(command_name: str, command: dict) -> str:
+    """``find customers {"id": "?"}``: the command with every literal erased."""
+    collection = command.get("collection") if command_name == "getMore" else command.get(command_name)
+    if command_name == "find":
+        target = command.get("filter", {})
+    elif command_name in ("findAndModify", "distinct"):
+        target = command.get("query", {})
+    elif command_name in ("update", "delete"):
+        statements = command.get("updates" if command_name == "update" else "deletes") or [{}]
+        target = statements[0].get("q", {})
+    elif command_name == "aggregate":
+        pipeline = command.get("pipeline") or [{}]
+        target = pipeline[0].get("$match", {})
+    elif command_name == "getMore":
+        target = command.get("getMore")  # one cursor, many batches: the cursor id is the shape
+        return f"getMore {collection} {target}"
+    else:
+        target = {}
+    return f"{command_name} {collection} {_erase(target)}"
+
+
+# ---------------------------
+# 🔹 Tracking
+# ---------------------------
+class QueryTracker:
+    def __init__(self):
+        self.count = 0
+        self.db_seconds = 0.0
+        self.shapes: Counter[str] = Counter()
+        self._lock = threading.Lock()  # concurrent operations report from several executor threads
+
+    def started(self, shape: str) -> None:
+        with self._lock:
+            self.count += 1
+            self.shapes[shape] += 1
+
+    def finished(self, seconds: float) -> None:
+        with self._lock:
+            self.db_seconds += seconds
+
+    def server_timing(self, app_seconds: float) -> str:
+        return (
+            f'db;dur={self.db_seconds * 1000:.1f};desc="{self.count} queries", '
+            f"app;dur={app_seconds * 1000:.1f}"
+        )
+
+    def violations(self, max_queries: Optional[int], max_repeats: Optional[int]) -> list[str]:
+        problems = []
+        if max_queries is not None and self.count > max_queries:
+            problems.append(f"{self.count} queries (budget {max_queries})")
+        if max_repeats is not None:
+            for shape, times in self.shapes.most_common():
+                if times <= max_repeats:
+                    break
+                problems.append(f"{times}x {shape} (possible N+1, limit {max_repeats})")
+        return problems
+
+
+class QueryTrackerListener(monitoring.CommandListener):
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        tracker = _current.get()
+        if tracker is not None and event.command_name not in _IGNORED_COMMANDS:
+            tracker.started(query_shape(event.command_name, event.command))
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        self._finished(event)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self._finished(event)
+
+    def _finished(self, event) -> None:
+        tracker = _current.get()
+        if tracker is not None and event.command_name not in _IGNORED_COMMANDS:
+            tracker.finished(event.duration_micros / 1e6)
+
+
+# ---------------------------
+# 🔹 Middleware
+# ---------------------------
+class QueryBudgetMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        tracker = QueryTracker()
+        token = _current.set(tracker)
+        started = time.perf_counter()
+        checked = False
+
+        def check() -> None:
+            nonlocal checked
+            if checked or QUERY_BUDGET_MODE == "off":
+                return
+            checked = True
+            path = getattr(scope.get("route"), "path", scope["path"])
+            max_queries, max_repeats = ROUTE_BUDGETS.get(path, (MAX_QUERIES, MAX_REPEATS))
+            problems = tracker.violations(max_queries, max_repeats)
+            if not problems:
+                return
+            message = f"Query budget exceeded on {scope['method']} {path}: " + "; ".join(problems)
+            if QUERY_BUDGET_MODE == "raise":
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                check()
+                timing = tracker.server_timing(time.perf_counter() - started)
+                message["headers"] = [*message.get("headers", []), (b"server-timing", timing.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
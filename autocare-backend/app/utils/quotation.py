@@ -0,0 +1,170 @@
+# app/utils/quotation.py
+
+"""
+Server-side quotation engine for booking tasks.
+
+Everything a ``BookingTaskUpdateRequest`` references is resolved with one
+``$in`` query per collection, in two concurrent rounds:
+
+1. services + store pricing (by service id and vehicle category)
+2. labour rules (by the services' task types) + addons + subservices
+
+so a quotation costs the same number of round trips whether it has one task
+or fifty.
+"""
+
+import asyncio
+from typing import Optional
+
+from fastapi import HTTPException
+
+from app.db.mongo import db
+from app.models.booking import BookingTaskUpdateRequest, Quotation, QuotedItem, QuotedTask
+
+
+def _round(value: float) -> float:
+    return round(value, 2)
+
+
+def _by_id(docs: list[dict]) -> dict[str, dict]:
+    return {str(doc["_id"]): doc for doc in docs}
+
+
+def compute_labour(rule: Optional[dict], base_price: float) -> float:
+    if not rule:
+        return 0.0
+    if rule["charge_type"] == "percentage":
+        return base_price * float(rule["value"]) / 100
+    return float(rule["value"])
+
+
+def compute_tax(subtotal: float, tax_percent: float, include_tax: bool) -> tuple[float, float]:
+    """Return (tax_amount, total) for a subtotal, honouring tax-inclusive pricing."""
+    if include_tax:
+        tax_amount = subtotal - subtotal / (1 + tax_percent / 100)
+        return tax_amount, subtotal
+    tax_amount = subtotal * tax_percent / 100
+    return tax_amount, subtotal + tax_amount
+
+
+async def _fetch(collection: str, query: dict) -> list[dict]:
+    return await db[collection].find(query).to_list(None)
+
+
+async def build_quotation(store_id: str, payload: BookingTaskUpdateRequest) -> Quotation:
+    """
+    Price every task in ``payload`` against the catalog for ``store_id``.
+
+    Raises:
+        HTTPException: 400 if a task references a service, pricing, addon or
+            subservice that does not exist for this store, or an addon or
+            subservice that is not linked to the task's service (or not
+            offered for its vehicle category).
+    """
+    service_ids = list({str(t.service_id) for t in payload.tasks})
+    categories = list({t.vehicle_category for t in payload.tasks})
+
+    services, pricing = await asyncio.gather(
+        _fetch("services", {"_id": {"$in": service_ids}}),
+        _fetch("service_pricing", {
+            "store_id": str(store_id),
+            "service_id": {"$in": service_ids},
+            "vehicle_category": {"$in": categories},
+        }),
+    )
+    services_by_id = _by_id(services)
+    pricing_by_key = {(str(p["service_id"]), p["vehicle_category"]): p for p in pricing}
+
+    missing = [sid for sid in service_ids if sid not in services_by_id]
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Unknown service(s): {', '.join(missing)}")
+
+    task_type_ids = list({str(s["task_type_id"]) for s in services})
+    # Only what the services link to can be quoted, so nothing else is fetched
+    addon_ids = {str(a) for s in services for a in s.get("addon_ids", [])}
+    subservice_ids = {str(sub.id) for t in payload.tasks for sub in t.subservices}
+    subservice_ids &= {str(sub) for s in services for sub in s.get("subservice_ids", [])}
+
+    labour_rules, addons, subservices = await asyncio.gather(
+        _fetch("labour_rules", {
+            "task_type_id": {"$in": task_type_ids},
+            "vehicle_category": {"$in": categories},
+        }),
+        _fetch("addons", {"_id": {"$in": list(addon_ids)}}),
+        _fetch("subservices", {"_id": {"$in": list(subservice_ids)}}),
+    )
+    labour_by_key = {(str(r["task_type_id"]), r["vehicle_category"]): r for r in labour_rules}
+    addons_by_id = _by_id(addons)
+    subservices_by_id = _by_id(subservices)
+
+    quoted_tasks = []
+    for task in payload.tasks:
+        service = services_by_id[str(task.service_id)]
+        service_name = service.get("name", "")
+        if not service.get("is_active", True):
+            raise HTTPException(status_code=400, detail=f"Service '{service_name}' is not active")
+
+        price = pricing_by_key.get((str(task.service_id), task.vehicle_category))
+        if not price:
+            raise HTTPException(
+                status_code=400,
+                detail=f"No pricing for service '{service_name}' ({task.vehicle_category}) at this store",
+            )
+
+        linked_addons = [addons_by_id[str(a)] for a in service.get("addon_ids", []) if str(a) in addons_by_id]
+        quoted_addons = []
+        for addon in task.addons:
+            if addon.id:
+                doc = next((a for a in linked_addons if str(a["_id"]) == str(addon.id)), None)
+            else:
+                doc = next((a for a in linked_addons if a["name"].lower() == addon.name.lower()), None)
+            if not doc:
+                raise HTTPException(status_code=400, detail=f"Unknown addon '{addon.name}' for service '{service_name}'")
+            quoted_addons.append(QuotedItem(id=str(doc["_id"]), name=doc["name"], price=float(doc["price"])))
+
+        linked_subservices = {str(s) for s in service.get("subservice_ids", [])}
+        quoted_subservices = []
+        for sub in task.subservices:
+            doc = subservices_by_id.get(str(sub.id)) if str(sub.id) in linked_subservices else None
+            if not doc or doc.get("vehicle_category") not in (None, task.vehicle_category):
+                raise HTTPException(
+                    status_code=400, detail=f"Unknown subservice {sub.id} for service '{service_name}'"
+                )
+            quoted_subservices.append(QuotedItem(id=str(doc["_id"]), name=doc["name"], price=float(doc["price"])))
+
+        task_type_id = str(service["task_type_id"])
+        base_price = float(price["base_price"])
+        labour = compute_labour(labour_by_key.get((task_type_id, task.vehicle_category)), base_price)
+        subtotal = (
+            base_price
+            + labour
+            + sum(a.price for a in quoted_addons)
+            + sum(s.price for s in quoted_subservices)
+        )
+        tax_percent = float(price.get("tax_percent", 0.0))
+        include_tax = bool(price.get("include_tax", False))
+        tax_amount, total = compute_tax(subtotal, tax_percent, include_tax)
+
+        quoted_tasks.append(QuotedTask(
+            service_id=str(task.service_id),
+            service_name=service_name,
+            task_type_id=task_type_id,
+            vehicle_category=task.vehicle_category,
+            base_price=_round(base_price),
+            labour_charge=_round(labour),
+            addons=quoted_addons,
+            subservices=quoted_subservices,
+            tax_percent=tax_percent,
+            include_tax=include_tax,
+            tax_amount=_round(tax_amount),
+            total=_round(total),
+        ))
+
+    tax_amount = sum(t.tax_amount for t in quoted_tasks)
+    total = sum(t.total for t in quoted_tasks)
+    return Quotation(
+        tasks=quoted_tasks,
+        subtotal=_round(total - tax_amount),
+        tax_amount=_round(tax_amount),
+        total=_round(total),
+    )
@@ -0,0 +1,194 @@
+# app/utils/rollups.py
+
+"""
+Per-store daily rollups in ``store_daily_stats``.
+
+One document per store and UTC day (``_id`` = ``"<store_id>:<YYYY-MM-DD>"``)
+holds counters that the write routes ``$inc`` as they go:
+
+- ``revenue``, ``revenue_by_mode.<mode>``, ``transactions``: from
+  ``vehicle_transactions``, bucketed on the transaction ``date``
+- ``bookings``, ``bookings_by_status.<status>``: from ``bookings``, bucketed
+  on the booking's ``created_at``; a status change moves one count from the
+  old status to the new one
+
+``rebuild`` recomputes the same counters from the raw collections with two
+aggregation pipelines, for backfills or after drift.
+"""
+
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+
+from app.db.mongo import db
+
+COLLECTION = "store_daily_stats"
+
+
+def day_key(value: datetime | date) -> str:
+    return (value.date() if isinstance(value, datetime) else value).isoformat()
+
+
+def mode_key(payment_mode: Optional[str]) -> str:
+    # Field names cannot contain dots
+    return (payment_mode or "unknown").lower().replace(".", "_")
+
+
+async def _inc(store_id: str, day: str, counters: dict, session=None) -> None:
+    await db[COLLECTION].update_one(
+        {"_id": f"{store_id}:{day}"},
+        {
+            "$inc": counters,
+            "$set": {"updated_at": datetime.utcnow()},
+            "$setOnInsert": {"store_id": store_id, "date": day},
+        },
+        upsert=True,
+        session=session,
+    )
+
+
+async def record_transaction(txn: dict, session=None) -> None:
+    amount = float(txn.get("total_amount") or 0)
+    await _inc(str(txn["store_id"]), day_key(txn.get("date") or txn["created_at"]), {
+        "revenue": amount,
+        f"revenue_by_mode.{mode_key(txn.get('payment_mode'))}": amount,
+        "transactions": 1,
+    }, session)
+
+
+async def record_booking_created(store_id: str, created_at: datetime, status: str, session=None) -> None:
+    await _inc(str(store_id), day_key(created_at), {
+        "bookings": 1,
+        f"bookings_by_status.{status}": 1,
+    }, session)
+
+
+async def record_booking_status(
+    store_id: str,
+    created_at: Optional[datetime],
+    old_status: Optional[str],
+    new_status: str,
+    session=None,
+) -> None:
+    if old_status == new_status or created_at is None:
+        return  # no change, or a booking from before rollups existed
+    counters = {f"bookings_by_status.{new_status}": 1}
+    if old_status:
+        counters[f"bookings_by_status.{old_status}"] = -1
+    await _inc(str(store_id), day_key(created_at), counters, session)
+
+
+def _day_range(field: str, from_date: Optional[date], to_date: Optional[date]) -> dict:
+    bounds = {}
+    if from_date:
+        bounds["$gte"] = datetime.combine(from_date, time.min)
+    if to_date:
+        bounds["$lt"] = datetime.combine(to_date + timedelta(days=1), time.min)
+    return {field: bounds} if bounds else {}
+
+
+def _merge_stage() -> dict:
+    return {"$merge": {"into": COLLECTION, "on": "_id", "whenMatched": "merge", "whenNotMatched": "insert"}}
+
+
+def transaction_pipeline(match: dict) -> list[dict]:
+    day = {"$dateToString": {"format": "%Y-%m-%d", "date": "$date"}}
+    mode = {"$replaceAll": {
+        "input": {"$toLower": {"$ifNull": ["$payment_mode", "unknown"]}},
+        "find": ".",
+        "replacement": "_",
+    }}
+    return [
+        {"$match": match},
+        {"$match": {"date": {"$type": "date"}}},
+        {"$group": {
+            "_id": {"store_id": "$store_id", "date": day, "mode": mode},
+            "amount": {"$sum": "$total_amount"},
+            "count": {"$sum": 1},
+        }},
+        {"$group": {
+            "_id": {"store_id": "$_id.store_id", "date": "$_id.date"},
+            "revenue": {"$sum": "$amount"},
+            "transactions": {"$sum": "$count"},
+            "by_mode": {"$push": {"k": "$_id.mode", "v": "$amount"}},
+        }},
+        {"$project": {
+            "_id": {"$concat": ["$_id.store_id", ":", "$_id.date"]},
+            "store_id": "$_id.store_id",
+            "date": "$_id.date",
+            "revenue": 1,
+            "transactions": 1,
+            "revenue_by_mode": {"$arrayToObject": "$by_mode"},
+            "updated_at": "$$NOW",
+        }},
+        _merge_stage(),
+    ]
+
+
+def booking_pipeline(match: dict) -> list[dict]:
+    day = {"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at"}}
+    return [
+        {"$match": match},
+        {"$match": {"created_at": {"$type": "date"}}},
+        {"$group": {
+            "_id": {"store_id": "$store_id", "date": day, "status": "$status"},
+            "count": {"$sum": 1},
+        }},
+        {"$group": {
+            "_id": {"store_id": "$_id.store_id", "date": "$_id.date"},
+            "bookings": {"$sum": "$count"},
+            "by_status": {"$push": {"k": "$_id.status", "v": "$count"}},
+        }},
+        {"$project": {
+            "_id": {"$concat": ["$_id.store_id", ":", "$_id.date"]},
+            "store_id": "$_id.store_id",
+            "date": "$_id.date",
+            "bookings": 1,
+            "bookings_by_status": {"$arrayToObject": "$by_status"},
+            "updated_at": "$$NOW",
+        }},
+        _merge_stage(),
+    ]
+
+
+async def rebuild(
+    store_id: Optional[str] = None,
+    from_date: Optional[date] = None,
+    to_date: Optional[date] = None,
+) -> int:
+    """
+    Recompute rollups from raw transactions and bookings.
+
+    Existing rollup documents in the range are dropped first. Writes landing
+    while the rebuild runs may be counted twice or not at all, so run it when
+    the stores are closed.
+
+    Returns:
+        int: Number of rollup documents in the range afterwards.
+    """
+    scope = {"store_id": store_id} if store_id else {}
+    stats_range = {**scope}
+    days = {}
+    if from_date:
+        days["$gte"] = from_date.isoformat()
+    if to_date:
+        days["$lte"] = to_date.isoformat()
+    if days:
+        stats_range["date"] = days
+
+    await db[COLLECTION].delete_many(stats_range)
+    await db.vehicle_transactions.aggregate(
+        transaction_pipeline({**scope, **_day_range("date", from_date, to_date)})
+    ).to_list(None)
+    await db.bookings.aggregate(
+        booking_pipeline({**scope, **_day_range("created_at", from_date, to_date)})
+    ).to_list(None)
+    return await db[COLLECTION].count_documents(stats_range)
+
+
+async def store_stats(store_id: str, from_date: date, to_date: date) -> list[dict]:
+    return await (
+        db[COLLECTION]
+        .find({"store_id": store_id, "date": {"$gte": from_date.isoformat(), "$lte": to_date.isoformat()}})
+        .sort("date", 1)
+        .to_list(None)
+    )
@@ -0,0 +1,86 @@
+# app/utils/search_keys.py
+
+"""
+Precomputed typeahead keys on customer documents.
+
+Every customer carries ``search_keys``: normalized strings that a search
+query is prefix-matched against through a multikey index.
+
+- phone number digits (and the last 10 digits, so ``+91`` is optional)
+- each lowercased name token, plus the whole name without spaces
+- each of the customer's vehicle numbers, lowercased without separators
+
+Normalizing drops everything except ``[0-9a-z]``, so ``KA-01 AB 1234``,
+``ka01ab1234`` and ``KA01AB`` all line up. Write routes keep the keys
+current; ``python -m app.db.backfill_search_keys`` builds them for existing
+customers.
+"""
+
+import re
+from typing import Iterable, Optional
+
+from pymongo import UpdateOne
+
+from app.db.mongo import db
+
+_NON_KEY = re.compile(r"[^0-9a-z]")
+_NON_DIGIT = re.compile(r"\D")
+
+
+def normalize(text: Optional[str]) -> str:
+    return _NON_KEY.sub("", (text or "").lower())
+
+
+def person_keys(full_name: Optional[str], phone_number: Optional[str]) -> set[str]:
+    keys = set()
+    digits = _NON_DIGIT.sub("", phone_number or "")
+    if digits:
+        keys.add(digits)
+        keys.add(digits[-10:])
+    tokens = [normalize(token) for token in (full_name or "").split()]
+    keys.update(token for token in tokens if token)
+    if len(tokens) > 1:
+        keys.add("".join(tokens))
+    return keys
+
+
+def search_keys(customer: dict, vehicle_numbers: Iterable[str] = ()) -> list[str]:
+    keys = person_keys(customer.get("full_name"), customer.get("phone_number"))
+    keys.update(normalize(number) for number in vehicle_numbers if normalize(number))
+    return sorted(keys)
+
+
+async def add_vehicle_keys(vehicle_numbers_by_customer: dict[str, Iterable[str]], session=None) -> None:
+    """Add newly registered vehicle numbers to their owners' keys."""
+    ops = [
+        UpdateOne(
+            {"id": customer_id},
+            {"$addToSet": {"search_keys": {"$each": sorted({normalize(n) for n in numbers if normalize(n)})}}},
+        )
+        for customer_id, numbers in vehicle_numbers_by_customer.items()
+    ]
+    if ops:
+        await db.customers.bulk_write(ops, ordered=False, session=session)
+
+
+async def refresh_customer_keys(customer_ids: Iterable[str], session=None) -> None:
+    """Recompute the keys of ``customer_ids`` from their profile and current vehicles."""
+    ids = list({customer_id for customer_id in customer_ids if customer_id})
+    if not ids:
+        return
+    customers = await db.customers.find(
+        {"id": {"$in": ids}}, {"_id": 0, "id": 1, "full_name": 1, "phone_number": 1}, session=session
+    ).to_list(None)
+    vehicles = await db.vehicles.find(
+        {"customer_id": {"$in": ids}}, {"_id": 0, "customer_id": 1, "vehicle_number": 1}, session=session
+    ).to_list(None)
+
+    numbers: dict[str, list[str]] = {}
+    for vehicle in vehicles:
+        numbers.setdefault(str(vehicle["customer_id"]), []).append(vehicle.get("vehicle_number", ""))
+    ops = [
+        UpdateOne({"id": c["id"]}, {"$set": {"search_keys": search_keys(c, numbers.get(c["id"], []))}})
+        for c in customers
+    ]
+    if ops:
+        await db.customers.bulk_write(ops, ordered=False, session=session)
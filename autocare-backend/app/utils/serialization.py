@@ -0,0 +1,58 @@
+# app/utils/serialization.py
+
+"""
+Fast JSON response path.
+
+``AppJSONResponse`` (orjson) is the app's default response class. Routes that
+already hold plain Mongo documents return it directly, which skips FastAPI's
+``jsonable_encoder`` walk. Routes with a ``response_model`` validate raw
+documents once through a cached ``TypeAdapter`` and return the dumped bytes,
+so the model is not validated a second time on the way out.
+"""
+
+from functools import lru_cache
+from typing import Any, Iterable, List, Optional
+
+import orjson
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+from pydantic import TypeAdapter
+
+
+def _default(value: Any) -> Any:
+    return str(value)  # bson Binary / ObjectId / Decimal128
+
+
+class AppJSONResponse(ORJSONResponse):
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+@lru_cache(maxsize=None)
+def model_adapter(model: type) -> TypeAdapter:
+    return TypeAdapter(model)
+
+
+@lru_cache(maxsize=None)
+def list_adapter(model: type) -> TypeAdapter:
+    return TypeAdapter(List[model])
+
+
+def serialize_model(model: type, doc: dict) -> bytes:
+    """Validate one raw Mongo document and dump it as response JSON."""
+    adapter = model_adapter(model)
+    return adapter.dump_json(adapter.validate_python(doc), by_alias=True)
+
+
+def serialize_list(model: type, docs: Iterable[dict]) -> bytes:
+    """Validate raw Mongo documents once and dump them as response JSON."""
+    adapter = list_adapter(model)
+    return adapter.dump_json(adapter.validate_python(list(docs)), by_alias=True)
+
+
+def json_response(body: bytes, headers: Optional[dict] = None) -> Response:
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def model_response(model: type, doc: dict) -> Response:
+    return json_response(serialize_model(model, doc))
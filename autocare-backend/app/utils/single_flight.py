@@ -0,0 +1,87 @@
+# app/utils/single_flight.py
+
+"""
+Single-flight coalescing of identical concurrent reads.
+
+When many panels ask for the same thing at the same moment (shift start),
+``@single_flight()`` on a read handler lets the first request run it and hands
+its result to every identical request that arrives while it is still running.
+Identical means same handler and same arguments; handlers that take the
+``Request`` name the headers their response depends on in ``vary`` (e.g.
+``If-None-Match`` / ``Accept-Encoding`` for ``catalog_cache.respond``).
+
+The shared call runs as its own task, so a leader whose client disconnects
+does not fail the requests waiting on it. Each caller gets its own copy of a
+returned ``Response`` (middlewares add headers in place). Not for streaming
+handlers, whose body can only be consumed once.
+
+``single_flight_requests_total{handler, role}`` counts leaders and coalesced
+requests.
+"""
+
+import asyncio
+import copy
+import functools
+import inspect
+from typing import Any, Awaitable, Callable, Hashable
+
+from fastapi import Request, Response
+
+from app.utils.metrics import SINGLE_FLIGHT_REQUESTS
+
+
+class SingleFlight:
+    def __init__(self):
+        self._flights: dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> tuple[Any, bool]:
+        """Await ``fn()``, or the identical call already in flight; returns (result, shared)."""
+        flight = self._flights.get(key)
+        shared = flight is not None
+        if flight is None:
+            flight = self._flights[key] = asyncio.ensure_future(fn())
+            flight.add_done_callback(functools.partial(self._done, key))
+        return await asyncio.shield(flight), shared
+
+    def _done(self, key: Hashable, flight: asyncio.Future) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if not flight.cancelled():
+            flight.exception()  # retrieved even if every waiter went away
+
+
+_flights = SingleFlight()
+
+
+def _copy(result: Any) -> Any:
+    if isinstance(result, Response):
+        result = copy.copy(result)
+        result.raw_headers = list(result.raw_headers)
+    return result
+
+
+def single_flight(vary: tuple[str, ...] = ()):
+    """Coalesce concurrent identical calls of an async read handler."""
+
+    def decorator(handler):
+        signature = inspect.signature(handler)
+        name = handler.__name__
+
+        @functools.wraps(handler)
+        async def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = [name]
+            for param, value in sorted(bound.arguments.items()):
+                if isinstance(value, Request):
+                    key.extend((header, value.headers.get(header)) for header in vary)
+                else:
+                    key.append((param, repr(value)))
+
+            result, shared = await _flights.do(tuple(key), lambda: handler(*args, **kwargs))
+            SINGLE_FLIGHT_REQUESTS.labels(name, "coalesced" if shared else "leader").inc()
+            return _copy(result)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,87 @@
+# app/utils/streaming.py
+
+"""
+Row encoders for streamed responses.
+
+Each encoder takes an async iterator of Mongo documents and yields byte chunks
+of roughly ``flush_rows`` rows, so a response never holds more than one chunk
+(plus the driver's current batch) in memory no matter how many rows it streams.
+"""
+
+import csv
+import io
+import json
+import os
+import zlib
+from datetime import date, datetime
+from typing import Any, AsyncIterable, AsyncIterator
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+FLUSH_ROWS = 500
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)  # UUID, Decimal128, ObjectId
+
+
+def _cell(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, list):
+        return ";".join(str(_cell(v)) for v in value)
+    return value
+
+
+def _lookup(doc: dict, column: str) -> Any:
+    """Resolve dotted column names (``address.city``) against nested documents."""
+    value: Any = doc
+    for part in column.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+async def ndjson_rows(docs: AsyncIterable[dict], flush_rows: int = FLUSH_ROWS) -> AsyncIterator[bytes]:
+    lines: list[str] = []
+    async for doc in docs:
+        lines.append(json.dumps(doc, default=_default, separators=(",", ":")))
+        if len(lines) >= flush_rows:
+            yield ("\n".join(lines) + "\n").encode()
+            lines.clear()
+    if lines:
+        yield ("\n".join(lines) + "\n").encode()
+
+
+async def csv_rows(
+    docs: AsyncIterable[dict],
+    columns: list[str],
+    flush_rows: int = FLUSH_ROWS,
+) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    rows = 0
+    async for doc in docs:
+        writer.writerow([_cell(_lookup(doc, column)) for column in columns])
+        rows += 1
+        if rows >= flush_rows:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+            rows = 0
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+async def gzip_chunks(chunks: AsyncIterable[bytes], level: int = 6) -> AsyncIterator[bytes]:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
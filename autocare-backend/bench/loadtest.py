@@ -0,0 +1,289 @@
+# bench/loadtest.py
+
+"""
+Closed-loop HTTP load test for the store panel's hot paths.
+
+Drives a running API (``uvicorn app.main:app``) seeded with ``bench.seed``
+through weighted scenarios, each virtual user looping for ``--duration``:
+
+- booking:   POST /bookings/init -> PUT /bookings/{id}/tasks (priced services)
+- customers: GET /customers for a store, then the next page via X-Next-Cursor
+- catalog:   /task-types, /services, /stores and /catalog, revalidating with
+             If-None-Match like a browser does
+- login:     POST /store-admin/login
+
+Prints RPS, error count and p50/p95/p99 latency per route and writes the run
+(with the git commit) as JSON, so runs can be compared across commits.
+Needs ``httpx`` (``pip install -r requirements-dev.txt``).
+
+    uvicorn app.main:app --workers 4 &
+    python -m bench.loadtest --duration 60 --concurrency 32
+    python -m bench.loadtest --scenarios booking,catalog --compare bench/results/<previous>.json
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, get_args
+
+import httpx
+
+from app.models.service import VehicleCategory
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+SCENARIO_WEIGHTS = {"booking": 2, "customers": 3, "catalog": 4, "login": 1}
+CATEGORIES = list(get_args(VehicleCategory))
+
+
+# ---------------------------
+# 🔹 Measurement
+# ---------------------------
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> dict:
+    values = sorted(latencies)
+    return {
+        "requests": len(values),
+        "errors": errors,
+        "rps": round(len(values) / elapsed, 1) if elapsed else 0.0,
+        "mean_ms": round(sum(values) / len(values), 2) if values else 0.0,
+        "p50_ms": round(percentile(values, 50), 2),
+        "p95_ms": round(percentile(values, 95), 2),
+        "p99_ms": round(percentile(values, 99), 2),
+        "max_ms": round(values[-1], 2) if values else 0.0,
+    }
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = {}
+        self.errors: dict[str, int] = {}
+        self.recording = False
+
+    async def request(
+        self, client: httpx.AsyncClient, route: str, method: str, url: str, **kwargs
+    ) -> Optional[httpx.Response]:
+        """Issue one request, timing it under ``route`` (the templated path)."""
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+            failed = response.status_code >= 400
+        except httpx.HTTPError:
+            response, failed = None, True
+        if self.recording:
+            self.latencies.setdefault(route, []).append((time.perf_counter() - started) * 1000)
+            if failed:
+                self.errors[route] = self.errors.get(route, 0) + 1
+        return None if failed else response
+
+
+# ---------------------------
+# 🔹 Scenarios
+# ---------------------------
+class Fixtures:
+    """Ids discovered from the running API before the load starts."""
+
+    def __init__(self, stores: list[dict], priced: dict[tuple[str, str], list[dict]], password: str):
+        self.stores = stores
+        self.priced = priced  # (store_id, category) -> catalog services with a price
+        self.password = password
+
+
+async def discover(client: httpx.AsyncClient, categories: list[str], password: str) -> Fixtures:
+    response = await client.get("/api/stores", params={"fields": "alias,type"})
+    response.raise_for_status()
+    stores = [s for s in response.json() if str(s.get("alias", "")).startswith("LOAD")]
+    if not stores:
+        raise SystemExit("❌ No seeded stores found; run `python -m bench.seed` first")
+
+    priced = {}
+    for store in stores:
+        for category in categories:
+            response = await client.get("/api/catalog", params={"store_id": store["id"], "vehicle_category": category})
+            response.raise_for_status()
+            services = [s for s in response.json()["services"] if s["base_price"] is not None]
+            if services:
+                priced[(store["id"], category)] = services
+    if not priced:
+        raise SystemExit("❌ Seeded stores have no service pricing")
+    return Fixtures(stores, priced, password)
+
+
+async def booking(rec: Recorder, client: httpx.AsyncClient, fx: Fixtures, rng: random.Random, etags: dict) -> None:
+    (store_id, category), services = rng.choice(list(fx.priced.items()))
+    # Half the bookings come from returning customers in the seeded phone range
+    phone = f"9{rng.randrange(100000):09d}" if rng.random() < 0.5 else f"8{rng.randrange(10**9):09d}"
+    payload = {
+        "customer": {
+            "full_name": "Load Test", "phone_number": phone, "source": "store_panel",
+            "store_id": store_id, "onboarded_by": store_id,
+        },
+        "vehicle": {"vehicle_number": f"LT{rng.randrange(10**6):06d}", "vehicle_type": category},
+        "store_id": store_id,
+        "booking_source": "store_panel",
+    }
+    response = await rec.request(client, "POST /api/bookings/init", "POST", "/api/bookings/init", json=payload)
+    if response is None:
+        return
+
+    tasks = []
+    for service in rng.sample(services, min(len(services), rng.randrange(1, 4))):
+        addons = [{"id": a["id"], "name": a["name"]} for a in service["addons"][: rng.randrange(0, 2)]]
+        tasks.append({"service_id": service["id"], "vehicle_category": category, "addons": addons})
+    booking_id = response.json()["booking_id"]
+    await rec.request(
+        client, "PUT /api/bookings/{id}/tasks", "PUT", f"/api/bookings/{booking_id}/tasks", json={"tasks": tasks}
+    )
+
+
+async def customers(rec: Recorder, client: httpx.AsyncClient, fx: Fixtures, rng: random.Random, etags: dict) -> None:
+    store_id = rng.choice(fx.stores)["id"]
+    params = {"store_id": store_id, "limit": 50}
+    response = await rec.request(client, "GET /api/customers", "GET", "/api/customers", params=params)
+    cursor = response.headers.get("x-next-cursor") if response is not None else None
+    if cursor:
+        await rec.request(client, "GET /api/customers (next page)", "GET", "/api/customers", params={**params, "cursor": cursor})
+
+
+async def catalog(rec: Recorder, client: httpx.AsyncClient, fx: Fixtures, rng: random.Random, etags: dict) -> None:
+    store_id, category = rng.choice(list(fx.priced))
+    for route, url, params in (
+        ("GET /api/task-types", "/api/task-types", {}),
+        ("GET /api/services", "/api/services", {}),
+        ("GET /api/stores", "/api/stores", {"fields": "name,type,city"}),
+        ("GET /api/catalog", "/api/catalog", {"store_id": store_id, "vehicle_category": category}),
+    ):
+        key = (url, tuple(sorted(params.items())))
+        headers = {"If-None-Match": etags[key]} if key in etags else {}
+        response = await rec.request(client, route, "GET", url, params=params, headers=headers)
+        if response is not None and response.headers.get("etag"):
+            etags[key] = response.headers["etag"]
+
+
+async def login(rec: Recorder, client: httpx.AsyncClient, fx: Fixtures, rng: random.Random, etags: dict) -> None:
+    alias = rng.choice(fx.stores)["alias"]
+    await rec.request(
+        client, "POST /api/store-admin/login", "POST", "/api/store-admin/login",
+        json={"alias": alias, "password": fx.password},
+    )
+
+
+SCENARIOS = {"booking": booking, "customers": customers, "catalog": catalog, "login": login}
+
+
+async def virtual_user(rec: Recorder, client: httpx.AsyncClient, fx: Fixtures, rng: random.Random,
+                       scenarios: list[str], deadline: float) -> None:
+    weights = [SCENARIO_WEIGHTS[name] for name in scenarios]
+    etags: dict = {}  # per-user, like one browser's HTTP cache
+    while time.monotonic() < deadline:
+        name = rng.choices(scenarios, weights=weights)[0]
+        await SCENARIOS[name](rec, client, fx, rng, etags)
+
+
+# ---------------------------
+# 🔹 Runner
+# ---------------------------
+def git_commit() -> Optional[str]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True)
+        return commit.stdout.strip() + ("-dirty" if dirty.stdout.strip() else "")
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(result: dict, baseline: Optional[dict]) -> None:
+    print(f"{'route':<36} {'rps':>8} {'err':>6} {'p50':>8} {'p95':>8} {'p99':>8}")
+    rows = {**result["routes"], "TOTAL": result["total"]}
+    for route, stats in rows.items():
+        line = (
+            f"{route:<36} {stats['rps']:>8.1f} {stats['errors']:>6} "
+            f"{stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f}"
+        )
+        before = (baseline or {}).get("routes", {}).get(route) if route != "TOTAL" else (baseline or {}).get("total")
+        if before and before["p95_ms"]:
+            line += f"   p95 {(stats['p95_ms'] / before['p95_ms'] - 1) * 100:+.0f}%"
+            line += f" rps {(stats['rps'] / before['rps'] - 1) * 100 if before['rps'] else 0:+.0f}%"
+        print(line)
+
+
+async def _main(args) -> int:
+    scenarios = args.scenarios.split(",")
+    unknown = [name for name in scenarios if name not in SCENARIOS]
+    if unknown:
+        print(f"❌ Unknown scenario(s): {', '.join(unknown)}")
+        return 1
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        fx = await discover(client, CATEGORIES[: args.categories], args.password)
+        print(f"✅ {len(fx.stores)} stores, {len(fx.priced)} priced (store, category) pairs")
+
+        rec = Recorder()
+        rng = random.Random(args.seed)
+        users = [random.Random(rng.getrandbits(64)) for _ in range(args.concurrency)]
+
+        if args.warmup:
+            deadline = time.monotonic() + args.warmup
+            await asyncio.gather(*(virtual_user(rec, client, fx, r, scenarios, deadline) for r in users))
+
+        rec.recording = True
+        started = time.monotonic()
+        deadline = started + args.duration
+        await asyncio.gather(*(virtual_user(rec, client, fx, r, scenarios, deadline) for r in users))
+        elapsed = time.monotonic() - started
+
+    result = {
+        "commit": git_commit(),
+        "started_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "base_url": args.base_url,
+        "duration_s": round(elapsed, 1),
+        "concurrency": args.concurrency,
+        "scenarios": scenarios,
+        "seed": args.seed,
+        "routes": {
+            route: summarize(latencies, rec.errors.get(route, 0), elapsed)
+            for route, latencies in sorted(rec.latencies.items())
+        },
+        "total": summarize(
+            [v for values in rec.latencies.values() for v in values], sum(rec.errors.values()), elapsed
+        ),
+    }
+
+    baseline = json.loads(Path(args.compare).read_text()) if args.compare else None
+    print_report(result, baseline)
+
+    out = Path(args.out) if args.out else RESULTS_DIR / f"{time.strftime('%Y%m%d-%H%M%S')}-{result['commit'] or 'nogit'}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(result, indent=2))
+    print(f"✅ Results written to {out}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test the booking flow against a running API.")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--duration", type=float, default=60, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=5, help="unmeasured seconds before the run")
+    parser.add_argument("--concurrency", type=int, default=32, help="virtual users")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma-separated subset of " + ", ".join(SCENARIOS))
+    parser.add_argument("--categories", type=int, default=3, help="vehicle categories to book against")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--password", default="loadtest", help="store password set by bench.seed")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", help="result file (default bench/results/<time>-<commit>.json)")
+    parser.add_argument("--compare", help="previous result file to diff p95 / RPS against")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(_main(args)))
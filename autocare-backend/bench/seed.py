@@ -0,0 +1,344 @@
+# bench/seed.py
+
+"""
+Seed a local MongoDB with synthetic data at production-like scale for load
+tests (``bench.loadtest``).
+
+Generates stores (hubs and garages), the task types from ``task_types.json``,
+a service catalog with store pricing and labour rules, then customers with
+their vehicles, vehicle transactions and loyalty cards. Everything is drawn
+from one seeded RNG, so the same arguments produce the same ids and documents.
+Indexes are reconciled after the bulk load. ``--drop`` keeps ``catalog_versions``:
+the counters of the cached collections are bumped instead, so ETags handed
+out before the reseed never match the new data.
+
+    python -m bench.seed --drop
+    python -m bench.seed --drop --customers 1000000 --stores 60 --seed 7
+
+Stores log in with alias ``LOADHUB001`` / ``LOADGAR001``... and password
+``loadtest``; the admin panel with ``loadtest`` / ``loadtest``.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import get_args
+from urllib.parse import urlparse
+from uuid import UUID
+
+from app.models.service import VehicleCategory
+from app.utils.loyalty import RECENT_REWARDS, bucket_docs, number_entries
+from app.utils.search_keys import search_keys
+
+LOAD_PASSWORD = "loadtest"
+TASK_TYPES_FILE = Path(__file__).resolve().parent.parent / "task_types.json"
+CATEGORIES = list(get_args(VehicleCategory))
+LOCAL_HOSTS = {"localhost", "127.0.0.1", "::1", "mongo", "mongodb"}
+
+SEEDED_COLLECTIONS = (
+    "store_admin", "admin_users", "task_types", "services", "addons", "subservices", "service_pricing",
+    "labour_rules", "customers", "vehicles", "vehicle_transactions", "loyalty_cards", "loyalty_rewards",
+    "bookings", "store_daily_stats",
+)
+# Cached by catalog_cache: their versions are bumped (never reset) so old ETags stop matching
+CACHED_COLLECTIONS = (
+    "store_admin", "task_types", "services", "addons", "subservices", "service_pricing", "labour_rules",
+)
+
+FIRST_NAMES = ["Aarav", "Vivaan", "Aditya", "Ishaan", "Rohan", "Ananya", "Diya", "Priya", "Kavya", "Meera",
+               "Rahul", "Sanjay", "Arjun", "Neha", "Pooja", "Vikram", "Suresh", "Lakshmi", "Farhan", "Joseph"]
+LAST_NAMES = ["Sharma", "Verma", "Reddy", "Iyer", "Nair", "Patel", "Khan", "Gupta", "Rao", "Menon",
+              "Singh", "Das", "Kulkarni", "Joshi", "Fernandes", "Pillai", "Bose", "Mehta", "Shetty", "Ali"]
+CITIES = {"Bengaluru": ("560", "KA"), "Chennai": ("600", "TN"), "Hyderabad": ("500", "TS"),
+          "Mumbai": ("400", "MH"), "Pune": ("411", "MH"), "Kochi": ("682", "KL")}
+BRANDS = {"car": ["Maruti", "Hyundai", "Tata", "Honda", "Mahindra", "Toyota"],
+          "bike": ["Hero", "Honda", "Bajaj", "TVS", "Royal Enfield"]}
+SERVICE_NAMES = ["Basic", "Standard", "Premium"]
+ADDON_NAMES = ["Wax Polish", "Engine Bay Cleaning", "Underbody Coating", "Headlight Restoration",
+               "AC Disinfection", "Tyre Dressing", "Glass Coating", "Odour Removal", "Seat Shampoo", "Nitrogen Fill"]
+
+
+class Generator:
+    def __init__(self, seed: int):
+        self.rng = random.Random(seed)
+        self.now = datetime(2025, 1, 1)
+
+    def uid(self) -> str:
+        return str(UUID(int=self.rng.getrandbits(128), version=4))
+
+    def past(self, days: int) -> datetime:
+        return self.now - timedelta(seconds=self.rng.randrange(days * 86400))
+
+    # ---------------------------
+    # 🔹 Stores & catalog
+    # ---------------------------
+    def stores(self, count: int) -> list[dict]:
+        hubs = max(1, count // 4)
+        stores = []
+        for i in range(count):
+            kind = "hub" if i < hubs else "garage"
+            city = list(CITIES)[i % len(CITIES)]
+            number = i + 1 if kind == "hub" else i - hubs + 1
+            stores.append({
+                "id": self.uid(),
+                "name": f"AutoCare24 - {city} {kind.title()} {number}",
+                "city": city,
+                "address": f"{number} Ring Road, {city}",
+                "manager_name": self.rng.choice(FIRST_NAMES),
+                "manager_number": f"7{self.rng.randrange(10**9):09d}",
+                "type": kind,
+                "hub_id": None,
+                "alias": f"LOAD{'HUB' if kind == 'hub' else 'GAR'}{number:03d}",
+                "password": LOAD_PASSWORD,
+                "created_at": self.past(365),
+            })
+        hub_ids = [s["id"] for s in stores if s["type"] == "hub"]
+        for store in stores:
+            if store["type"] == "garage":
+                store["hub_id"] = self.rng.choice(hub_ids)
+        return stores
+
+    def task_types(self) -> list[dict]:
+        with open(TASK_TYPES_FILE) as f:
+            raw = json.load(f)
+        return [
+            {**{k: v for k, v in t.items() if k != "id"}, "_id": t["id"], "created_at": self.now}
+            for t in raw
+        ]
+
+    def catalog(self, task_types: list[dict], stores: list[dict]) -> dict[str, list[dict]]:
+        addons = [
+            {"_id": self.uid(), "name": name, "price": float(self.rng.randrange(100, 1500, 50)), "created_at": self.now}
+            for name in ADDON_NAMES
+        ]
+        subservices = [
+            {
+                "_id": self.uid(),
+                "name": f"{name} ({category})",
+                "price": float(self.rng.randrange(50, 800, 25)),
+                "vehicle_category": category,
+                "is_optional": self.rng.random() < 0.7,
+                "created_at": self.now,
+            }
+            for category in CATEGORIES
+            for name in ("Interior Vacuum", "Wheel Alignment", "Fluid Top-up")
+        ]
+        services, labour_rules = [], []
+        for task_type in task_types:
+            for name in SERVICE_NAMES:
+                services.append({
+                    "_id": self.uid(),
+                    "name": f"{task_type['name']} - {name}",
+                    "task_type_id": task_type["_id"],
+                    "tags": [name.lower()],
+                    "duration_minutes": self.rng.choice([30, 60, 90, 120, 240]),
+                    "is_active": True,
+                    "is_visible_to_customer": True,
+                    "addon_ids": [a["_id"] for a in self.rng.sample(addons, 3)],
+                    "subservice_ids": [s["_id"] for s in self.rng.sample(subservices, 6)],
+                    "created_at": self.now,
+                })
+            for category in CATEGORIES:
+                percentage = self.rng.random() < 0.5
+                labour_rules.append({
+                    "_id": self.uid(),
+                    "task_type_id": task_type["_id"],
+                    "vehicle_category": category,
+                    "charge_type": "percentage" if percentage else "fixed",
+                    "value": float(self.rng.randrange(5, 25) if percentage else self.rng.randrange(100, 1000, 50)),
+                    "created_at": self.now,
+                })
+        pricing = [
+            {
+                "_id": self.uid(),
+                "service_id": service["_id"],
+                "vehicle_category": category,
+                "store_id": store["id"],
+                "base_price": float(self.rng.randrange(300, 8000, 50)),
+                "tax_percent": 18.0,
+                "include_tax": self.rng.random() < 0.3,
+                "created_at": self.now,
+            }
+            for store in stores
+            for service in services
+            for category in CATEGORIES
+        ]
+        return {
+            "addons": addons,
+            "subservices": subservices,
+            "services": services,
+            "labour_rules": labour_rules,
+            "service_pricing": pricing,
+        }
+
+    # ---------------------------
+    # 🔹 Customers and their history
+    # ---------------------------
+    def vehicle_number(self, state: str) -> str:
+        letters = "".join(self.rng.choice("ABCDEFGHJKLMNPRSTUVWXYZ") for _ in range(2))
+        return f"{state}{self.rng.randrange(1, 60):02d}{letters}{self.rng.randrange(1, 10000):04d}"
+
+    def customer_batch(self, start: int, count: int, stores: list[dict], services: list[dict], args) -> dict[str, list]:
+        batch = {"customers": [], "vehicles": [], "vehicle_transactions": [], "loyalty_cards": [], "loyalty_rewards": []}
+        for i in range(start, start + count):
+            store = self.rng.choice(stores)
+            city = store["city"]
+            pin, state = CITIES[city]
+            created_at = self.past(730)
+            customer = {
+                "id": self.uid(),
+                "full_name": f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}",
+                "phone_number": f"9{i:09d}",
+                "email": f"customer{i}@example.com" if self.rng.random() < 0.6 else None,
+                "address": {"line1": f"{self.rng.randrange(1, 500)} Main Road", "city": city,
+                            "pincode": f"{pin}{self.rng.randrange(1000):03d}"},
+                "latitude": None,
+                "longitude": None,
+                "tags": self.rng.sample(["regular", "fleet", "vip", "corporate"], self.rng.randrange(0, 2)),
+                "source": self.rng.choice(["hub_admin", "garage_admin", "website"]),
+                "store_id": store["id"],
+                "onboarded_by": store["id"],
+                "loyalty_card_id": None,
+                "created_at": created_at,
+                "updated_at": created_at,
+                "is_active": self.rng.random() > 0.02,
+            }
+
+            numbers = []
+            for v in range(self.rng.choices([1, 2, 3], weights=[70, 25, 5])[0]):
+                kind = "car" if self.rng.random() < 0.65 else "bike"
+                number = self.vehicle_number(state)
+                numbers.append(number)
+                vehicle = {
+                    "id": self.uid(),
+                    "customer_id": customer["id"],
+                    "vehicle_number": number,
+                    "vehicle_type": kind,
+                    "brand": self.rng.choice(BRANDS[kind]),
+                    "model": None,
+                    "year": self.rng.randrange(2008, 2025),
+                    "fuel_type": self.rng.choice(["petrol", "diesel", "ev"]),
+                    "odometer_km": self.rng.randrange(1000, 150000),
+                    "last_service_date": None,
+                    "is_primary": v == 0,
+                    "notes": None,
+                    "created_at": created_at,
+                    "updated_at": created_at,
+                }
+                batch["vehicles"].append(vehicle)
+                for _ in range(self.rng.randrange(args.max_transactions + 1)):
+                    tasks = [
+                        {"task_type": s["name"], "price": float(self.rng.randrange(300, 8000, 50))}
+                        for s in self.rng.sample(services, self.rng.randrange(1, 4))
+                    ]
+                    when = created_at + (self.now - created_at) * self.rng.random()
+                    batch["vehicle_transactions"].append({
+                        "id": self.uid(),
+                        "vehicle_id": vehicle["id"],
+                        "customer_id": customer["id"],
+                        "store_id": store["id"],
+                        "date": when,
+                        "tasks": tasks,
+                        "total_amount": sum(t["price"] for t in tasks),
+                        "payment_mode": self.rng.choice(["cash", "upi", "card"]),
+                        "paid": True,
+                        "invoice_id": None,
+                        "created_at": when,
+                    })
+
+            customer["search_keys"] = search_keys(customer, numbers)
+            if self.rng.random() < args.loyalty_ratio:
+                card_id = self.uid()
+                entries = number_entries([
+                    {"type": self.rng.choice(["service", "referral"]), "points": self.rng.randrange(10, 200),
+                     "date": self.past(365), "note": None}
+                    for _ in range(self.rng.randrange(0, 30))
+                ])
+                customer["loyalty_card_id"] = card_id
+                batch["loyalty_cards"].append({
+                    "id": card_id,
+                    "customer_id": customer["id"],
+                    "points_balance": sum(e["points"] for e in entries),
+                    "membership_tier": self.rng.choice(["bronze", "bronze", "silver", "gold"]),
+                    "issued_at": created_at,
+                    "last_updated": created_at,
+                    "referred_by": None,
+                    "reward_count": len(entries),
+                    "reward_history": entries[-RECENT_REWARDS:],
+                    "created_at": created_at,
+                })
+                batch["loyalty_rewards"].extend(bucket_docs(card_id, entries))
+            batch["customers"].append(customer)
+        return batch
+
+
+async def _insert(db, collection: str, docs: list[dict]) -> None:
+    if docs:
+        await db[collection].insert_many(docs, ordered=False)
+
+
+async def _main(args) -> int:
+    from app.db.indexes import ensure_indexes
+    from app.db.mongo import MONGO_URI, db
+    from app.utils.catalog_cache import catalog_cache
+
+    host = urlparse(MONGO_URI).hostname
+    if host not in LOCAL_HOSTS and not args.allow_remote:
+        print(f"❌ Refusing to seed {host}; pass --allow-remote to seed a non-local MongoDB")
+        return 1
+
+    if args.drop:
+        for name in SEEDED_COLLECTIONS:
+            await db[name].drop()
+        print(f"✅ Dropped {len(SEEDED_COLLECTIONS)} collections")
+
+    gen = Generator(args.seed)
+    stores = gen.stores(args.stores)
+    task_types = gen.task_types()
+    catalog = gen.catalog(task_types, stores)
+    await _insert(db, "store_admin", stores)
+    await _insert(db, "admin_users", [{"username": LOAD_PASSWORD, "password": LOAD_PASSWORD, "role": "main_admin"}])
+    await _insert(db, "task_types", task_types)
+    for name, docs in catalog.items():
+        await _insert(db, name, docs)
+    for name in CACHED_COLLECTIONS:
+        await catalog_cache.invalidate(name)
+    print(f"✅ {len(stores)} stores, {len(task_types)} task types, {len(catalog['services'])} services, "
+          f"{len(catalog['service_pricing'])} prices")
+
+    started = time.monotonic()
+    totals: dict[str, int] = {}
+    for start in range(0, args.customers, args.batch_size):
+        batch = gen.customer_batch(start, min(args.batch_size, args.customers - start), stores, catalog["services"], args)
+        await asyncio.gather(*(_insert(db, name, docs) for name, docs in batch.items()))
+        for name, docs in batch.items():
+            totals[name] = totals.get(name, 0) + len(docs)
+        done = start + len(batch["customers"])
+        print(f"   {done}/{args.customers} customers ({done / (time.monotonic() - started):.0f}/s)", flush=True)
+    print("✅ " + ", ".join(f"{count} {name}" for name, count in totals.items()))
+
+    created = await ensure_indexes(db)
+    print(f"✅ Indexes reconciled, created: {len(created)} collection(s)")
+    print("   Run `python -m app.db.rebuild_store_stats` to build the daily rollups")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Seed MongoDB with synthetic load-test data.")
+    parser.add_argument("--customers", type=int, default=1_000_000)
+    parser.add_argument("--stores", type=int, default=40)
+    parser.add_argument("--max-transactions", type=int, default=4, help="per vehicle, drawn uniformly from 0..N")
+    parser.add_argument("--loyalty-ratio", type=float, default=0.3, help="share of customers with a loyalty card")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--drop", action="store_true", help="drop the seeded collections first")
+    parser.add_argument("--allow-remote", action="store_true", help="allow a MONGO_URI that is not localhost")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(asyncio.run(_main(args)))
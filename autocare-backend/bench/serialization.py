@@ -0,0 +1,133 @@
+# bench/serialization.py
+
+"""
+CPU time per 10k-row response, before and after the orjson fast path.
+
+Runs the routes in-process against in-memory documents (no Mongo, no HTTP
+server), driving the ASGI app directly so only routing, validation and
+serialization are measured.
+
+    python -m bench.serialization
+    python -m bench.serialization --rows 10000 --runs 20
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import List
+from uuid import uuid4
+
+from fastapi import FastAPI
+
+from app.models.service import ServiceInDB
+from app.utils.pagination import page_response
+from app.utils.serialization import AppJSONResponse, json_response, serialize_list
+
+
+def service_docs(rows: int) -> list[dict]:
+    now = datetime.utcnow()
+    return [
+        {
+            "_id": str(uuid4()),
+            "name": f"Service {i}",
+            "task_type_id": str(uuid4()),
+            "description": "Full exterior wash and interior vacuum",
+            "addon_ids": [str(uuid4()) for _ in range(3)],
+            "is_active": True,
+            "created_at": now - timedelta(minutes=i),
+        }
+        for i in range(rows)
+    ]
+
+
+def customer_docs(rows: int) -> list[dict]:
+    now = datetime.utcnow()
+    return [
+        {
+            "id": str(uuid4()),
+            "full_name": f"Customer {i}",
+            "phone_number": f"9{i:09d}",
+            "email": f"customer{i}@example.com",
+            "source": "store_panel",
+            "address": {"line1": "12 MG Road", "city": "Bengaluru", "pincode": "560001"},
+            "tags": ["regular"],
+            "is_active": True,
+            "created_at": now - timedelta(minutes=i),
+            "updated_at": now,
+        }
+        for i in range(rows)
+    ]
+
+
+def build_apps(services: list[dict], customers: list[dict]) -> tuple[FastAPI, FastAPI]:
+    before = FastAPI()
+
+    @before.get("/services", response_model=List[ServiceInDB])
+    async def services_before():
+        return [ServiceInDB(**s) for s in services]
+
+    @before.get("/customers")
+    async def customers_before():
+        return customers
+
+    after = FastAPI(default_response_class=AppJSONResponse)
+
+    @after.get("/services", response_model=List[ServiceInDB])
+    async def services_after():
+        return json_response(serialize_list(ServiceInDB, services))
+
+    @after.get("/customers")
+    async def customers_after():
+        return page_response(customers, None)
+
+    return before, after
+
+
+async def call(app: FastAPI, path: str) -> int:
+    """Run one GET through the ASGI app and return the body size."""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+        "query_string": b"", "headers": [], "client": ("bench", 0), "server": ("bench", 80),
+    }
+    size = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal size
+        if message["type"] == "http.response.body":
+            size += len(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return size
+
+
+async def measure(app: FastAPI, path: str, runs: int) -> tuple[float, int]:
+    size = await call(app, path)  # warm-up (adapter build, route compile)
+    start = time.process_time()
+    for _ in range(runs):
+        await call(app, path)
+    return (time.process_time() - start) / runs * 1000, size
+
+
+async def _main(rows: int, runs: int) -> None:
+    before, after = build_apps(service_docs(rows), customer_docs(rows))
+    print(f"{rows} rows, {runs} runs each (CPU ms per response)")
+    for path, label in (("/services", "response_model list"), ("/customers", "plain documents")):
+        before_ms, before_size = await measure(before, path, runs)
+        after_ms, after_size = await measure(after, path, runs)
+        print(
+            f"{label:<20} before {before_ms:8.1f} ms ({before_size} B)  "
+            f"after {after_ms:8.1f} ms ({after_size} B)  x{before_ms / after_ms:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark response serialization.")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(_main(args.rows, args.runs))
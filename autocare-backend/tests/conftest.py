@@ -0,0 +1,51 @@
+import os
+
+os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017")
+os.environ.setdefault("ENV", "test")
+
+import mongomock.collection
+import pytest
+from fastapi.testclient import TestClient
+from mongomock_motor import AsyncMongoMockClient
+
+from app.db import mongo
+from app.main import app
+from app.utils.catalog_cache import catalog_cache
+from app.utils.hub_graph import hub_graph
+
+
+# pymongo >= 4.11 passes ``sort`` to bulk update/replace builders, which mongomock does not accept yet
+for _name in ("add_update", "add_replace", "add_delete"):
+    def _without_sort(self, *args, __add=getattr(mongomock.collection.BulkOperationBuilder, _name), **kwargs):
+        kwargs.pop("sort", None)
+        return __add(self, *args, **kwargs)
+    setattr(mongomock.collection.BulkOperationBuilder, _name, _without_sort)
+
+
+@pytest.fixture(autouse=True)
+def mock_mongo(monkeypatch):
+    """A fresh in-memory MongoDB behind ``app.db.mongo`` for every test."""
+    client = AsyncMongoMockClient(uuidRepresentation="standard")
+    monkeypatch.setattr(mongo, "_client", client)
+    monkeypatch.setattr(catalog_cache, "version_check_seconds", 0.0)
+    monkeypatch.setattr(catalog_cache, "settle_seconds", 0.0)
+    monkeypatch.setattr(hub_graph, "_version", None)  # built from the previous test's database
+    catalog_cache.clear()
+    yield client["autocare"]
+    catalog_cache.clear()
+
+
+@pytest.fixture
+def mdb(mock_mongo):
+    return mock_mongo
+
+
+@pytest.fixture
+def client():
+    # No context manager: the lifespan warm-up is not needed against the in-memory database
+    return TestClient(app)
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
@@ -0,0 +1,149 @@
+from datetime import date, datetime
+from uuid import uuid4
+
+import pytest
+from anyio import run
+from fastapi import HTTPException
+
+from app.routes import booking as booking_routes
+from app.utils.availability import counter_id, reservation_delta, reserve_slots
+
+STORE = str(uuid4())
+WASH = str(uuid4())  # max_per_day, capacity 2
+POLISH = str(uuid4())  # max_per_day, capacity 1
+SERVICE = str(uuid4())
+DAY = date(2025, 3, 1)
+
+
+@pytest.fixture
+def catalog(mdb):
+    async def seed():
+        await mdb.task_types.insert_many([
+            {"_id": WASH, "name": "Wash", "slot_type": "max_per_day"},
+            {"_id": POLISH, "name": "Polish", "slot_type": "max_per_day"},
+        ])
+        await mdb.store_task_capacities.insert_many([
+            {"_id": str(uuid4()), "store_id": STORE, "task_type_id": WASH, "capacity": 2},
+            {"_id": str(uuid4()), "store_id": STORE, "task_type_id": POLISH, "capacity": 1},
+        ])
+        await mdb.services.insert_one({"_id": SERVICE, "name": "Foam Wash", "task_type_id": WASH})
+        await mdb.service_pricing.insert_one({
+            "_id": str(uuid4()), "store_id": STORE, "service_id": SERVICE,
+            "vehicle_category": "car_sedan", "base_price": 500.0,
+        })
+
+    run(seed)
+    return mdb
+
+
+def _count(mdb, task_type_id=WASH):
+    doc = run(mdb.slot_counters.find_one, {"_id": counter_id(STORE, task_type_id, DAY, "day")})
+    return doc["count"] if doc else 0
+
+
+def _booking(mdb, status="pending"):
+    booking_id = str(uuid4())
+    run(mdb.bookings.insert_one, {
+        "id": booking_id, "store_id": STORE, "status": status, "created_at": datetime(2025, 3, 1),
+    })
+    return booking_id
+
+
+def _put_tasks(client, booking_id, tasks):
+    return client.put(f"/api/bookings/{booking_id}/tasks", json={
+        "tasks": [{"service_id": SERVICE, "vehicle_category": "car_sedan"}] * tasks,
+        "slot_date": DAY.isoformat(),
+    })
+
+
+def test_reservation_delta():
+    old = [{"counter_id": "a", "units": 2}, {"counter_id": "b", "units": 1}]
+    new = [{"counter_id": "a", "units": 3}, {"counter_id": "c", "units": 1}]
+    assert reservation_delta(new, old) == [{"counter_id": "a", "units": 1}, {"counter_id": "c", "units": 1}]
+    assert reservation_delta(old, new) == [{"counter_id": "b", "units": 1}]
+    assert reservation_delta(old, None) == old
+    assert reservation_delta(None, old) == []
+
+
+def test_reserve_never_exceeds_capacity(catalog):
+    run(reserve_slots, STORE, {WASH: 1}, DAY, None)
+    run(reserve_slots, STORE, {WASH: 1}, DAY, None)
+    with pytest.raises(HTTPException) as exc:
+        run(reserve_slots, STORE, {WASH: 1}, DAY, None)
+    assert exc.value.status_code == 409
+    assert _count(catalog) == 2
+
+
+def test_partial_failure_releases_the_slots_that_succeeded(catalog):
+    run(reserve_slots, STORE, {POLISH: 1}, DAY, None)
+    with pytest.raises(HTTPException) as exc:
+        run(reserve_slots, STORE, {WASH: 1, POLISH: 1}, DAY, None)
+    assert "Polish" in exc.value.detail
+    assert _count(catalog, WASH) == 0
+    assert _count(catalog, POLISH) == 1
+
+
+def test_held_units_are_not_taken_twice(catalog):
+    held = run(reserve_slots, STORE, {WASH: 2}, DAY, None)
+    assert run(reserve_slots, STORE, {WASH: 2}, DAY, None, held) == held  # full slot, but already ours
+    assert _count(catalog) == 2
+
+
+def test_reslotting_a_booking(client, catalog):
+    first = _booking(catalog)
+    assert _put_tasks(client, first, 2).status_code == 200
+    assert _count(catalog) == 2
+    assert _put_tasks(client, first, 2).status_code == 200  # same tasks in a full slot
+    assert _count(catalog) == 2
+    assert _put_tasks(client, first, 1).status_code == 200
+    assert _count(catalog) == 1
+
+    second = _booking(catalog)
+    assert _put_tasks(client, second, 1).status_code == 200
+    assert _count(catalog) == 2
+
+    response = _put_tasks(client, first, 2)
+    assert response.status_code == 409
+    assert _count(catalog) == 2
+    assert run(catalog.bookings.find_one, {"id": first})["slot_reservations"][0]["units"] == 1
+
+
+def test_cancelled_booking_cannot_reserve(client, catalog):
+    booking_id = _booking(catalog)
+    assert _put_tasks(client, booking_id, 1).status_code == 200
+    assert client.post(f"/api/bookings/{booking_id}/cancel").status_code == 200
+    assert _count(catalog) == 0
+
+    assert _put_tasks(client, booking_id, 1).status_code == 400
+    assert _count(catalog) == 0
+
+
+def test_cancel_between_reserve_and_swap_undoes_the_reservation(client, catalog, monkeypatch):
+    booking_id = _booking(catalog)
+    assert _put_tasks(client, booking_id, 1).status_code == 200
+    real_reserve = booking_routes.reserve_slots
+
+    async def reserve_then_cancel(*args, **kwargs):
+        reservations = await real_reserve(*args, **kwargs)
+        assert client.post(f"/api/bookings/{booking_id}/cancel").status_code == 200  # releases the 1 held
+        return reservations
+
+    monkeypatch.setattr(booking_routes, "reserve_slots", reserve_then_cancel)
+    assert _put_tasks(client, booking_id, 2).status_code == 400
+    assert _count(catalog) == 0
+
+
+def test_concurrent_update_is_a_409_and_keeps_counts_exact(client, catalog, monkeypatch):
+    booking_id = _booking(catalog)
+    assert _put_tasks(client, booking_id, 1).status_code == 200
+    real_reserve = booking_routes.reserve_slots
+
+    async def reserve_then_race(*args, **kwargs):
+        reservations = await real_reserve(*args, **kwargs)
+        monkeypatch.setattr(booking_routes, "reserve_slots", real_reserve)
+        assert _put_tasks(client, booking_id, 2).status_code == 200  # another PUT wins the swap
+        return reservations
+
+    monkeypatch.setattr(booking_routes, "reserve_slots", reserve_then_race)
+    assert _put_tasks(client, booking_id, 1).status_code == 409
+    assert _count(catalog) == 2
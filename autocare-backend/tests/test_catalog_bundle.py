@@ -0,0 +1,44 @@
+import pytest
+from bson import ObjectId
+
+from app.utils.catalog_bundle import build_catalog
+
+pytestmark = pytest.mark.anyio
+
+FIXED, PERCENTAGE = ObjectId(), ObjectId()
+
+
+@pytest.fixture
+async def catalog(mdb):
+    await mdb.task_types.insert_many([{"_id": FIXED, "name": "Wash"}, {"_id": PERCENTAGE, "name": "Repair"}])
+    await mdb.labour_rules.insert_many([
+        {"task_type_id": FIXED, "vehicle_category": "car_hatchback", "charge_type": "fixed", "value": 250},
+        {"task_type_id": PERCENTAGE, "vehicle_category": "car_hatchback", "charge_type": "percentage", "value": 10},
+    ])
+    services = [
+        {"_id": ObjectId(), "name": "Foam wash", "task_type_id": FIXED},
+        {"_id": ObjectId(), "name": "Dent repair", "task_type_id": PERCENTAGE},
+    ]
+    await mdb.services.insert_many(services)
+    return services
+
+
+def _labour(bundle, name):
+    return next(service for service in bundle.services if service.name == name).labour
+
+
+async def test_unpriced_services(catalog):
+    bundle = await build_catalog("store-1", "car_hatchback")
+    assert [service.base_price for service in bundle.services] == [None, None]
+    assert _labour(bundle, "Foam wash").amount == 250.0
+    assert _labour(bundle, "Dent repair").amount is None
+
+
+async def test_priced_services(catalog, mdb):
+    await mdb.service_pricing.insert_many([
+        {"store_id": "store-1", "service_id": service["_id"], "vehicle_category": "car_hatchback", "base_price": 1200}
+        for service in catalog
+    ])
+    bundle = await build_catalog("store-1", "car_hatchback")
+    assert _labour(bundle, "Foam wash").amount == 250.0
+    assert _labour(bundle, "Dent repair").amount == 120.0
@@ -0,0 +1,33 @@
+from datetime import datetime
+from uuid import uuid4
+
+from anyio import run
+
+
+def _addon(name, price):
+    return {"_id": str(uuid4()), "name": name, "price": price, "created_at": datetime(2025, 1, 1)}
+
+
+def test_write_invalidates(client):
+    assert client.get("/api/addons").json() == []
+
+    assert client.post("/api/addons", json={"name": "Polish", "price": 80}).status_code == 200
+
+    assert [a["name"] for a in client.get("/api/addons").json()] == ["Polish"]
+
+
+def test_version_bump_from_another_worker_invalidates(client, mdb):
+    assert client.get("/api/addons").json() == []
+
+    async def other_worker_writes():
+        await mdb.addons.insert_one(_addon("Wax", 100))
+        await mdb.catalog_versions.update_one({"_id": "addons"}, {"$inc": {"version": 1}}, upsert=True)
+
+    run(other_worker_writes)
+    assert [a["name"] for a in client.get("/api/addons").json()] == ["Wax"]
+
+
+def test_cached_body_is_served_until_the_version_changes(client, mdb):
+    client.get("/api/addons")
+    run(mdb.addons.insert_one, _addon("Wax", 100))  # written without invalidate()
+    assert client.get("/api/addons").json() == []
@@ -0,0 +1,68 @@
+from datetime import datetime
+from uuid import uuid4
+
+from anyio import run
+
+from app.utils.catalog_cache import _etag_matches, make_etag
+
+
+def _addon(name, price):
+    return {"_id": str(uuid4()), "name": name, "price": price, "created_at": datetime(2025, 1, 1)}
+
+
+def test_etag_depends_on_key_and_versions():
+    assert make_etag("addons", (1,)) == make_etag("addons", (1,))
+    assert make_etag("addons", (1,)) != make_etag("addons", (2,))
+    assert make_etag("addons", (1,)) != make_etag("services", (1,))
+    assert make_etag("addons", (1,)) != make_etag("addons", (1,), settled=False)
+
+
+def test_etag_matching_is_weak_and_ignores_encoding_suffix():
+    etag = make_etag("addons", (3,))
+    opaque = etag.strip('"')
+    assert _etag_matches(etag, etag)
+    assert _etag_matches(f'W/"{opaque}"', etag)
+    assert _etag_matches(f'"{opaque}-gz"', etag)
+    assert _etag_matches(f'"other", "{opaque}-br"', etag)
+    assert _etag_matches("*", etag)
+    assert not _etag_matches('"other"', etag)
+
+
+def test_revalidation_returns_304(client, mdb):
+    run(mdb.addons.insert_one, _addon("Wax", 100))
+
+    first = client.get("/api/addons")
+    assert first.status_code == 200
+    assert [a["name"] for a in first.json()] == ["Wax"]
+    assert first.headers["cache-control"] == "no-cache"
+
+    again = client.get("/api/addons", headers={"If-None-Match": first.headers["etag"]})
+    assert again.status_code == 304
+    assert again.headers["etag"] == first.headers["etag"]
+    assert again.content == b""
+
+
+def test_compressed_variant_has_its_own_etag(client, mdb):
+    run(mdb.addons.insert_many, [_addon(f"Addon {i}", i) for i in range(40)])
+
+    plain = client.get("/api/addons", headers={"Accept-Encoding": "identity"})
+    zipped = client.get("/api/addons", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in plain.headers
+    assert zipped.headers["content-encoding"] == "gzip"
+    assert zipped.headers["etag"] == plain.headers["etag"][:-1] + '-gz"'
+    assert zipped.headers["vary"] == "Accept-Encoding"
+    assert zipped.json() == plain.json()
+
+    revalidated = client.get(
+        "/api/addons", headers={"Accept-Encoding": "gzip", "If-None-Match": zipped.headers["etag"]}
+    )
+    assert revalidated.status_code == 304
+
+
+def test_store_list_revalidation(client, mdb):
+    run(mdb.store_admin.insert_one, {"id": "s1", "name": "AutoCare24 - One", "type": "garage", "password": "x"})
+
+    first = client.get("/api/stores")
+    assert [s["id"] for s in first.json()] == ["s1"]
+    assert client.get("/api/stores", headers={"If-None-Match": first.headers["etag"]}).status_code == 304
+    assert client.get("/api/stores?type=garage", headers={"If-None-Match": first.headers["etag"]}).status_code == 200
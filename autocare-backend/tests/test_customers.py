@@ -0,0 +1,52 @@
+from anyio import run
+from pymongo import ASCENDING, IndexModel
+
+from app.db.indexes import INDEXES, ensure_indexes, find_duplicates
+
+PHONE_INDEX = next(m for m in INDEXES["customers"] if m.document["name"] == "phone_number")
+
+
+def _customer(customer_id, phone):
+    return {"id": customer_id, "full_name": f"Customer {customer_id}", "phone_number": phone, "is_active": True}
+
+
+def test_changing_phone_to_an_existing_one_is_a_409(client, mdb):
+    async def seed():
+        await mdb.customers.create_indexes([PHONE_INDEX])
+        await mdb.customers.insert_many([_customer("c1", "9000000001"), _customer("c2", "9000000002")])
+
+    run(seed)
+    response = client.put("/api/customers/c2", json={"phone_number": "9000000001"})
+    assert response.status_code == 409
+    assert client.put("/api/customers/c2", json={"phone_number": "9000000003"}).status_code == 200
+
+
+def test_duplicates_are_reported_and_do_not_block_other_indexes(mdb):
+    async def scenario():
+        await mdb.customers.insert_many([
+            _customer("c1", "9000000001"),
+            _customer("c2", "9000000001"),
+            _customer("c3", "9000000002"),
+        ])
+        groups = await find_duplicates(mdb.customers, PHONE_INDEX)
+        created = await ensure_indexes(mdb)
+        return groups, created, await mdb.customers.index_information()
+
+    groups, created, indexes = run(scenario)
+    assert groups == [{"_id": {"phone_number": "9000000001"}, "ids": ["c1", "c2"], "count": 2}]
+    assert "phone_number" not in indexes
+    assert "id_unique" in indexes and "id_unique" in created["customers"]
+
+
+def test_find_duplicates_on_compound_keys(mdb):
+    model = IndexModel([("store_id", ASCENDING), ("task_type_id", ASCENDING)], name="store_task", unique=True)
+
+    async def scenario():
+        await mdb.caps.insert_many([
+            {"_id": "a", "store_id": "s", "task_type_id": "t"},
+            {"_id": "b", "store_id": "s", "task_type_id": "t"},
+            {"_id": "c", "store_id": "s", "task_type_id": "u"},
+        ])
+        return await find_duplicates(mdb.caps, model)
+
+    assert run(scenario) == [{"_id": {"store_id": "s", "task_type_id": "t"}, "ids": ["a", "b"], "count": 2}]
@@ -0,0 +1,118 @@
+from types import SimpleNamespace
+
+import pytest
+from pymongo.errors import ExecutionTimeout, OperationFailure, ServerSelectionTimeoutError
+
+from app.utils import db_guard
+from app.utils.db_guard import CircuitBreaker, DatabaseUnavailable, is_unavailable
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(db_guard, "time", SimpleNamespace(monotonic=lambda: now.value))
+    return now
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker(failures=3, failure_ratio=0.5, window=10, cooldown=5)
+
+
+def test_opens_after_threshold(breaker):
+    breaker.record_failure()
+    breaker.record_failure()
+    assert not breaker.is_open
+    breaker.record_failure()
+    assert breaker.is_open
+    assert not breaker.allow()
+    with pytest.raises(DatabaseUnavailable):
+        breaker.check()
+
+
+def test_stays_closed_while_most_commands_succeed(breaker):
+    for _ in range(10):
+        breaker.record_success()
+    for _ in range(4):
+        breaker.record_failure()
+    assert not breaker.is_open
+
+
+def test_failures_outside_the_window_do_not_add_up(breaker, clock):
+    breaker.record_failure()
+    breaker.record_failure()
+    clock.value += 11
+    breaker.record_failure()
+    assert not breaker.is_open
+
+
+def test_one_probe_per_cooldown(breaker, clock):
+    for _ in range(3):
+        breaker.record_failure()
+    clock.value += 5
+    assert breaker.allow()  # the probe
+    assert not breaker.allow()  # everyone else keeps failing fast
+    clock.value += 5
+    assert breaker.allow()
+
+
+def test_failed_probe_restarts_the_cooldown(breaker, clock):
+    for _ in range(3):
+        breaker.record_failure()
+    clock.value += 5
+    assert breaker.allow()
+    clock.value += 1
+    breaker.record_failure()
+    clock.value += 4.5
+    assert not breaker.allow()
+    clock.value += 0.5
+    assert breaker.allow()
+
+
+def test_success_closes(breaker, clock):
+    for _ in range(3):
+        breaker.record_failure()
+    clock.value += 5
+    assert breaker.allow()
+    breaker.record_success()
+    assert not breaker.is_open
+    assert breaker.allow()
+    # counters were reset: it takes a full threshold to open again
+    breaker.record_failure()
+    breaker.record_failure()
+    assert not breaker.is_open
+
+
+def test_record_exception_counts_only_errors_without_command_events(breaker):
+    breaker.record_exception(DatabaseUnavailable("open"))
+    breaker.record_exception(OperationFailure("bad query"))
+    breaker.record_exception(ExecutionTimeout("slow", 50))  # already seen by the listener
+    assert breaker._failed == 0
+    breaker.record_exception(ServerSelectionTimeoutError("no primary"))
+    assert breaker._failed == 1
+
+
+def test_is_unavailable():
+    assert is_unavailable(ServerSelectionTimeoutError("no primary"))
+    assert is_unavailable(ExecutionTimeout("slow", 50))
+    assert is_unavailable(DatabaseUnavailable("open"))
+    assert not is_unavailable(OperationFailure("bad query", 2))
+    assert not is_unavailable(ValueError())
+
+
+def test_open_breaker_serves_stale_catalog_and_503s_the_rest(client, monkeypatch):
+    assert client.post("/api/addons", json={"name": "Wax", "price": 100}).status_code == 200
+    fresh = client.get("/api/addons")
+    assert "warning" not in fresh.headers
+
+    monkeypatch.setattr(db_guard.breaker, "is_open", True)
+    monkeypatch.setattr(db_guard.breaker, "_retry_at", float("inf"))
+
+    stale = client.get("/api/addons")
+    assert stale.status_code == 200
+    assert stale.json() == fresh.json()
+    assert stale.headers["warning"] == '110 - "Response is Stale"'
+
+    down = client.get("/api/search", params={"q": "abc"})
+    assert down.status_code == 503
+    assert "retry-after" in down.headers
@@ -0,0 +1,57 @@
+from uuid import uuid4
+
+import pytest
+from anyio import run
+
+from app.db.indexes import ensure_indexes
+from app.utils.hub_graph import HubGraph
+
+GARAGE = str(uuid4())
+HUBS = [str(uuid4()) for _ in range(3)]
+
+
+@pytest.fixture(autouse=True)
+def indexes(mdb):
+    run(ensure_indexes, mdb)
+
+
+def _garages(client, hub_id):
+    return client.get(f"/api/hubs/{hub_id}/garages").json()["garage_ids"]
+
+
+def test_tagging_an_already_tagged_hub_is_not_an_error(client, mdb):
+    assert _garages(client, HUBS[0]) == []
+
+    first = client.post("/api/garage-hub-tags", json={"garage_id": GARAGE, "hub_ids": HUBS[:2]})
+    assert first.status_code == 200
+    assert first.json()["added"] == 2
+
+    again = client.post("/api/garage-hub-tags", json={"garage_id": GARAGE, "hub_ids": HUBS})
+    assert again.status_code == 200
+    assert (again.json()["added"], again.json()["already_tagged"]) == (1, 2)
+
+    assert run(mdb.garage_hub_tags.count_documents, {"garage_id": GARAGE}) == 3
+    assert [_garages(client, hub_id) for hub_id in HUBS] == [[GARAGE]] * 3
+
+
+def test_other_workers_see_tag_writes(client):
+    other_worker = HubGraph()
+    assert run(other_worker.hubs_for_garage, GARAGE) == []
+
+    client.post("/api/garage-hub-tags", json={"garage_id": GARAGE, "hub_ids": HUBS[:2]})
+    client.put("/api/garage-hub-tags", json={"garage_id": GARAGE, "hub_ids": HUBS[1:]})
+
+    assert run(other_worker.hubs_for_garage, GARAGE) == sorted(HUBS[1:])
+    assert _garages(client, HUBS[0]) == []
+
+
+def test_invalidate_makes_this_worker_reload(mdb):
+    graph = HubGraph()
+
+    async def scenario():
+        await graph.refresh()
+        await mdb.garage_hub_tags.insert_one({"garage_id": GARAGE, "hub_id": HUBS[0]})  # a partial write
+        await graph.invalidate()
+        return await graph.hubs_for_garage(GARAGE)
+
+    assert run(scenario) == [HUBS[0]]
@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+
+from app.utils.catalog_cache import catalog_cache
+from app.utils.hub_graph import COLLECTION, HubGraph
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def graph(monkeypatch):
+    graph = HubGraph()
+    loads = []
+    real_load = graph._load
+
+    async def counting_load(version):
+        loads.append(version)
+        await asyncio.sleep(0.01)  # let the other requests pile up on the lock
+        await real_load(version)
+
+    monkeypatch.setattr(graph, "_load", counting_load)
+    graph.loads = loads
+    return graph
+
+
+async def test_concurrent_reads_after_a_version_bump_reload_once(graph, mdb):
+    await mdb[COLLECTION].insert_many([
+        {"garage_id": "g1", "hub_id": "h1"},
+        {"garage_id": "g1", "hub_id": "h2"},
+    ])
+    await graph.refresh()
+    assert graph.loads == [0]
+
+    await mdb[COLLECTION].insert_one({"garage_id": "g2", "hub_id": "h1"})
+    await mdb.catalog_versions.update_one({"_id": COLLECTION}, {"$inc": {"version": 1}}, upsert=True)
+
+    results = await asyncio.gather(*(graph.garages_for_hub("h1") for _ in range(10)))
+    assert graph.loads == [0, 1]
+    assert all(result == ["g1", "g2"] for result in results)
+
+
+async def test_local_writes_apply_in_place(graph, mdb):
+    await mdb[COLLECTION].insert_one({"garage_id": "g1", "hub_id": "h1"})
+    await graph.refresh()
+
+    await mdb[COLLECTION].insert_one({"garage_id": "g1", "hub_id": "h2"})
+    await graph.apply("g1", added=["h2"])
+    assert await graph.hubs_for_garage("g1") == ["h1", "h2"]
+    assert graph.loads == [0]
+    assert (await catalog_cache.versions((COLLECTION,))) == (1,)
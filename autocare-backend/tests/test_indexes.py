@@ -0,0 +1,36 @@
+from anyio import run
+from pymongo import ASCENDING
+
+from app.db.indexes import INDEXES, ensure_indexes
+
+
+def test_every_declared_index_is_created_once(mdb):
+    async def scenario():
+        return await ensure_indexes(mdb), await ensure_indexes(mdb)
+
+    first, second = run(scenario)
+    assert first == {
+        collection: [model.document["name"] for model in models] for collection, models in INDEXES.items()
+    }
+    assert second == {}
+
+
+def test_drifted_index_is_rebuilt(mdb):
+    async def scenario():
+        await mdb.store_task_capacities.create_index([("store_id", ASCENDING)], name="store_task_type")
+        created = await ensure_indexes(mdb)
+        return created, await mdb.store_task_capacities.index_information()
+
+    created, indexes = run(scenario)
+    assert created["store_task_capacities"] == ["store_task_type"]
+    assert list(indexes["store_task_type"]["key"]) == [("store_id", 1), ("task_type_id", 1)]
+    assert indexes["store_task_type"]["unique"]
+
+
+def test_hand_made_index_on_the_same_key_is_renamed(mdb):
+    async def scenario():
+        await mdb.admin_users.create_index([("username", ASCENDING)], name="username_1")
+        await ensure_indexes(mdb)
+        return await mdb.admin_users.index_information()
+
+    assert set(run(scenario)) == {"_id_", "username"}
@@ -0,0 +1,41 @@
+from datetime import datetime
+
+import anyio
+
+from app.utils.loyalty import RECENT_REWARDS
+
+
+def _seed_card(mdb, **fields):
+    card = {"id": "card-1", "customer_id": "cust-1", "points_balance": 0, **fields}
+    anyio.run(mdb.loyalty_cards.insert_one, card)
+
+
+def _reward(points=10):
+    return {"type": "service", "points": points, "date": datetime(2026, 1, 1).isoformat(), "note": "$oil change"}
+
+
+def test_rewards_embed_numbered_entries(client, mdb):
+    _seed_card(mdb, reward_count=0, reward_history=[])
+
+    seqs = [client.post("/api/loyalty-cards/card-1/rewards", json=_reward()).json()["seq"] for _ in range(3)]
+    assert seqs == [1, 2, 3]
+
+    card = anyio.run(mdb.loyalty_cards.find_one, {"id": "card-1"})
+    assert card["points_balance"] == 30
+    assert card["reward_count"] == 3
+    assert [e["seq"] for e in card["reward_history"]] == [1, 2, 3]
+    assert card["reward_history"][0]["note"] == "$oil change"
+
+    bucket = anyio.run(mdb.loyalty_rewards.find_one, {"card_id": "card-1"})
+    assert bucket["entries"] == card["reward_history"]
+
+
+def test_legacy_card_is_migrated_before_crediting(client, mdb):
+    _seed_card(mdb, reward_history=[_reward(5) for _ in range(RECENT_REWARDS)])
+
+    assert client.post("/api/loyalty-cards/card-1/rewards", json=_reward()).json()["seq"] == RECENT_REWARDS + 1
+
+    card = anyio.run(mdb.loyalty_cards.find_one, {"id": "card-1"})
+    assert len(card["reward_history"]) == RECENT_REWARDS
+    assert card["reward_history"][-1]["seq"] == RECENT_REWARDS + 1
+    assert card["reward_history"][0]["seq"] == 2
@@ -0,0 +1,108 @@
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+
+from app.models.booking import BookingTaskUpdateRequest
+from app.utils.quotation import build_quotation, compute_labour, compute_tax
+
+pytestmark = pytest.mark.anyio
+
+STORE = "store-1"
+CAR = "car_sedan"
+
+
+def _id():
+    return str(uuid4())
+
+
+WASH_TYPE, REPAIR_TYPE = _id(), _id()
+WASH, REPAIR, INACTIVE = _id(), _id(), _id()
+WAX, POLISH, OTHER_ADDON = _id(), _id(), _id()
+UNDERBODY, BIKE_ONLY, OTHER_SUB = _id(), _id(), _id()
+
+
+@pytest.fixture
+async def catalog(mdb):
+    await mdb.services.insert_many([
+        {"_id": WASH, "name": "Foam wash", "task_type_id": WASH_TYPE,
+         "addon_ids": [WAX, POLISH], "subservice_ids": [UNDERBODY, BIKE_ONLY]},
+        {"_id": REPAIR, "name": "Dent repair", "task_type_id": REPAIR_TYPE},
+        {"_id": INACTIVE, "name": "Retired", "task_type_id": WASH_TYPE, "is_active": False},
+    ])
+    await mdb.service_pricing.insert_many([
+        {"store_id": STORE, "service_id": WASH, "vehicle_category": CAR, "base_price": 500, "tax_percent": 18},
+        {"store_id": STORE, "service_id": REPAIR, "vehicle_category": CAR, "base_price": 2000,
+         "tax_percent": 18, "include_tax": True},
+        {"store_id": STORE, "service_id": INACTIVE, "vehicle_category": CAR, "base_price": 100},
+    ])
+    await mdb.labour_rules.insert_many([
+        {"task_type_id": WASH_TYPE, "vehicle_category": CAR, "charge_type": "fixed", "value": 150},
+        {"task_type_id": REPAIR_TYPE, "vehicle_category": CAR, "charge_type": "percentage", "value": 10},
+    ])
+    await mdb.addons.insert_many([
+        {"_id": WAX, "name": "Wax", "price": 200},
+        {"_id": POLISH, "name": "Polish", "price": 120},
+        {"_id": OTHER_ADDON, "name": "Ceramic coat", "price": 5000},
+    ])
+    await mdb.subservices.insert_many([
+        {"_id": UNDERBODY, "name": "Underbody", "price": 80, "vehicle_category": None},
+        {"_id": BIKE_ONLY, "name": "Chain lube", "price": 50, "vehicle_category": "bike"},
+        {"_id": OTHER_SUB, "name": "Engine flush", "price": 900, "vehicle_category": CAR},
+    ])
+
+
+def _request(*tasks):
+    return BookingTaskUpdateRequest(tasks=[{"vehicle_category": CAR, **task} for task in tasks])
+
+
+def test_labour_and_tax_rules():
+    assert compute_labour(None, 1000) == 0.0
+    assert compute_labour({"charge_type": "fixed", "value": 150}, 1000) == 150.0
+    assert compute_labour({"charge_type": "percentage", "value": 10}, 1000) == 100.0
+    assert compute_tax(100, 18, include_tax=False) == (18.0, 118.0)
+    tax, total = compute_tax(118, 18, include_tax=True)
+    assert (round(tax, 2), total) == (18.0, 118)
+
+
+async def test_fixed_labour_with_addons_subservices_and_exclusive_tax(catalog):
+    quotation = await build_quotation(STORE, _request({
+        "service_id": WASH,
+        "addons": [{"id": WAX, "name": "ignored"}, {"name": "polish"}],
+        "subservices": [{"id": UNDERBODY}],
+    }))
+    (task,) = quotation.tasks
+    assert (task.base_price, task.labour_charge) == (500.0, 150.0)
+    assert [(a.name, a.price) for a in task.addons] == [("Wax", 200.0), ("Polish", 120.0)]
+    assert [(s.name, s.price) for s in task.subservices] == [("Underbody", 80.0)]
+    # 500 + 150 + 320 + 80 = 1050, plus 18% tax
+    assert (task.tax_amount, task.total) == (189.0, 1239.0)
+    assert (quotation.subtotal, quotation.tax_amount, quotation.total) == (1050.0, 189.0, 1239.0)
+
+
+async def test_percentage_labour_with_inclusive_tax(catalog):
+    quotation = await build_quotation(STORE, _request({"service_id": REPAIR}, {"service_id": WASH}))
+    repair, wash = quotation.tasks
+    assert repair.labour_charge == 200.0
+    assert repair.total == 2200.0  # tax already included
+    assert repair.tax_amount == round(2200 - 2200 / 1.18, 2)
+    assert wash.total == 767.0  # (500 + 150) * 1.18
+    assert quotation.total == 2967.0
+    assert quotation.subtotal == round(quotation.total - quotation.tax_amount, 2)
+
+
+@pytest.mark.parametrize("task, detail", [
+    ({"service_id": _id()}, "Unknown service"),
+    ({"service_id": INACTIVE}, "not active"),
+    ({"service_id": WASH, "vehicle_category": "bike"}, "No pricing"),
+    ({"service_id": WASH, "addons": [{"id": OTHER_ADDON, "name": "Ceramic coat"}]}, "Unknown addon"),
+    ({"service_id": WASH, "addons": [{"name": "Ceramic coat"}]}, "Unknown addon"),
+    ({"service_id": REPAIR, "addons": [{"id": WAX, "name": "Wax"}]}, "Unknown addon"),
+    ({"service_id": WASH, "subservices": [{"id": OTHER_SUB}]}, "Unknown subservice"),
+    ({"service_id": WASH, "subservices": [{"id": BIKE_ONLY}]}, "Unknown subservice"),
+])
+async def test_rejected_tasks(catalog, task, detail):
+    with pytest.raises(HTTPException) as exc:
+        await build_quotation(STORE, _request(task))
+    assert exc.value.status_code == 400
+    assert detail in exc.value.detail
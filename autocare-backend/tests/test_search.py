@@ -0,0 +1,59 @@
+import json
+
+import anyio
+import pytest
+
+from app.routes.customer import customer_overview_pipeline
+from app.utils.search_keys import search_keys
+
+
+def _customer(i, full_name, phone_number, **fields):
+    customer = {
+        "id": f"c{i:02d}", "full_name": full_name, "phone_number": phone_number,
+        "store_id": "s1", "is_active": True, **fields,
+    }
+    customer["search_keys"] = search_keys(customer)
+    return customer
+
+
+@pytest.fixture
+def customers(mdb):
+    docs = [_customer(i, f"Ravikiran {name}", f"98765{i:05d}") for i, name in enumerate(
+        ["Varma", "Kumar", "Anand", "Shetty", "Iyer", "Bose", "Gupta", "Das", "Nair", "Menon", "Patil", "Rao"]
+    )]
+    docs.append(_customer(50, "Zoya Ravi", "9000000000"))  # the only exact "ravi" token, inserted last
+    docs.append(_customer(51, "Ravi Jain", "9000000001", is_active=False))
+    anyio.run(mdb.customers.insert_many, docs)
+    return docs
+
+
+def _names(client, **params):
+    response = client.get("/api/search", params=params)
+    assert response.status_code == 200
+    return [c["full_name"] for c in response.json()]
+
+
+def test_exact_matches_come_first(client, customers):
+    names = _names(client, q="ravi", limit=5)
+    assert names[0] == "Zoya Ravi"
+    assert len(names) == 5 and all(name.startswith("Ravikiran") for name in names[1:])
+    assert _names(client, q="9876500007", limit=3) == ["Ravikiran Das"]
+
+
+def test_matches_beyond_the_limit_are_cut_without_repeats(client, customers):
+    names = _names(client, q="ravi", limit=50)
+    assert names[0] == "Zoya Ravi"
+    assert len(names) == len(set(names)) == 13  # the inactive "Ravi Jain" is left out
+    assert len(_names(client, q="98765", limit=4)) == 4
+
+
+def test_search_keys_stay_internal(client, customers):
+    assert "search_keys" not in client.get("/api/customers/c01").json()
+    assert all("search_keys" not in c for c in client.get("/api/customers", params={"store_id": "s1"}).json())
+    batch = client.post("/api/customers/batch-get", json={"ids": ["c01", "c02"]}).json()
+    assert all("search_keys" not in c for c in batch["items"].values())
+    assert customer_overview_pipeline("c01", 5)[-1] == {"$project": {"_id": 0, "search_keys": 0}}
+
+    export = client.get("/api/export/customers", params={"store_id": "s1"})
+    rows = [json.loads(line) for line in export.text.splitlines()]
+    assert len(rows) == 13 and all("search_keys" not in row for row in rows)
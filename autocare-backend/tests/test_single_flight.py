@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+from fastapi import Request, Response
+
+from app.utils.single_flight import SingleFlight, single_flight
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_concurrent_calls_share_one_execution():
+    flights = SingleFlight()
+    calls = 0
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"rows": calls}
+
+    results = await asyncio.gather(*(flights.do("k", load) for _ in range(10)))
+    assert calls == 1
+    assert [shared for _, shared in results].count(False) == 1
+    assert all(result == {"rows": 1} for result, _ in results)
+
+    # Once finished, the next call runs again
+    result, shared = await flights.do("k", load)
+    assert (result, shared) == ({"rows": 2}, False)
+
+
+async def test_different_keys_do_not_coalesce():
+    flights = SingleFlight()
+    calls = []
+
+    async def load(key):
+        calls.append(key)
+        await asyncio.sleep(0.01)
+        return key
+
+    results = await asyncio.gather(flights.do("a", lambda: load("a")), flights.do("b", lambda: load("b")))
+    assert sorted(calls) == ["a", "b"]
+    assert [r for r, _ in results] == ["a", "b"]
+
+
+async def test_errors_reach_every_waiter():
+    flights = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise LookupError("gone")
+
+    results = await asyncio.gather(*(flights.do("k", fail) for _ in range(3)), return_exceptions=True)
+    assert all(isinstance(r, LookupError) for r in results)
+
+
+async def test_cancelled_leader_does_not_fail_followers():
+    flights = SingleFlight()
+
+    async def load():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    leader = asyncio.ensure_future(flights.do("k", load))
+    await asyncio.sleep(0)
+    follower = asyncio.ensure_future(flights.do("k", load))
+    await asyncio.sleep(0)
+    leader.cancel()
+    assert await follower == ("done", True)
+
+
+def _request(**headers):
+    raw = [(k.replace("_", "-").encode(), v.encode()) for k, v in headers.items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw, "query_string": b""})
+
+
+async def test_decorator_keys_on_arguments_and_vary_headers():
+    calls = []
+
+    @single_flight(vary=("accept-encoding",))
+    async def handler(request: Request, store_id: str, limit: int = 10):
+        calls.append((store_id, request.headers.get("accept-encoding")))
+        await asyncio.sleep(0.01)
+        response = Response(content=store_id.encode(), media_type="application/json")
+        return response
+
+    responses = await asyncio.gather(
+        handler(_request(accept_encoding="gzip"), "s1"),
+        handler(_request(accept_encoding="gzip"), store_id="s1"),
+        handler(_request(accept_encoding="br"), "s1"),
+        handler(_request(accept_encoding="gzip"), "s2"),
+        handler(_request(accept_encoding="gzip"), "s1", limit=5),
+    )
+    assert sorted(calls) == [("s1", "br"), ("s1", "gzip"), ("s1", "gzip"), ("s2", "gzip")]
+
+    # Coalesced callers get their own Response: headers added to one do not leak into another
+    first, second = responses[0], responses[1]
+    assert first is not second and first.body == second.body == b"s1"
+    first.headers["access-control-allow-origin"] = "*"
+    assert "access-control-allow-origin" not in second.headers
@@ -0,0 +1,53 @@
+from uuid import uuid4
+
+import pytest
+from anyio import run
+
+from app.db.indexes import ensure_indexes
+
+STORE = str(uuid4())
+WASH, REPAIR = str(uuid4()), str(uuid4())
+
+
+@pytest.fixture(autouse=True)
+def indexes(mdb):
+    run(ensure_indexes, mdb)
+
+
+def _capacities(mdb):
+    rows = run(mdb.store_task_capacities.find({"store_id": STORE}).to_list, None)
+    return {row["task_type_id"]: row["capacity"] for row in rows}
+
+
+def test_posting_the_same_pair_twice_is_a_conflict(client, mdb):
+    created = client.post("/api/store-task-capacities", json=[{"store_id": STORE, "task_type_id": WASH, "capacity": 4}])
+    assert created.status_code == 200
+    assert created.json()["count"] == 1
+
+    again = client.post("/api/store-task-capacities", json=[
+        {"store_id": STORE, "task_type_id": REPAIR, "capacity": 2},
+        {"store_id": STORE, "task_type_id": WASH, "capacity": 9},
+    ])
+    assert again.status_code == 409
+    assert WASH in again.json()["detail"]
+    assert _capacities(mdb) == {WASH: 4}  # nothing written, not even the new pair
+
+
+def test_duplicate_pair_in_payload_is_rejected(client, mdb):
+    response = client.post("/api/store-task-capacities", json=[
+        {"store_id": STORE, "task_type_id": WASH, "capacity": 4},
+        {"store_id": STORE, "task_type_id": WASH, "capacity": 5},
+    ])
+    assert response.status_code == 400
+    assert _capacities(mdb) == {}
+
+
+def test_put_applies_the_diff(client, mdb):
+    client.post("/api/store-task-capacities", json=[{"store_id": STORE, "task_type_id": WASH, "capacity": 4}])
+
+    response = client.put("/api/store-task-capacities", json=[
+        {"store_id": STORE, "task_type_id": WASH, "capacity": 6},
+        {"store_id": STORE, "task_type_id": REPAIR, "capacity": 2},
+    ])
+    assert response.json()["inserted"] == 1 and response.json()["updated"] == 1
+    assert _capacities(mdb) == {WASH: 6, REPAIR: 2}
@@ -0,0 +1,41 @@
+from datetime import datetime
+
+import anyio
+import pytest
+
+
+@pytest.fixture
+def stores(mdb):
+    docs = [
+        {"id": f"s{i}", "name": f"AutoCare24 - Store {i}", "type": "garage", "alias": f"AC24S{i}",
+         "password": "secret", "created_at": datetime(2025, 1, i)}
+        for i in range(1, 4)
+    ]
+    anyio.run(mdb.store_admin.insert_many, docs)
+    return docs
+
+
+def test_batch_get_leaves_out_password_by_default(client, stores):
+    response = client.post("/api/stores/batch-get", json={"ids": ["s1", "s2", "nope"]})
+    assert response.status_code == 200
+    body = response.json()
+    assert list(body["items"]) == ["s1", "s2"]
+    assert body["missing"] == ["nope"]
+    assert all("password" not in store and store["alias"] for store in body["items"].values())
+
+
+def test_batch_get_with_fields(client, stores):
+    body = client.post("/api/stores/batch-get", json={"ids": ["s1"], "fields": "name"}).json()
+    assert body["items"] == {"s1": {"id": "s1", "name": "AutoCare24 - Store 1"}}
+
+
+def test_password_cannot_be_requested(client, stores):
+    assert client.post("/api/stores/batch-get", json={"ids": ["s1"], "fields": "name,password"}).status_code == 400
+    assert client.get("/api/stores/s1", params={"fields": "password"}).status_code == 400
+    assert client.get("/api/stores", params={"fields": "password"}).status_code == 400
+
+
+def test_store_reads_leave_out_password(client, stores):
+    assert "password" not in client.get("/api/stores/s1").json()
+    assert all("password" not in store for store in client.get("/api/stores").json())
+    assert all("password" not in store for store in client.get("/api/stores", params={"limit": 2}).json())
@@ -32,6 +32,12 @@ interface LoyaltyCard {
   tier: string;
 }
 
+interface CustomerOverview {
+  customer: Customer;
+  vehicles: Vehicle[];
+  loyalty_card: LoyaltyCard | null;
+}
+
 interface Customer {
   id: string;
   full_name: string;
@@ -57,25 +63,13 @@ export default function EditCustomerPage() {
 
   const fetchDetails = async (customerId: string) => {
     try {
-      const [cust, vehs] = await Promise.all([
-        fetchFromAPI<Customer>(`/api/customers/${customerId}`),
-        fetchFromAPI<Vehicle[]>(`/api/customers/${customerId}/vehicles`)
-      ]);
-      setCustomer(cust);
-      setVehicles(vehs);
-
-      try {
-        const card = await fetchFromAPI<LoyaltyCard>(
-          `/api/customers/${customerId}/loyalty-card`
-        );
-        setLoyaltyCard(card);
-      } catch (error: unknown) {
-        if (error instanceof Error && error.message.includes('404')) {
-          setLoyaltyCard('not_found');
-        } else {
-          console.error('Loyalty card fetch error:', error);
-        }
-      }
+      // One round trip: customer, vehicles and loyalty card from a single aggregation
+      const overview = await fetchFromAPI<CustomerOverview>(
+        `/api/customers/${customerId}/overview`
+      );
+      setCustomer(overview.customer);
+      setVehicles(overview.vehicles);
+      setLoyaltyCard(overview.loyalty_card ?? 'not_found');
     } catch (error) {
       console.error('Error loading customer data:', error);
     }